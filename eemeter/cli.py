@@ -9,16 +9,19 @@ import os
 import click
 import pytz
 import pandas as pd
-from scipy import stats
 import numpy as np
 
 from eemeter.structures import EnergyTrace
 from eemeter.io.serializers import ArbitraryStartSerializer
 from eemeter.ee.meter import EnergyEfficiencyMeter
+from eemeter.lazy import lazy_import
 from eemeter.processors.dispatchers import (
     get_approximate_frequency,
 )
 from eemeter.modeling.models.caltrack import CaltrackMonthlyModel
+from eemeter.resources.bundle import build_resource_bundle
+
+stats = lazy_import('scipy.stats')
 
 
 logging.basicConfig()
@@ -430,3 +433,13 @@ def analyze(inputs_path, ignore_data_sufficiency, full_output, output_dir):
     options = {'ignore_data_sufficiency': ignore_data_sufficiency,
                'full_output': full_output, 'output_dir': output_dir}
     _analyze(inputs_path, options=options)
+
+
+@cli.command(name='build-resource-bundle')
+@click.option('--directory', default=None,
+              help='Directory in which to put the bundle. Defaults to '
+                   '$EEMETER_RESOURCE_BUNDLE_DIRECTORY or the installed '
+                   'eemeter/resources/bundle directory.')
+def build_bundle(directory):
+    directory = build_resource_bundle(directory)
+    print("Built resource bundle in {}".format(directory))
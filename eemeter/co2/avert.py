@@ -1,10 +1,19 @@
 import logging
+import os
 
+import numpy as np
+
+from eemeter.lazy import lazy_import
 from .clients import AVERTClient
 from .cache import SqlCO2Store
 
+interpolate = lazy_import('scipy.interpolate')
+
 logger = logging.getLogger(__name__)
 
+# Process-wide AVERTSource instances, keyed by (year, region, cache_url).
+avert_sources = {}
+
 
 class AVERTSource(object):
 
@@ -14,6 +23,10 @@ class AVERTSource(object):
         self.year = year
         self.region = region
         self.co2_store = SqlCO2Store(cache_url)
+        self._co2_data = None
+        self._co2_interpolator = None
+        self._normal_year_load = None
+        self._normal_year_co2 = None
         self._check_for_data()
 
     def _check_for_data(self):
@@ -24,8 +37,147 @@ class AVERTSource(object):
                 self.co2_store.save_json(self.year, self.region,
                                          co2_by_load, load_by_hour)
 
+    def has_data(self):
+        return self.co2_store.key_exists(self.year, self.region)
+
+    def get_co2_data(self):
+        ''' Return `(co2_by_load, load_by_hour)`. Decoded once from the
+        cache and then held on this instance.
+        '''
+        if self._co2_data is None:
+            co2_data = self.co2_store.retrieve(self.year, self.region)
+            if co2_data[0] is None:
+                return co2_data
+            self._co2_data = co2_data
+        return self._co2_data
+
     def get_co2_by_load(self):
-        return self.co2_store.retrieve_co2_by_load(self.year, self.region)
+        return self.get_co2_data()[0]
 
     def get_load_by_hour(self):
-        return self.co2_store.retrieve_load_by_hour(self.year, self.region)
\ No newline at end of file
+        return self.get_co2_data()[1]
+
+    def get_co2_interpolator(self):
+        ''' Return a function mapping regional load to CO2 emissions by
+        linear interpolation over the load-bin curve. Built once and then
+        held on this instance.
+        '''
+        if self._co2_interpolator is None:
+            co2_by_load = self.get_co2_by_load()
+            if co2_by_load is None:
+                return None
+            self._co2_interpolator = interpolate.interp1d(
+                co2_by_load.index, co2_by_load.values)
+        return self._co2_interpolator
+
+    def get_normal_year_load_by_hour(self):
+        ''' Return regional load by hour with February 29 dropped, so that it
+        aligns with normal year (8760 hour) resource curves.
+        '''
+        if self._normal_year_load is None:
+            load_by_hour = self.get_load_by_hour()
+            if load_by_hour is None:
+                return None
+            self._normal_year_load = load_by_hour[~(
+                (load_by_hour.index.day == 29) &
+                (load_by_hour.index.month == 2))]
+        return self._normal_year_load
+
+    def get_normal_year_co2(self):
+        ''' Return CO2 emissions by hour for the normal year regional load,
+        i.e., before any resource curve is subtracted.
+        '''
+        if self._normal_year_co2 is None:
+            load_by_hour = self.get_normal_year_load_by_hour()
+            if load_by_hour is None:
+                return None
+            f = self.get_co2_interpolator()
+            self._normal_year_co2 = f(load_by_hour.values)
+        return self._normal_year_co2
+
+    def get_co2_avoided(self, resource_curves):
+        ''' Compute avoided CO2 emissions for a stack of normal year resource
+        curves from traces in this region. Baseline emissions are computed
+        once per source, and post-intervention emissions in a single
+        interpolation over the whole stack.
+
+        Parameters
+        ----------
+        resource_curves : array_like, shape (n_hours,) or (n_traces, n_hours)
+            Hourly load reductions, aligned with
+            :any:`get_normal_year_load_by_hour`.
+
+        Returns
+        -------
+        co2_avoided : numpy.ndarray, same shape as `resource_curves`
+            Avoided CO2 emissions by hour. For a stack of curves, rows with
+            post-intervention load outside the range of the AVERT load bins
+            are NaN; a single such curve raises ValueError.
+        '''
+        load_by_hour = self.get_normal_year_load_by_hour()
+        if load_by_hour is None:
+            raise ValueError(
+                'No AVERT data for {} {}.'.format(self.year, self.region))
+
+        resource_curves = np.asarray(resource_curves, dtype=float)
+        curves = np.atleast_2d(resource_curves)
+        if curves.ndim != 2 or curves.shape[1] != len(load_by_hour):
+            raise ValueError(
+                'Expected resource curves of length {}, got shape {}.'
+                .format(len(load_by_hour), resource_curves.shape))
+
+        f = self.get_co2_interpolator()
+        co2_pre = self.get_normal_year_co2()
+        load_post = load_by_hour.values[np.newaxis, :] - curves
+
+        # interp1d rejects the whole call if any value is out of bounds, so
+        # only interpolate the rows that are within range.
+        load_bins = f.x
+        with np.errstate(invalid='ignore'):
+            out_of_bounds = (load_post < load_bins[0]) | \
+                (load_post > load_bins[-1])
+        valid = ~out_of_bounds.any(axis=1)
+        if resource_curves.ndim == 1 and not valid[0]:
+            raise ValueError('Post-intervention load outside AVERT load bins.')
+
+        co2_avoided = np.full(curves.shape, np.nan)
+        if valid.any():
+            co2_avoided[valid] = co2_pre - f(load_post[valid])
+        return co2_avoided.reshape(resource_curves.shape)
+
+
+def get_avert_source(year, region, cache_url=None):
+    ''' Return the process-wide :any:`AVERTSource` for a year and region,
+    creating it on first use. Sources are only kept once their data is in
+    the cache, so a failed download is retried on the next call.
+
+    Parameters
+    ----------
+    year : int
+        AVERT data year.
+    region : str
+        AVERT region.
+    cache_url : str, default None
+        SqlCO2Store database URL; defaults to `EEMETER_CO2_CACHE_URL` or
+        the store's default.
+
+    Returns
+    -------
+    avert_source : eemeter.co2.avert.AVERTSource
+    '''
+    if cache_url is None:
+        cache_url = os.environ.get("EEMETER_CO2_CACHE_URL")
+    key = (year, region, cache_url)
+
+    avert_source = avert_sources.get(key, None)
+    if avert_source is None:
+        avert_source = AVERTSource(year, region, cache_url)
+        if avert_source.has_data():
+            avert_sources[key] = avert_source
+    return avert_source
+
+
+def clear_avert_source_cache():
+    ''' Drop all process-wide :any:`AVERTSource` instances.
+    '''
+    avert_sources.clear()
@@ -1,18 +1,30 @@
 import os
-import json
-from sqlalchemy import (
-    create_engine,
-    Table,
-    MetaData,
-    Column,
-    Integer,
-    String,
-)
-from sqlalchemy.sql import select
+
+import numpy as np
 import pandas as pd
 
+from eemeter.lazy import lazy_import
+
+sqlalchemy = lazy_import('sqlalchemy')
+
+
+def _to_blob(values):
+    return np.asarray(values, dtype='<f8').tobytes()
+
+
+def _from_blob(blob):
+    return np.frombuffer(blob, dtype='<f8').copy()
+
 
 class SqlCO2Store(object):
+    ''' Cache of AVERT regional data, stored as typed arrays.
+
+    Each (year, region) row holds the load-bin curve as two float arrays
+    (load bins and CO2 per bin, sorted by load) and the regional load as a
+    float array on a regular grid starting at a fixed origin, so retrieval
+    is a pair of ``np.frombuffer`` calls rather than JSON decoding and
+    timestamp parsing.
+    '''
 
     def __init__(self, url=None):
         self._prepare_db(url)
@@ -35,76 +47,143 @@ class SqlCO2Store(object):
 
         self.url = url
 
-        eng = create_engine(url)
-        metadata = MetaData(eng)
+        eng = sqlalchemy.create_engine(url)
+        metadata = sqlalchemy.MetaData(eng)
 
-        tbl_items = Table(
-            "items",
+        tbl_items = sqlalchemy.Table(
+            "avert_arrays",
             metadata,
-            Column("id", Integer, primary_key=True),
-            Column("year", Integer),
-            Column("region", String),
-            Column("co2_by_load", String),
-            Column("load_by_hour", String)
+            sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("year", sqlalchemy.Integer),
+            sqlalchemy.Column("region", sqlalchemy.String),
+            sqlalchemy.Column("load_bins", sqlalchemy.LargeBinary),
+            sqlalchemy.Column("co2_by_load", sqlalchemy.LargeBinary),
+            sqlalchemy.Column("load_origin", sqlalchemy.String),
+            sqlalchemy.Column("load_step_seconds", sqlalchemy.Integer),
+            sqlalchemy.Column("load_by_hour", sqlalchemy.LargeBinary),
         )
 
         tbl_items.create(checkfirst=True)
 
         self.items = tbl_items
 
+    def _where(self, year, region):
+        return ((self.items.c.year == year) &
+                (self.items.c.region == region))
+
     def key_exists(self, year, region):
-        s = select([self.items.c.year, self.items.c.region]).where(
-            (self.items.c.year == year) & (self.items.c.region == region))
+        s = sqlalchemy.select([self.items.c.year, self.items.c.region]).where(
+            self._where(year, region))
         result = s.execute()
         return result.fetchone() is not None
 
-    def save_json(self, year, region, co2_by_load, load_by_hour):
-        co2_by_load = json.dumps({str(k): v for k, v in
-                                  co2_by_load.to_dict().items()})
-        load_by_hour = json.dumps({str(k): v for k, v in
-                                   load_by_hour.to_dict().items()})
+    def save(self, year, region, co2_by_load, load_by_hour):
+        ''' Save AVERT data for a region and year.
+
+        Parameters
+        ----------
+        year : int
+            AVERT data year.
+        region : str
+            AVERT region.
+        co2_by_load : pandas.Series
+            CO2 emissions indexed by regional load bin.
+        load_by_hour : pandas.Series
+            Regional load indexed by timestamp. Stored on a regular grid at
+            its smallest timestamp spacing; any gaps are stored as NaN. Of
+            duplicated timestamps, the last value is stored.
+        '''
+        co2_by_load = co2_by_load.sort_index()
+
+        load_by_hour = load_by_hour[
+            ~load_by_hour.index.duplicated(keep='last')].sort_index()
+        if len(load_by_hour) > 1:
+            step = np.diff(load_by_hour.index.values).min()
+            step = pd.Timedelta(step)
+            grid = pd.date_range(load_by_hour.index[0],
+                                 load_by_hour.index[-1], freq=step)
+            load_by_hour = load_by_hour.reindex(grid)
+            step_seconds = int(step.total_seconds())
+        else:
+            step_seconds = 3600
+        if len(load_by_hour) > 0:
+            load_origin = load_by_hour.index[0].isoformat()
+        else:
+            load_origin = None
+
+        values = dict(
+            year=year,
+            region=region,
+            load_bins=_to_blob(co2_by_load.index.values),
+            co2_by_load=_to_blob(co2_by_load.values),
+            load_origin=load_origin,
+            load_step_seconds=step_seconds,
+            load_by_hour=_to_blob(load_by_hour.values),
+        )
         if self.key_exists(year, region):
             s = self.items.update().where(
-                (self.items.c.year == year) &
-                (self.items.c.region == region)).values(
-                year=year, region=region, co2_by_load=co2_by_load,
-                load_by_hour=load_by_hour)
+                self._where(year, region)).values(**values)
         else:
-            s = self.items.insert().values(
-                year=year, region=region, co2_by_load=co2_by_load,
-                load_by_hour=load_by_hour)
+            s = self.items.insert().values(**values)
         s.execute()
 
-    def retrieve_co2_by_load(self, year, region):
-        s = select([self.items.c.co2_by_load]).where(
-            (self.items.c.year == year) & (self.items.c.region == region))
+    # Kept for callers of the previous JSON-backed store.
+    save_json = save
+
+    def retrieve(self, year, region):
+        ''' Retrieve AVERT data for a region and year.
+
+        Parameters
+        ----------
+        year : int
+            AVERT data year.
+        region : str
+            AVERT region.
+
+        Returns
+        -------
+        co2_by_load, load_by_hour : tuple of pandas.Series or (None, None)
+            CO2 emissions indexed by load bin (sorted), and regional load
+            indexed by timestamp, or `(None, None)` if nothing is stored.
+        '''
+        s = sqlalchemy.select([
+            self.items.c.load_bins,
+            self.items.c.co2_by_load,
+            self.items.c.load_origin,
+            self.items.c.load_step_seconds,
+            self.items.c.load_by_hour,
+        ]).where(self._where(year, region))
         result = s.execute()
         data = result.fetchone()
         if data is None:
-            return None
+            return None, None
+
+        (load_bins, co2_by_load, load_origin, load_step_seconds,
+         load_by_hour) = data
+
+        co2_by_load = pd.Series(_from_blob(co2_by_load),
+                                index=_from_blob(load_bins))
+
+        load_values = _from_blob(load_by_hour)
+        if load_origin is None:
+            index = pd.DatetimeIndex([])
         else:
-            this_json = json.loads(data[0])
-            k = list(this_json.keys())
-            v = [this_json[i] for i in k]
-            k = [float(i) for i in k]
-            return pd.Series(v, index=k).sort_index()
+            index = pd.date_range(
+                pd.Timestamp(load_origin), periods=len(load_values),
+                freq=pd.Timedelta(seconds=load_step_seconds))
+        load_by_hour = pd.Series(load_values, index=index)
+
+        return co2_by_load, load_by_hour
+
+    def retrieve_co2_by_load(self, year, region):
+        return self.retrieve(year, region)[0]
 
     def retrieve_load_by_hour(self, year, region):
-        s = select([self.items.c.load_by_hour]).where(
-            (self.items.c.year == year) & (self.items.c.region == region))
-        result = s.execute()
-        data = result.fetchone()
-        if data is None:
-            return None
-        else:
-            this_json = json.loads(data[0])
-            k = list(this_json.keys())
-            v = [this_json[i] for i in k]
-            return pd.Series(v, index=pd.to_datetime(k)).sort_index()
+        return self.retrieve(year, region)[1]
 
-    def clear(self, key=None):
-        if key is None:
+    def clear(self, year=None, region=None):
+        if year is None and region is None:
             s = self.items.delete()
         else:
-            s = self.items.delete().where(self.items.c.key == key)
+            s = self.items.delete().where(self._where(year, region))
         s.execute()
@@ -1,12 +1,15 @@
 from io import BytesIO
 import logging
-from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
-import requests
 import zipfile
-import xlrd
+
+from eemeter.lazy import lazy_import
+
+requests = lazy_import('requests')
+xlrd = lazy_import('xlrd')
 
 logger = logging.getLogger(__name__)
 
@@ -83,43 +86,48 @@ class AVERTClient(object):
                 maxsheet, maxcol = idx, wb.sheet_by_index(idx).ncols
         sheet = wb.sheet_by_index(maxsheet)
 
+        return self._parse_rdf_sheet(sheet)
+
+    def _sheet_to_array(self, sheet, start_row, end_row, start_col, end_col):
+        # Read a block of cells into a 2-D float array in one pass; empty
+        # cells ('') become NaN.
+        end_row = min(end_row, sheet.nrows)
+        cells = np.array([
+            sheet.row_values(i, start_col, end_col)
+            for i in range(start_row, end_row)
+        ], dtype=object).reshape(-1, end_col - start_col)
+        cells[cells == ''] = np.nan
+        return cells.astype(float)
+
+    def _parse_rdf_sheet(self, sheet):
         # Find the number of load bins
-        nbins = maxcol - 15
+        nbins = sheet.ncols - 15
 
         # Grab the load bins, and sum up the CO2 emissions per bin
         load_bins = sheet.row_values(1)[15:15+nbins]
-        co2_sums = []
-        for col in range(15, 15+nbins):
-            this_co2_sum = sum([i for i in sheet.col_values(col)[10004:11999]
-                                if i != ''])
-            co2_sums.append(this_co2_sum)
+        co2 = self._sheet_to_array(sheet, 10004, 11999, 15, 15+nbins)
+        co2_sums = np.nansum(co2, axis=0)
 
         # Make the CO2 per bin into a series
         co2_by_load = pd.Series(co2_sums, index=load_bins)
 
-        # Now read in the regional load by hour
-        idx = 3
-        timestamp, regional_load = [], []
-        yrs = sheet.col_values(1)
-        mos = sheet.col_values(2)
-        das = sheet.col_values(3)
-        hrs = sheet.col_values(4)
-        rls = sheet.col_values(5)
-        while True:
-            if yrs[idx] == '':
-                break
-            yr = int(yrs[idx])
-            mo = int(mos[idx])
-            da = int(das[idx])
-            hr = int(hrs[idx])
-            rl = rls[idx]
-            ts = datetime(year=yr, month=mo, day=da, hour=hr)
-            timestamp.append(ts)
-            regional_load.append(rl)
-            idx = idx + 1
+        # Now read in the regional load by hour, which runs from the fourth
+        # row until the first row without a year.
+        missing_year = np.array(sheet.col_values(1, 3), dtype=object) == ''
+        if missing_year.any():
+            nhours = np.argmax(missing_year)
+        else:
+            nhours = len(missing_year)
+        hourly = self._sheet_to_array(sheet, 3, 3+nhours, 1, 6)
+        timestamp = pd.to_datetime(pd.DataFrame({
+            'year': hourly[:, 0].astype(int),
+            'month': hourly[:, 1].astype(int),
+            'day': hourly[:, 2].astype(int),
+            'hour': hourly[:, 3].astype(int),
+        }))
 
         # Convert it to a series
-        load_by_hour = pd.Series(regional_load, index=timestamp)
+        load_by_hour = pd.Series(hourly[:, 4], index=timestamp.values)
 
         # And return the two series.
         return co2_by_load, load_by_hour
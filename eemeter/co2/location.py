@@ -1,20 +1,32 @@
 import json
-from pkg_resources import resource_stream
+
+from eemeter.lazy import lazy_import
+from eemeter.resources.bundle import load_bundled_resource
+from eemeter.weather.location import _load_lookup_table, _lookup_many
+
+pkg_resources = lazy_import('pkg_resources')
 
 
 resources = {}
 
 
 def _get_json_resource(filename):
-    with resource_stream('eemeter.resources', filename) as f:
+    with pkg_resources.resource_stream('eemeter.resources', filename) as f:
         resource = json.loads(f.read().decode('utf-8'))
     return resource
 
 
+def _get_resource(filename):
+    resource = load_bundled_resource(filename)
+    if resource is None:
+        resource = _get_json_resource(filename)
+    return resource
+
+
 def _load_resource(name, filename):
     global resources
     if resources.get(name, None) is None:
-        resources[name] = _get_json_resource(filename)
+        resources[name] = _get_resource(filename)
     return resources[name]
 
 
@@ -46,3 +58,23 @@ def zipcode_to_avert_region(zipcode):
     if region is None:
         return None
     return region
+
+
+def zipcodes_to_avert_regions(zipcodes):
+    """Return the AVERT regions for an array of ZIP codes. Vectorized version
+    of :any:`zipcode_to_avert_region`.
+
+    Parameters
+    ----------
+    zipcodes : array_like of str
+        Strings representing USPS ZIP codes.
+
+    Returns
+    -------
+    regions : numpy.ndarray of str or None
+        Strings representing AVERT regions, or None where no region was
+        found.
+    """
+    return _lookup_many(_load_lookup_table(
+        'zipcode_to_avert_region_table', _load_zipcode_to_avert_region
+    ), zipcodes)
@@ -14,7 +14,6 @@ from eemeter.processors.location import (
 )
 
 from eemeter.modeling.models import HourlyLoadProfileModel
-from scipy import interpolate
 
 logger = logging.getLogger(__name__)
 
@@ -1310,22 +1309,10 @@ def normal_year_co2_avoided(deriv_input, resource_curve):
         return None
 
     try:
-        co2_by_load = avert.get_co2_by_load()
-        load_by_hour = avert.get_load_by_hour()
-        load_by_hour = load_by_hour[~(
-            (load_by_hour.index.day == 29) &
-            (load_by_hour.index.month == 2))]
-
-        # Calculate the pre-intervention CO2 emissions
-        f = interpolate.interp1d(co2_by_load.index, co2_by_load.values)
-        co2_pre = f(load_by_hour.values)
-
-        # Calculate the post-internention load and CO2 emissions
-        load_post = load_by_hour.values - resource_curve.values
-        co2_post = f(load_post)
+        co2_avoided = avert.get_co2_avoided(resource_curve.values)
 
         # Return the savings
-        avoided_emissions = pd.Series(co2_pre - co2_post,
+        avoided_emissions = pd.Series(co2_avoided,
                                       index=resource_curve.index)
 
         return {
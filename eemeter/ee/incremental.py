@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from eemeter.ee.derivatives import (
+    cumulative_baseline_model_reporting_period,
+    baseline_model_reporting_period,
+    masked_baseline_model_reporting_period,
+    cumulative_baseline_model_minus_observed_reporting_period,
+    baseline_model_minus_observed_reporting_period,
+    masked_baseline_model_minus_observed_reporting_period,
+    cumulative_observed_reporting_period,
+    observed_reporting_period,
+    masked_observed_reporting_period,
+    temperature_reporting_period,
+    masked_temperature_reporting_period,
+    reporting_mask,
+)
+
+
+class _AppendedPredictions(object):
+    # Stands in for the baseline model in derivative inputs, answering
+    # with the predictions accumulated so far instead of predicting again.
+
+    def __init__(self, reporting_period):
+        self.reporting_period = reporting_period
+
+    def predict(self, demand_fixture_data, params=None, summed=True):
+        if summed:
+            return (self.reporting_period.predicted_total,
+                    self.reporting_period.variance_total)
+        return (self.reporting_period.predicted,
+                self.reporting_period.variance)
+
+
+class IncrementalReportingPeriod(object):
+    ''' Reporting period of a single trace, evaluated incrementally as new
+    usage data arrives.
+
+    Holds the fitted baseline model and, for every reporting period day (or
+    hour) appended so far, observed usage, temperature, baseline model
+    prediction and variance and the inclusion mask, along with running
+    totals of the baseline model prediction and variance. Appending new
+    data fetches weather and predicts for the new rows only, instead of
+    re-running :any:`eemeter.ee.meter.EnergyEfficiencyMeter.evaluate` over
+    the whole trace.
+
+    Parameters
+    ----------
+    baseline_model : object
+        Fitted baseline model.
+    formatter : eemeter.modeling.formatters.FormatterBase
+        Formatter used to fit the model, to create demand fixtures.
+    weather_source : eemeter.weather.WeatherSourceBase
+        Source of reporting period weather data.
+    derivative_freq : str, default 'D'
+        Frequency of appended data, 'D' or 'H'. Periods missing from
+        appended data are masked, as in
+        :any:`eemeter.ee.derivatives.unpack`.
+    '''
+
+    def __init__(self, baseline_model, formatter, weather_source,
+                 derivative_freq='D'):
+        if derivative_freq not in ['D', 'H']:
+            raise ValueError(
+                "derivative_freq must be 'D' or 'H', not {!r}."
+                .format(derivative_freq))
+        self.baseline_model = baseline_model
+        self.formatter = formatter
+        self.weather_source = weather_source
+        self.derivative_freq = derivative_freq
+
+        index = pd.DatetimeIndex([], tz='UTC')
+        self.observed = pd.Series([], index=index, dtype=float)
+        self.tempF = pd.Series([], index=index, dtype=float)
+        self.predicted = pd.Series([], index=index, dtype=float)
+        self.variance = pd.Series([], index=index, dtype=float)
+        self.mask = pd.Series([], index=index, dtype=bool)
+
+        self.predicted_total = 0.0
+        self.variance_total = 0.0
+
+    def __repr__(self):
+        return 'IncrementalReportingPeriod({}, n={})'.format(
+            self.baseline_model, len(self.observed))
+
+    @classmethod
+    def from_modeled_trace(cls, modeled_trace, baseline_label,
+                           weather_source, derivative_freq='D'):
+        ''' Incremental reporting period for the baseline model of a fitted
+        :any:`eemeter.modeling.split.SplitModeledEnergyTrace`.
+        '''
+        outputs = modeled_trace.fit_outputs.get(baseline_label)
+        if outputs is None or outputs["status"] != "SUCCESS":
+            raise ValueError(
+                'Baseline model for {} was not fit successfully.'
+                .format(baseline_label))
+        return cls(modeled_trace.model_mapping[baseline_label],
+                   modeled_trace.formatter, weather_source,
+                   derivative_freq=derivative_freq)
+
+    def append(self, observed):
+        ''' Appends new reporting period usage.
+
+        Parameters
+        ----------
+        observed : pandas.Series
+            Usage for periods (at `derivative_freq`) following those
+            already appended, indexed by period start. Missing usage is
+            NaN; periods skipped since the last appended period are
+            treated as missing.
+        '''
+        observed = observed.sort_index()
+        if len(observed) == 0:
+            return
+        if len(self.observed) > 0:
+            if observed.index[0] <= self.observed.index[-1]:
+                raise ValueError(
+                    'Appended data must follow {}.'
+                    .format(self.observed.index[-1].isoformat()))
+            start = self.observed.index[-1] + \
+                to_offset(self.derivative_freq)
+        else:
+            start = observed.index[0]
+
+        index = pd.date_range(start, observed.index[-1],
+                              freq=self.derivative_freq)
+        if not observed.index.isin(index).all():
+            raise ValueError(
+                'Appended data must be indexed at frequency {!r}.'
+                .format(self.derivative_freq))
+        observed = observed.reindex(index)
+
+        demand_fixture_data = self.formatter.create_demand_fixture(
+            observed.index, self.weather_source)
+        predicted, variance = self.baseline_model.predict(
+            demand_fixture_data, summed=False)
+        predicted_total, variance_total = self.baseline_model.predict(
+            demand_fixture_data, summed=True)
+
+        tempF = demand_fixture_data.tempF.reindex(observed.index)
+        mask = pd.Series(
+            np.asarray(pd.isnull(observed)) | np.asarray(pd.isnull(tempF)),
+            index=observed.index)
+
+        self.observed = pd.concat([self.observed, observed.astype(float)])
+        self.tempF = pd.concat([self.tempF, tempF])
+        self.predicted = pd.concat(
+            [self.predicted, predicted.reindex(observed.index)])
+        self.variance = pd.concat(
+            [self.variance, variance.reindex(observed.index)])
+        self.mask = pd.concat([self.mask, mask])
+
+        self.predicted_total += predicted_total
+        self.variance_total += variance_total
+
+    def derivatives(self):
+        ''' Reporting period derivatives which depend only on the baseline
+        model and observed data, from
+        :any:`eemeter.ee.derivatives`, over all data appended so far.
+
+        Returns
+        -------
+        derivatives : list of dict
+            Derivatives in the format of the :any:`eemeter.ee.derivatives`
+            functions, skipping any that fail.
+        '''
+        fixture = pd.DataFrame({'tempF': self.tempF}, index=self.tempF.index)
+        deriv_input = {
+            'weather_source_success': self.weather_source is not None,
+            'baseline_model_success': True,
+            'baseline_model': _AppendedPredictions(self),
+            'reporting_period_fixture': fixture,
+            'reporting_period_fixture_success': len(fixture) > 0,
+            'unmasked_reporting_period_fixture': fixture,
+            'reporting_period_data': self.observed,
+            'reporting_mask': self.mask,
+        }
+        derivatives = [
+            cumulative_baseline_model_reporting_period(deriv_input),
+            baseline_model_reporting_period(deriv_input),
+            masked_baseline_model_reporting_period(deriv_input),
+            cumulative_baseline_model_minus_observed_reporting_period(
+                deriv_input),
+            baseline_model_minus_observed_reporting_period(deriv_input),
+            masked_baseline_model_minus_observed_reporting_period(
+                deriv_input),
+            cumulative_observed_reporting_period(deriv_input),
+            observed_reporting_period(deriv_input),
+            masked_observed_reporting_period(deriv_input),
+            temperature_reporting_period(deriv_input),
+            masked_temperature_reporting_period(deriv_input),
+            reporting_mask(deriv_input),
+        ]
+        return [d for d in derivatives if d is not None]
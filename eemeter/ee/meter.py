@@ -92,6 +92,9 @@ class EnergyEfficiencyMeter(object):
     default_model_mapping : dict
         mapping between (interpretation, frequency) tuples used to select
         the default model (if none is explicitly provided in `.evaluate()`).
+    model_store : eemeter.modeling.store.SqlModelStore, default None
+        Store of fitted models, to reload fits of unchanged data (e.g. a
+        frozen baseline period) instead of refitting them in `.evaluate()`.
 
     '''
 
@@ -102,6 +105,7 @@ class EnergyEfficiencyMeter(object):
         default_formatter_mapping = kwargs.get('default_formatter_mapping', None)
         weather_station_mapping = kwargs.get('weather_station_mapping', 'default')
         weather_normal_station_mapping = kwargs.get('weather_normal_station_mapping', 'default')
+        self.model_store = kwargs.get('model_store', None)
 
         if default_formatter_mapping is None:
             daily_formatter = (ModelDataFormatter, {'freq_str': 'D'})
@@ -528,7 +532,8 @@ class EnergyEfficiencyMeter(object):
         }
 
         modeled_trace = SplitModeledEnergyTrace(
-            trace, formatter_instance, model_mapping, modeling_period_set)
+            trace, formatter_instance, model_mapping, modeling_period_set,
+            model_store=self.model_store)
 
         modeled_trace.fit(weather_source)
         output["modeled_energy_trace"] = \
@@ -54,7 +54,7 @@ def _serialize_model_fit(model_fit):
         for k, v in model_fit.get("model_params", {}).items():
             if isinstance(v, type({})):
                 model_params[k] = OrderedDict(v)
-            elif k == 'X_design_info':
+            elif k in ('X_design_info', 'fitted'):
                 continue
             else:
                 model_params[k] = v
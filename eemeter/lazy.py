@@ -0,0 +1,37 @@
+import importlib
+
+
+class LazyModule(object):
+    ''' Module proxy which defers the actual import until an attribute is
+    first accessed. Used for heavy optional-at-import-time dependencies
+    (statsmodels, scikit-learn, scipy submodules, xlrd, holidays,
+    SQLAlchemy) so that `import eemeter...` stays cheap for callers which
+    never reach the code paths that need them.
+
+    Parameters
+    ----------
+    name : str
+        Absolute name of the module to import, e.g.
+        `'statsmodels.formula.api'`.
+    '''
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def __repr__(self):
+        return 'LazyModule("{}")'.format(self._name)
+
+    def _load(self):
+        if self._module is None:
+            self.__dict__['_module'] = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def lazy_import(name):
+    ''' Return a :any:`LazyModule` for the module `name`.
+    '''
+    return LazyModule(name)
@@ -1,5 +1,6 @@
 from eemeter.modeling.models.caltrack import CaltrackMonthlyModel
 from eemeter.modeling.models.caltrack_daily import CaltrackDailyModel
+from eemeter.modeling.models.caltrack_helpers import CaltrackFit
 from eemeter.modeling.models.seasonal import SeasonalElasticNetCVModel
 from eemeter.modeling.models.billing import BillingElasticNetCVModel
 from eemeter.modeling.models.hourly_load_profile import HourlyLoadProfileModel
@@ -8,6 +9,7 @@ from eemeter.modeling.models.hourly_model import HourlyDayOfWeekModel
 __all__ = (
     'CaltrackMonthlyModel',
     'CaltrackDailyModel',
+    'CaltrackFit',
     'SeasonalElasticNetCVModel',
     'BillingElasticNetCVModel',
     'HourlyLoadProfileModel',
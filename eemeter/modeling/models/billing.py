@@ -16,13 +16,17 @@ class BillingElasticNetCVModel(ElasticNetCVBaseModel):
         Base temperature (degrees F) used in calculating heating degree days.
     n_bootstrap : int
         Number of points to exclude during bootstrap error estimation.
+    n_jobs : int, default 1
+        Number of processes to fit bootstrap error estimation splits in
+        (-1 for all processors).
     '''
 
     def __init__(self, cooling_base_temp=65, heating_base_temp=65,
-                 n_bootstrap=100, modeling_period_interpretation='baseline'):
+                 n_bootstrap=100, modeling_period_interpretation='baseline',
+                 n_jobs=1):
 
         super(BillingElasticNetCVModel, self).__init__(
-            cooling_base_temp, heating_base_temp, n_bootstrap)
+            cooling_base_temp, heating_base_temp, n_bootstrap, n_jobs=n_jobs)
         self.modeling_period_interpretation = modeling_period_interpretation
 
     def __repr__(self):
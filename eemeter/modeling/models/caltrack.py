@@ -1,10 +1,14 @@
-import copy
 import numpy as np
 import pandas as pd
-import patsy
 import eemeter.modeling.exceptions as model_exceptions
+from eemeter.lazy import lazy_import
 from eemeter.modeling.models.caltrack_helpers import \
-    _fit_intercept, _fit_cdd_only, _fit_hdd_only, _fit_full
+    _fit_intercept, _fit_cdd_only, _fit_hdd_only, _fit_full, \
+    BalancePointSearch, CaltrackFit, _average_degree_days, \
+    _balance_point_grid, _bp_column, _normalize_bp, \
+    _degree_day_balance_points
+
+patsy = lazy_import('patsy')
 
 
 class CaltrackMonthlyModel(object):
@@ -20,20 +24,37 @@ class CaltrackMonthlyModel(object):
     determined by maximizing R^2 across the range 50-85 degF. Otherwise,
     70 and 60 degF are used for cooling and heating, respectively.
 
+    The grid search covers bp_cdd_range and bp_hdd_range (inclusive, degF).
+    bp_search selects how: 'exhaustive' fits every balance point on a grid
+    spaced by bp_resolution, while 'coarse_to_fine' and 'golden_section'
+    (see :any:`BalancePointSearch`) fit far fewer candidates, which makes
+    sub-degree bp_resolution and wider ranges affordable. The number of
+    candidates evaluated is reported as n_bp_candidates.
+
     Min_contiguous_months sets the number of contiguous months of data
     required at the beginning of the reporting period/end of the baseline
     period in order for the weather normalization to be valid.
+
+    After fitting, only the compact fit (:any:`CaltrackFit`, in
+    :code:`params["fitted"]`) and its statistics are kept; the input data,
+    design matrices and statsmodels results are released unless
+    keep_training_data is True.
     '''
     def __init__(
             self, fit_cdd=True, grid_search=False,
             min_contiguous_baseline_months=12,
             min_contiguous_reporting_months=12,
             modeling_period_interpretation='baseline',
-            weighted=False, **kwargs):  # ignore extra args
+            weighted=False, bp_search='exhaustive', bp_resolution=1,
+            bp_cdd_range=(65, 75), bp_hdd_range=(55, 65),
+            keep_training_data=False,
+            **kwargs):  # ignore extra args
         self.fit_cdd = fit_cdd
         self.grid_search = grid_search
         self.model_freq = pd.tseries.frequencies.MonthEnd()
         self.params = None
+        self.fitted = None
+        self.df = None
         self.X = None
         self.y = None
         self.estimated = None
@@ -42,15 +63,30 @@ class CaltrackMonthlyModel(object):
         self.cvrmse = None
         self.n = None
         self.input_data = None
+        self.model_obj = None
+        self.model_res = None
+        self.keep_training_data = keep_training_data
         self.fit_bp_hdd, self.fit_bp_cdd = None, None
         self.min_contiguous_baseline_months = min_contiguous_baseline_months
         self.min_contiguous_reporting_months = min_contiguous_reporting_months
         self.modeling_period_interpretation = modeling_period_interpretation
         self.weighted = weighted
+        self.n_bp_candidates = None
 
-        if grid_search:
-            self.bp_cdd = range(65, 76)
-            self.bp_hdd = range(55, 66)
+        if bp_search not in BalancePointSearch.methods:
+            raise ValueError(
+                'Unknown balance point search method {}'.format(bp_search))
+        self.bp_search = bp_search
+        self.bp_resolution = bp_resolution
+
+        if grid_search and bp_search == 'exhaustive':
+            self.bp_cdd = _balance_point_grid(*bp_cdd_range, resolution=bp_resolution)
+            self.bp_hdd = _balance_point_grid(*bp_hdd_range, resolution=bp_resolution)
+        elif grid_search:
+            # Only the ends of the ranges are formatted up front; the search
+            # computes the other balance points it visits.
+            self.bp_cdd = [_normalize_bp(bp) for bp in bp_cdd_range]
+            self.bp_hdd = [_normalize_bp(bp) for bp in bp_hdd_range]
         else:
             self.bp_cdd, self.bp_hdd = [70, ], [60, ]
 
@@ -60,6 +96,12 @@ class CaltrackMonthlyModel(object):
     def billing_to_monthly_avg(self, trace_and_temp):
         ''' Helper function to handle monthly billing or other irregular data.
         '''
+        return self._billing_to_monthly_avg(trace_and_temp)[0]
+
+    def _billing_to_monthly_avg(self, trace_and_temp):
+        # Billing period data frame, and the daily temperatures and window
+        # of days of each period to average degree days over (see
+        # _average_degree_days).
         (energy_data, temp_data) = trace_and_temp
 
         # Handle empty series
@@ -86,191 +128,159 @@ class CaltrackMonthlyModel(object):
             raise model_exceptions.DataSufficiencyException(
                 "No temperature data after resampling")
 
-        # get daily mean values
-        upd_data_daily_mean_values = [
-            value / (e - s).days for value, s, e in
-            zip(energy_data, energy_data.index, energy_data.index[1:])
-        ] + [np.nan]  # add missing last data point, which is null by convention anyhow
-        usage_data_daily_mean_values = [
-            value for value, s, e in
-            zip(energy_data, energy_data.index, energy_data.index[1:])
-        ] + [np.nan]  # add missing last data point, which is null by convention anyhow
-
-        # Create arrays to hold computed CDD and HDD for each
-        # balance point temperature.
-        cdd = {i: [0] for i in self.bp_cdd}
-        hdd = {i: [0] for i in self.bp_hdd}
-        for bp in self.bp_cdd:
-            cdd[bp] = pd.Series(
-                np.maximum(temp_data_daily - bp, 0),
-                index=temp_data_daily.index)
-        for bp in self.bp_hdd:
-            hdd[bp] = pd.Series(
-                np.maximum(bp - temp_data_daily, 0),
-                index=temp_data_daily.index)
-
-        ndays_data_daily_mean_values = []
-        hdd_data_daily_mean_values = {}
-        cdd_data_daily_mean_values = {}
-
-        for s, e in zip(energy_data.index, energy_data.index[1:]):
-            thisn = np.sum(np.isfinite(temp_data_daily[s:e]))
-            ndays_data_daily_mean_values.append(thisn)
-            if thisn >= 15:
-                for bp in self.bp_cdd:
-                    thismean = np.nanmean(cdd[bp][s:e])
-                    if bp not in cdd_data_daily_mean_values.keys():
-                        cdd_data_daily_mean_values[bp] = []
-                    cdd_data_daily_mean_values[bp].append(thismean)
-                for bp in self.bp_hdd:
-                    thismean = np.nanmean(hdd[bp][s:e])
-                    if bp not in hdd_data_daily_mean_values.keys():
-                        hdd_data_daily_mean_values[bp] = []
-                    hdd_data_daily_mean_values[bp].append(thismean)
-            else:
-                for bp in self.bp_cdd:
-                    if bp not in cdd_data_daily_mean_values.keys():
-                        cdd_data_daily_mean_values[bp] = []
-                    cdd_data_daily_mean_values[bp].append(np.nan)
-                for bp in self.bp_hdd:
-                    if bp not in hdd_data_daily_mean_values.keys():
-                        hdd_data_daily_mean_values[bp] = []
-                    hdd_data_daily_mean_values[bp].append(np.nan)
-
-        # spread out over the month
-        upd_data = pd.Series(
-            upd_data_daily_mean_values,
-            index=energy_data.index
-            )
-        usage_data = pd.Series(
-            usage_data_daily_mean_values,
-            index=energy_data.index
-            )
-        ndays_data = pd.Series(
-            ndays_data_daily_mean_values + [np.nan],
-            index=energy_data.index
-            )
-        cdd_data = {}
-        hdd_data = {}
-        for bp in self.bp_cdd:
-            cdd_data[bp] = pd.Series(
-                cdd_data_daily_mean_values[bp] + [np.nan],
-                index=energy_data.index
-                )
-        for bp in self.bp_hdd:
-            hdd_data[bp] = pd.Series(
-                hdd_data_daily_mean_values[bp] + [np.nan],
-                index=energy_data.index
-                )
+        # Usage and usage per day of each billing period. The last period
+        # is open-ended, so it is null by convention.
+        n_periods = len(energy_data.index) - 1
+        values = energy_data.values.astype(float)
+        period_days = np.diff(energy_data.index.values).astype(
+            'timedelta64[D]').astype(int)
+        upd = np.full(n_periods + 1, np.nan)
+        usage = np.full(n_periods + 1, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            upd[:-1] = values[:-1] / period_days
+        usage[:-1] = values[:-1]
+
+        # Daily CDD and HDD for each balance point temperature, one row per
+        # balance point, stacked under a row flagging days with temperature.
+        temps = temp_data_daily.values.astype(float)
+        bp_cdd = np.asarray(list(self.bp_cdd), dtype=float)
+        bp_hdd = np.asarray(list(self.bp_hdd), dtype=float)
+        daily = np.vstack([
+            np.isfinite(temps)[np.newaxis, :],
+            np.maximum(temps[np.newaxis, :] - bp_cdd[:, np.newaxis], 0),
+            np.maximum(bp_hdd[:, np.newaxis] - temps[np.newaxis, :], 0),
+        ])
+        daily[np.isnan(daily)] = 0
+
+        # Sum each row over every billing period (both ends inclusive) as a
+        # difference of cumulative sums.
+        starts = temp_data_daily.index.searchsorted(
+            energy_data.index[:-1], side='left')
+        ends = temp_data_daily.index.searchsorted(
+            energy_data.index[1:], side='right')
+        # the open-ended last period is an empty window
+        degree_day_inputs = (
+            temps, np.append(starts, 0), np.append(ends, 0), 15)
+        cumulative = np.zeros((daily.shape[0], daily.shape[1] + 1))
+        np.cumsum(daily, axis=1, out=cumulative[:, 1:])
+        period_sums = cumulative[:, ends] - cumulative[:, starts]
+
+        # Average degree days over days with temperature data, if there are
+        # at least 15 of them.
+        ndays = np.full(n_periods + 1, np.nan)
+        ndays[:-1] = period_sums[0]
+        means = np.full((daily.shape[0] - 1, n_periods + 1), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means[:, :-1] = np.where(
+                ndays[:-1] >= 15, period_sums[1:] / ndays[:-1], np.nan)
+        cdd_means = means[:len(bp_cdd)]
+        hdd_means = means[len(bp_cdd):]
 
         model_data = {
-            'upd': upd_data,
-            'usage': usage_data,
-            'ndays': ndays_data,
+            'upd': upd,
+            'usage': usage,
+            'ndays': ndays,
         }
-        model_data.update({'CDD_' + str(bp):
-                          cdd_data[bp] for bp in cdd_data.keys()})
-        model_data.update({'HDD_' + str(bp):
-                          hdd_data[bp] for bp in hdd_data.keys()})
-
-        return pd.DataFrame(model_data)
-
-    def add_cols_to_demand_fixture(self, df):
-        cdd = {i: [0] for i in self.bp_cdd}
-        hdd = {i: [0] for i in self.bp_hdd}
-        for bp in self.bp_cdd:
-            cdd[bp] = pd.Series(
-                np.maximum(df.tempF - bp, 0),
-                index=df.index)
-        for bp in self.bp_hdd:
-            hdd[bp] = pd.Series(
-                np.maximum(bp - df.tempF, 0),
-                index=df.index)
+        model_data.update({_bp_column('CDD', bp):
+                          d for bp, d in zip(self.bp_cdd, cdd_means)})
+        model_data.update({_bp_column('HDD', bp):
+                          d for bp, d in zip(self.bp_hdd, hdd_means)})
+
+        return pd.DataFrame(model_data, index=energy_data.index), \
+            degree_day_inputs
+
+    def add_cols_to_demand_fixture(self, df, params=None):
+        ''' Degree day columns of a demand fixture, computed from its
+        temperatures: for the whole balance point grid, or given fitted
+        params only for the fitted balance points. '''
+        bp_cdd, bp_hdd = _degree_day_balance_points(
+            self.bp_cdd, self.bp_hdd, params)
+        temps = df.tempF.values.astype(float)
         model_data = {
             'upd': np.zeros(len(df.index)),
             'usage': np.zeros(len(df.index)),
             'ndays': np.ones(len(df.index)),
         }
-        model_data.update({'CDD_' + str(bp):
-                          cdd[bp] for bp in cdd.keys()})
-        model_data.update({'HDD_' + str(bp):
-                          hdd[bp] for bp in hdd.keys()})
+        model_data.update({_bp_column('CDD', bp): np.maximum(temps - bp, 0)
+                           for bp in bp_cdd})
+        model_data.update({_bp_column('HDD', bp): np.maximum(bp - temps, 0)
+                           for bp in bp_hdd})
         return pd.DataFrame(model_data, index=df.index)
 
     def daily_to_monthly_avg(self, df):
         ''' Convert from daily usage and temperature to monthly
         usage per day and average HDD/CDD. '''
+        return self._daily_to_monthly_avg(df)[0]
+
+    def _daily_to_monthly_avg(self, df):
+        # Monthly data frame, and the daily temperatures and window of days
+        # of each month to average degree days over (see
+        # _average_degree_days).
 
         # Throw out any duplicate indices
         df = df[~df.index.duplicated(keep='last')].sort_index()
 
-        # Create arrays to hold computed CDD and HDD for each
-        # balance point temperature.
-        cdd = {i: [0] for i in self.bp_cdd}
-        hdd = {i: [0] for i in self.bp_hdd}
-
         # If there isn't any data, throw an exception
         if len(df.index) == 0:
             raise model_exceptions.DataSufficiencyException("No energy trace data")
 
-        # Create the arrays to hold our monthly output
-        ndays, usage, upd, output_index = [0], [0], [0], [df.index[0]]
-        this_yr, this_mo = output_index[0].year, output_index[0].month
-
         # Check whether we are creating a demand fixture.
         is_demand_fixture = 'energy' not in df.columns
 
-        # TODO use groupby here? e.g. df.groupby(pd.TimeGrouper('MS'))
-        # Loop through the daily input data frame populating monthly arrays
-        for idx, row in df.iterrows():
-            # Check whether we are in a new month.
-            new_month = (this_yr != idx.year or this_mo != idx.month)
-            if new_month:
-                ndays.append(0)
-                usage.append(0)
-                upd.append(0)
-                for i in cdd.keys():
-                    cdd[i].append(0)
-                for i in hdd.keys():
-                    hdd[i].append(0)
-                this_yr, this_mo = idx.year, idx.month
-                output_index.append(idx)
-
-            # If this day is valid, add it to the usage and CDD/HDD arrays.
-            day_is_valid = (
-                (is_demand_fixture or
-                 (np.isfinite(row['energy']) and row['energy'] >= 0)) and np.isfinite(row['tempF']))
-            if day_is_valid:
-                ndays[-1] = ndays[-1] + 1
-                usage[-1] = usage[-1] + (
-                    row['energy'] if not is_demand_fixture else 0)
-                for bp in cdd.keys():
-                    cdd[bp][-1] += np.maximum(row['tempF'] - bp, 0)
-                for bp in hdd.keys():
-                    hdd[bp][-1] += np.maximum(bp - row['tempF'], 0)
+        # Number the calendar months; the index is sorted, so each month is
+        # a contiguous run of days. Output is indexed by each month's first day.
+        month_key = np.asarray(df.index.year * 12 + df.index.month)
+        new_month = np.ones(len(month_key), dtype=bool)
+        new_month[1:] = month_key[1:] != month_key[:-1]
+        month = np.cumsum(new_month) - 1
+        n_months = month[-1] + 1
+        output_index = pd.DatetimeIndex(df.index[new_month], freq=None)
+        output_index.name = None
+
+        # A day is valid if it has temperature and (outside of demand
+        # fixtures) finite, non-negative usage.
+        tempF = df['tempF'].values.astype(float)
+        valid = np.isfinite(tempF)
+        if not is_demand_fixture:
+            energy = df['energy'].values.astype(float)
+            with np.errstate(invalid='ignore'):
+                valid &= np.isfinite(energy) & (energy >= 0)
+        month, tempF = month[valid], tempF[valid]
+        months = np.arange(n_months)
+        degree_day_inputs = (
+            tempF, np.searchsorted(month, months),
+            np.searchsorted(month, months, side='right'), 15)
+
+        # np.bincount adds weights in index order, so monthly totals are
+        # summed day by day exactly as a running total would be.
+        ndays = np.bincount(month, minlength=n_months)
+        if is_demand_fixture:
+            usage = np.zeros(n_months, dtype=int)
+        else:
+            usage = np.bincount(
+                month, weights=energy[valid], minlength=n_months)
+
+        # Degree days for all balance points at once, one row per balance point
+        bp_cdd = np.asarray(list(self.bp_cdd), dtype=float)
+        bp_hdd = np.asarray(list(self.bp_hdd), dtype=float)
+        cdd = np.maximum(tempF[np.newaxis, :] - bp_cdd[:, np.newaxis], 0)
+        hdd = np.maximum(bp_hdd[:, np.newaxis] - tempF[np.newaxis, :], 0)
+        cdd = [np.bincount(month, weights=d, minlength=n_months) for d in cdd]
+        hdd = [np.bincount(month, weights=d, minlength=n_months) for d in hdd]
 
         # Caltrack sufficiency requirement of >=15 days per month
-        for i in range(len(usage)):
-            misses_req = (ndays[i] < 15)
-            if misses_req:
-                upd[i] = np.nan
-                for bp in cdd.keys():
-                    cdd[bp][i] = np.nan
-                for bp in hdd.keys():
-                    hdd[bp][i] = np.nan
-            else:
-                upd[i] = (usage[i] / ndays[i])
-                for bp in cdd.keys():
-                    cdd[bp][i] = cdd[bp][i] / ndays[i]
-                for bp in hdd.keys():
-                    hdd[bp][i] = hdd[bp][i] / ndays[i]
+        misses_req = (ndays < 15)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            upd = np.where(misses_req, np.nan, usage / ndays)
+            cdd = [np.where(misses_req, np.nan, d / ndays) for d in cdd]
+            hdd = [np.where(misses_req, np.nan, d / ndays) for d in hdd]
 
         # Create output data frame
         df_dict = {'upd': upd, 'usage': usage, 'ndays': ndays}
-        df_dict.update({'CDD_' + str(bp): cdd[bp] for bp in cdd.keys()})
-        df_dict.update({'HDD_' + str(bp): hdd[bp] for bp in hdd.keys()})
+        df_dict.update({_bp_column('CDD', bp): d for bp, d in zip(self.bp_cdd, cdd)})
+        df_dict.update({_bp_column('HDD', bp): d for bp, d in zip(self.bp_hdd, hdd)})
         output = pd.DataFrame(df_dict, index=output_index)
-        return output
+        return output, degree_day_inputs
 
     def monthly_avg_to_daily(self, input_data, index=None):
         if index is None:
@@ -407,12 +417,21 @@ class CaltrackMonthlyModel(object):
 
         self.input_data = input_data
         if isinstance(input_data, tuple):
-            df = self.billing_to_monthly_avg(input_data)
+            df, degree_day_inputs = self._billing_to_monthly_avg(input_data)
         else:
-            df = self.daily_to_monthly_avg(self.input_data)
+            df, degree_day_inputs = self._daily_to_monthly_avg(
+                self.input_data)
 
         self.meets_sufficiency_or_error(df)
 
+        def degree_days(kind, bp):
+            # Monthly (or billing period) average CDD or HDD for a balance
+            # point the search visits.
+            return _average_degree_days(kind, bp, *degree_day_inputs)
+
+        search = BalancePointSearch(
+            self.bp_search, self.bp_resolution, degree_days)
+
         # Fit the intercept-only model
         (
             int_formula,
@@ -431,7 +450,7 @@ class CaltrackMonthlyModel(object):
                 cdd_rsquared,
                 cdd_qualified,
                 cdd_bp
-            ) = _fit_cdd_only(df, weighted=self.weighted)
+            ) = _fit_cdd_only(df, weighted=self.weighted, search=search)
         else:
             cdd_formula = None
             cdd_mod = None
@@ -448,7 +467,7 @@ class CaltrackMonthlyModel(object):
             hdd_rsquared,
             hdd_qualified,
             hdd_bp
-        ) = _fit_hdd_only(df, weighted=self.weighted)
+        ) = _fit_hdd_only(df, weighted=self.weighted, search=search)
 
         # CDD+HDD
         if self.fit_cdd:
@@ -460,7 +479,7 @@ class CaltrackMonthlyModel(object):
                 full_qualified,
                 full_hdd_bp,
                 full_cdd_bp
-            ) = _fit_full(df, weighted=self.weighted)
+            ) = _fit_full(df, weighted=self.weighted, search=search)
         else:
             full_formula = None
             full_mod = None
@@ -554,12 +573,67 @@ class CaltrackMonthlyModel(object):
         self.cvrmse = cvrmse
         self.fit_bp_hdd, self.fit_bp_cdd = fit_bp_hdd, fit_bp_cdd
         self.n = n
+        self.n_bp_candidates = search.n_candidates
+        self.fitted = CaltrackFit.from_results(
+            self.formula, self.model_res, self.fit_bp_cdd, self.fit_bp_hdd,
+            r2=self.r2, rmse=self.rmse, cvrmse=self.cvrmse, n=self.n,
+            n_bp_candidates=self.n_bp_candidates)
         self.params = {
             "coefficients": self.model_res.params.to_dict(),
             "formula": self.formula,
             "cdd_bp": self.fit_bp_cdd,
             "hdd_bp": self.fit_bp_hdd,
             "X_design_info": self.X.design_info,
+            "fitted": self.fitted,
+        }
+
+        output = {
+            "r2": self.r2,
+            "model_params": self.params,
+            "rmse": self.rmse,
+            "cvrmse": self.cvrmse,
+            "n": self.n,
+            "n_bp_candidates": self.n_bp_candidates,
+        }
+        self._release_training_data()
+        return output
+
+    def _release_training_data(self):
+        # Only the compact fit is needed to predict.
+        if not self.keep_training_data:
+            self.input_data, self.df, self.X, self.y = None, None, None, None
+            self.estimated, self.model_obj, self.model_res = None, None, None
+
+    def load_fit(self, fitted):
+        ''' Restores a fit from its compact form, e.g. one loaded from a
+        :any:`eemeter.modeling.store.SqlModelStore`, instead of refitting.
+
+        Parameters
+        ----------
+        fitted : CaltrackFit
+            Compact fit, as found in :code:`model_params["fitted"]`.
+
+        Returns
+        -------
+        out : dict
+            Output of `.fit()` for the restored fit. The parameters have no
+            patsy design info.
+        '''
+        self.fitted = fitted
+        self.formula = fitted.formula
+        self.fit_bp_cdd, self.fit_bp_hdd = fitted.cdd_bp, fitted.hdd_bp
+        self.r2 = fitted.stats.get("r2")
+        self.rmse = fitted.stats.get("rmse")
+        self.cvrmse = fitted.stats.get("cvrmse")
+        self.n = fitted.stats.get("n")
+        self.n_bp_candidates = fitted.stats.get("n_bp_candidates")
+        self.params = {
+            "coefficients": dict(zip(fitted.columns,
+                                     fitted.coefficients.tolist())),
+            "formula": self.formula,
+            "cdd_bp": self.fit_bp_cdd,
+            "hdd_bp": self.fit_bp_hdd,
+            "fitted": self.fitted,
         }
 
         output = {
@@ -568,9 +642,21 @@ class CaltrackMonthlyModel(object):
             "rmse": self.rmse,
             "cvrmse": self.cvrmse,
             "n": self.n,
+            "n_bp_candidates": self.n_bp_candidates,
         }
         return output
 
+    def _fitted(self, params):
+        # The compact fit in params, or, for params without one (e.g.
+        # deserialized model params), the fit of this model.
+        if isinstance(params, CaltrackFit):
+            return params
+        fitted = params.get("fitted", self.fitted)
+        if fitted is None:
+            raise model_exceptions.ModelPredictException(
+                "No fit to predict with; call .fit() first.")
+        return fitted
+
     def predict(self, demand_fixture_data, params=None, summed=True):
         ''' Predicts across index using fitted model params
 
@@ -579,15 +665,17 @@ class CaltrackMonthlyModel(object):
         demand_fixture_data : pandas.DataFrame
             Formatted input data as returned by
             :code:`CaltrackFormatter.create_demand_fixture()`
-        params : dict, default None
+        params : dict or CaltrackFit, default None
             Parameters found during model fit. If None, `.fit()` must be called
-            before this method can be used.
+            before this method can be used. Only the compact fit is used for
+            prediction, so it may be passed on its own.
 
               - :code:`X_design_matrix`: patsy design matrix used in
                 formatting design matrix.
               - :code:`formula`: patsy formula used in creating design matrix.
               - :code:`coefficients`: ElasticNetCV coefficients.
               - :code:`intercept`: ElasticNetCV intercept.
+              - :code:`fitted`: :any:`CaltrackFit` of the selected model.
 
         Returns
         -------
@@ -599,25 +687,20 @@ class CaltrackMonthlyModel(object):
         if params is None:
             params = self.params
 
-        formula = params["formula"]
+        fitted = self._fitted(params)
 
         demand_fixture_index = demand_fixture_data.index.copy()
-        demand_fixture_data = self.add_cols_to_demand_fixture(demand_fixture_data)
-        dfd = demand_fixture_data.dropna()
-
-        _, X = patsy.dmatrices(formula, dfd,
-                               return_type='dataframe')
+        temps = np.asarray(demand_fixture_data.tempF, dtype=float)
+        # Rows without temperature data are not predicted; each remaining
+        # row of the demand fixture counts as one day.
+        has_temp = np.isfinite(temps)
+        index = demand_fixture_index[has_temp]
+        ndays = np.ones(len(index))
 
         try:
-            predicted = self.model_res.predict(X)
-            predicted = pd.Series(predicted, index=dfd.index)
-            variance = copy.deepcopy(predicted)
-            # Get parameter covariance matrix
-            cov = self.model_res.cov_params()
-            # Get prediction errors for each data point
-            prediction_var = self.model_res.mse_resid + \
-                (X * np.dot(cov, X.T).T).sum(1)
-            predicted_baseline_use, predicted_baseline_use_var = 0.0, 0.0
+            predicted, prediction_var = fitted.predict(temps[has_temp])
+            predicted = pd.Series(predicted, index=index)
+            prediction_var = pd.Series(prediction_var, index=index)
         except:
             raise model_exceptions.ModelPredictException(
                 "Prediction failed!")
@@ -631,18 +714,15 @@ class CaltrackMonthlyModel(object):
                 "Prediction has NaN variances")
 
         if summed:
-            # Sum them up using the number of days in the demand fixture.
-            for i in demand_fixture_data.index:
-                if i not in predicted.index or not np.isfinite(predicted[i]):
-                    continue
-                predicted[i] = predicted[i] * demand_fixture_data.ndays[i]
-                predicted_baseline_use = predicted_baseline_use + predicted[i]
-                variance[i] = prediction_var[i] * demand_fixture_data.ndays[i]
-                predicted_baseline_use_var = \
-                    predicted_baseline_use_var + variance[i]
-
-            predicted = predicted_baseline_use
-            variance = predicted_baseline_use_var
+            # Sum them up using the number of days in the demand fixture,
+            # skipping infinite predictions. Sums accumulate in fixture
+            # order (cumsum, not pairwise np.sum) to match summing row by
+            # row exactly.
+            finite = np.isfinite(predicted.values)
+            predicted = np.cumsum(np.append(
+                0.0, predicted.values[finite] * ndays[finite]))[-1]
+            variance = np.cumsum(np.append(
+                0.0, prediction_var.values[finite] * ndays[finite]))[-1]
         else:
             input_data = pd.DataFrame({
                 'predicted': predicted,
@@ -1,9 +1,16 @@
 import numpy as np
 import pandas as pd
-import patsy
 import eemeter.modeling.exceptions as model_exceptions
+from eemeter.lazy import lazy_import
 from eemeter.modeling.models.caltrack_helpers import \
-    _fit_intercept, _fit_cdd_only, _fit_hdd_only, _fit_full
+    _fit_intercept, _fit_cdd_only, _fit_hdd_only, _fit_full, \
+    BalancePointSearch, CaltrackFit, _daily_degree_days, \
+    _balance_point_grid, _bp_column, _normalize_bp, \
+    _degree_day_balance_points, _selected_model, \
+    _candidate_designs, _candidate_moments, _solve_candidate_moments, \
+    _qualified_scores, CandidateMoments
+
+patsy = lazy_import('patsy')
 
 
 class CaltrackDailyModel(object):
@@ -19,20 +26,37 @@ class CaltrackDailyModel(object):
     determined by maximizing R^2. Otherwise,
     70 and 60 degF are used for cooling and heating, respectively.
 
+    The grid search covers bp_cdd_range and bp_hdd_range (inclusive, degF).
+    bp_search selects how: 'exhaustive' fits every balance point on a grid
+    spaced by bp_resolution, while 'coarse_to_fine' and 'golden_section'
+    (see :any:`BalancePointSearch`) fit far fewer candidates, which makes
+    sub-degree bp_resolution and wider ranges affordable. The number of
+    candidates evaluated is reported as n_bp_candidates.
+
     Min_contiguous_months sets the number of contiguous months of data
     required at the beginning of the reporting period/end of the baseline
     period in order for the weather normalization to be valid.
+
+    After fitting, only the compact fit (:any:`CaltrackFit`, in
+    :code:`params["fitted"]`) and its statistics are kept; the input data,
+    design matrices and statsmodels results are released unless
+    keep_training_data is True.
     '''
     def __init__(
             self, fit_cdd=True, grid_search=False, min_fraction_coverage=0.9,
             min_contiguous_months=12,
             modeling_period_interpretation='baseline',
+            bp_search='exhaustive', bp_resolution=1,
+            bp_cdd_range=(65, 75), bp_hdd_range=(55, 65),
+            keep_training_data=False,
             **kwargs):  # ignore extra args
 
         self.fit_cdd = fit_cdd
         self.grid_search = grid_search
         self.model_freq = pd.tseries.frequencies.Day()
         self.params = None
+        self.fitted = None
+        self.df = None
         self.X = None
         self.y = None
         self.estimated = None
@@ -42,32 +66,45 @@ class CaltrackDailyModel(object):
         self.nmbe = None
         self.n = None
         self.input_data = None
+        self.model_obj = None
+        self.model_res = None
+        self.keep_training_data = keep_training_data
         self.fit_bp_hdd, self.fit_bp_cdd = None, None
         self.min_fraction_coverage = min_fraction_coverage
         self.min_contiguous_months = min_contiguous_months
         self.modeling_period_interpretation = modeling_period_interpretation
-
-        if grid_search:
-            self.bp_cdd = range(65, 76)
-            self.bp_hdd = range(55, 66)
+        self.n_bp_candidates = None
+
+        if bp_search not in BalancePointSearch.methods:
+            raise ValueError(
+                'Unknown balance point search method {}'.format(bp_search))
+        self.bp_search = bp_search
+        self.bp_resolution = bp_resolution
+
+        if grid_search and bp_search == 'exhaustive':
+            self.bp_cdd = _balance_point_grid(*bp_cdd_range, resolution=bp_resolution)
+            self.bp_hdd = _balance_point_grid(*bp_hdd_range, resolution=bp_resolution)
+        elif grid_search:
+            # Only the ends of the ranges are formatted up front; the search
+            # computes the other balance points it visits.
+            self.bp_cdd = [_normalize_bp(bp) for bp in bp_cdd_range]
+            self.bp_hdd = [_normalize_bp(bp) for bp in bp_hdd_range]
         else:
             self.bp_cdd, self.bp_hdd = [70, ], [60, ]
 
     def __repr__(self):
         return 'CaltrackDailyModel'
 
-    def ami_to_daily(self, df):
-        ''' Convert from daily usage and temperature to monthly
-        usage per day and average HDD/CDD. '''
+    def ami_to_daily(self, df, params=None, degree_days=True):
+        ''' Convert from daily usage and temperature to usage per day and
+        HDD/CDD, for the whole balance point grid, or given fitted params
+        only for the fitted balance points. If degree_days is False, no
+        HDD/CDD columns are added; `.fit()` computes them from the
+        temperatures as the balance point search needs them. '''
 
         # Throw out any duplicate indices
         df = df[~df.index.duplicated(keep='last')].sort_index()
 
-        # Create arrays to hold computed CDD and HDD for each
-        # balance point temperature.
-        cdd = {i: [0] for i in self.bp_cdd}
-        hdd = {i: [0] for i in self.bp_hdd}
-
         # If there isn't any data, throw an exception
         if len(df.index) == 0:
             raise model_exceptions.DataSufficiencyException("No energy trace data")
@@ -75,34 +112,36 @@ class CaltrackDailyModel(object):
         # Check whether we are creating a demand fixture.
         is_demand_fixture = 'energy' not in df.columns
 
-        for bp in self.bp_cdd:
-            cdd[bp] = pd.Series(
-                np.maximum(df.tempF - bp, 0),
-                index=df.index)
-        for bp in self.bp_hdd:
-            hdd[bp] = pd.Series(
-                np.maximum(bp - df.tempF, 0),
-                index=df.index)
+        temps = df.tempF.values.astype(float)
 
         # spread out over the month
         ndays = pd.Series((is_demand_fixture or np.isfinite(df.energy)) &
-                          np.isfinite(hdd[self.bp_hdd[0]]),
-                          dtype=int)
+                          np.isfinite(np.maximum(self.bp_hdd[0] - temps, 0)),
+                          index=df.index, dtype=int)
 
         # Create output data frame
         if not is_demand_fixture:
             df_dict = {'upd': df.energy, 'usage': df.energy, 'ndays': ndays}
         else:
             df_dict = {'upd': ndays*0, 'usage': ndays*0, 'ndays': ndays}
-        df_dict.update({'CDD_' + str(bp): cdd[bp] for bp in cdd.keys()})
-        df_dict.update({'HDD_' + str(bp): hdd[bp] for bp in hdd.keys()})
+        if degree_days:
+            bp_cdd, bp_hdd = _degree_day_balance_points(
+                self.bp_cdd, self.bp_hdd, params)
+            df_dict.update({_bp_column('CDD', bp): np.maximum(temps - bp, 0)
+                            for bp in bp_cdd})
+            df_dict.update({_bp_column('HDD', bp): np.maximum(bp - temps, 0)
+                            for bp in bp_hdd})
         output = pd.DataFrame(df_dict, index=df.index)
         return output
 
     def meets_sufficiency_or_error(self, df):
-        if np.sum(np.isfinite(df['usage'])) < self.min_fraction_coverage * len(df):
+        self._meets_sufficiency_or_error(
+            np.sum(np.isfinite(df['usage'])), len(df))
+
+    def _meets_sufficiency_or_error(self, n_usage, n):
+        if n_usage < self.min_fraction_coverage * n:
             raise model_exceptions.DataSufficiencyException("Insufficient coverage")
-        if len(df) < self.min_contiguous_months * 30:
+        if n < self.min_contiguous_months * 30:
             raise model_exceptions.DataSufficiencyException("Insufficient data")
         return
 
@@ -113,11 +152,23 @@ class CaltrackDailyModel(object):
             raise model_exceptions.DataSufficiencyException(
                   "Billing data is not appropriate for this model")
         else:
-            df = self.ami_to_daily(self.input_data)
+            df = self.ami_to_daily(self.input_data, degree_days=False)
         self.df = df
 
         self.meets_sufficiency_or_error(df)
 
+        # Degree days are computed from temperatures as the balance point
+        # search needs them, rather than formatted for the whole grid.
+        temps = self.input_data[
+            ~self.input_data.index.duplicated(keep='last')
+        ].sort_index().tempF.values.astype(float)
+
+        def degree_days(kind, bp):
+            return _daily_degree_days(kind, bp, temps)
+
+        search = BalancePointSearch(
+            self.bp_search, self.bp_resolution, degree_days)
+
         # Fit the intercept-only model
         (
             int_formula,
@@ -136,7 +187,7 @@ class CaltrackDailyModel(object):
                 cdd_rsquared,
                 cdd_qualified,
                 cdd_bp
-            ) = _fit_cdd_only(df)
+            ) = _fit_cdd_only(df, search=search, bps=self.bp_cdd)
         else:
             cdd_formula = None
             cdd_mod = None
@@ -153,7 +204,7 @@ class CaltrackDailyModel(object):
             hdd_rsquared,
             hdd_qualified,
             hdd_bp
-        ) = _fit_hdd_only(df)
+        ) = _fit_hdd_only(df, search=search, bps=self.bp_hdd)
 
         # CDD+HDD
         if self.fit_cdd:
@@ -165,7 +216,8 @@ class CaltrackDailyModel(object):
                 full_qualified,
                 full_hdd_bp,
                 full_cdd_bp
-            ) = _fit_full(df)
+            ) = _fit_full(
+                df, search=search, hdd_bps=self.bp_hdd, cdd_bps=self.bp_cdd)
         else:
             full_formula = None
             full_mod = None
@@ -185,29 +237,14 @@ class CaltrackDailyModel(object):
             raise model_exceptions.ModelFitException(
                 "No candidate model fit to data successfully")
 
-        use_full = (full_qualified and (
-            full_rsquared > max([
-                int(hdd_qualified) * hdd_rsquared,
-                int(cdd_qualified) * cdd_rsquared,
-                int(int_qualified) * int_rsquared,
-            ])
-        ))
-
-        use_hdd_only = (hdd_qualified and (
-            hdd_rsquared > max([
-                int(full_qualified) * full_rsquared,
-                int(cdd_qualified) * cdd_rsquared,
-                int(int_qualified) * int_rsquared,
-            ])
-        ))
-
-        use_cdd_only = (cdd_qualified and (
-            cdd_rsquared > max([
-                int(full_qualified) * full_rsquared,
-                int(hdd_qualified) * hdd_rsquared,
-                int(int_qualified) * int_rsquared,
-            ])
-        ))
+        selected = _selected_model(
+            (full_qualified, full_rsquared),
+            (hdd_qualified, hdd_rsquared),
+            (cdd_qualified, cdd_rsquared),
+            (int_qualified, int_rsquared))
+        use_full = selected == 'full'
+        use_hdd_only = selected == 'hdd_only'
+        use_cdd_only = selected == 'cdd_only'
 
         fit_bp_hdd, fit_bp_cdd = None, None
 
@@ -261,12 +298,69 @@ class CaltrackDailyModel(object):
         self.nmbe = nmbe
         self.fit_bp_hdd, self.fit_bp_cdd = fit_bp_hdd, fit_bp_cdd
         self.n = n
+        self.n_bp_candidates = search.n_candidates
+        self.fitted = CaltrackFit.from_results(
+            self.formula, self.model_res, self.fit_bp_cdd, self.fit_bp_hdd,
+            r2=self.r2, rmse=self.rmse, cvrmse=self.cvrmse, nmbe=self.nmbe,
+            n=self.n, n_bp_candidates=self.n_bp_candidates)
         self.params = {
             "coefficients": self.model_res.params.to_dict(),
             "formula": self.formula,
             "cdd_bp": self.fit_bp_cdd,
             "hdd_bp": self.fit_bp_hdd,
             "X_design_info": self.X.design_info,
+            "fitted": self.fitted,
+        }
+
+        output = {
+            "r2": self.r2,
+            "model_params": self.params,
+            "rmse": self.rmse,
+            "cvrmse": self.cvrmse,
+            "nmbe": self.nmbe,
+            "n": self.n,
+            "n_bp_candidates": self.n_bp_candidates,
+        }
+        self._release_training_data()
+        return output
+
+    def _release_training_data(self):
+        # Only the compact fit is needed to predict.
+        if not self.keep_training_data:
+            self.input_data, self.df, self.X, self.y = None, None, None, None
+            self.estimated, self.model_obj, self.model_res = None, None, None
+
+    def load_fit(self, fitted):
+        ''' Restores a fit from its compact form, e.g. one loaded from a
+        :any:`eemeter.modeling.store.SqlModelStore`, instead of refitting.
+
+        Parameters
+        ----------
+        fitted : CaltrackFit
+            Compact fit, as found in :code:`model_params["fitted"]`.
+
+        Returns
+        -------
+        out : dict
+            Output of `.fit()` for the restored fit. The parameters have no
+            patsy design info.
+        '''
+        self.fitted = fitted
+        self.formula = fitted.formula
+        self.fit_bp_cdd, self.fit_bp_hdd = fitted.cdd_bp, fitted.hdd_bp
+        self.r2 = fitted.stats.get("r2")
+        self.rmse = fitted.stats.get("rmse")
+        self.cvrmse = fitted.stats.get("cvrmse")
+        self.nmbe = fitted.stats.get("nmbe")
+        self.n = fitted.stats.get("n")
+        self.n_bp_candidates = fitted.stats.get("n_bp_candidates")
+        self.params = {
+            "coefficients": dict(zip(fitted.columns,
+                                     fitted.coefficients.tolist())),
+            "formula": self.formula,
+            "cdd_bp": self.fit_bp_cdd,
+            "hdd_bp": self.fit_bp_hdd,
+            "fitted": self.fitted,
         }
 
         output = {
@@ -276,9 +370,262 @@ class CaltrackDailyModel(object):
             "cvrmse": self.cvrmse,
             "nmbe": self.nmbe,
             "n": self.n,
+            "n_bp_candidates": self.n_bp_candidates,
         }
         return output
 
+    @classmethod
+    def fit_batch(cls, input_data, **kwargs):
+        ''' Fits one model to each of many daily traces which share their
+        index and temperatures (e.g. traces of one weather station formatted
+        over the same period), solving the candidate least squares problems
+        of all traces together with batched linear algebra instead of
+        running :any:`fit` trace by trace.
+
+        Selection and results match :any:`fit` up to floating point. Traces
+        are fit one at a time if the model uses a non-exhaustive balance
+        point search, since the candidates it visits depend on the trace.
+
+        Parameters
+        ----------
+        input_data : list of pandas.DataFrame
+            Input data of each trace, as for :any:`fit`.
+        **kwargs
+            Model arguments, as for :any:`CaltrackDailyModel`.
+
+        Returns
+        -------
+        models : list of CaltrackDailyModel
+            Model of each trace.
+        outputs : list
+            Output of `.fit()` for each trace, or the exception raised for
+            traces which could not be fit. Batched fits have no statsmodels
+            results or patsy design info, as for :any:`load_fit`.
+        '''
+        models = [cls(**kwargs) for _ in input_data]
+        outputs = [None for _ in input_data]
+        if len(models) == 0:
+            return models, outputs
+
+        if models[0].grid_search and models[0].bp_search != 'exhaustive':
+            for i, (model, data) in enumerate(zip(models, input_data)):
+                try:
+                    outputs[i] = model.fit(data)
+                except Exception as e:
+                    outputs[i] = e
+            return models, outputs
+
+        # Degree days are shared, so only usage is formatted per trace.
+        data = {}
+        for i, model in enumerate(models):
+            if model.keep_training_data:
+                model.input_data = input_data[i]
+            try:
+                if isinstance(input_data[i], tuple):
+                    raise model_exceptions.DataSufficiencyException(
+                          "Billing data is not appropriate for this model")
+                data[i] = input_data[i][
+                    ~input_data[i].index.duplicated(keep='last')
+                ].sort_index()
+                if len(data[i].index) == 0:
+                    raise model_exceptions.DataSufficiencyException(
+                        "No energy trace data")
+                model.meets_sufficiency_or_error(
+                    pd.DataFrame({'usage': data[i].energy}))
+            except Exception as e:
+                outputs[i] = e
+                data.pop(i, None)
+        if len(data) == 0:
+            return models, outputs
+
+        fit = sorted(data)
+        index, temps = data[fit[0]].index, data[fit[0]].tempF.values
+        has_temp = pd.notnull(temps)
+        for i in fit[1:]:
+            other = data[i].tempF.values
+            if not index.equals(data[i].index) or \
+                    not np.array_equal(has_temp, pd.notnull(other)) or \
+                    not np.array_equal(temps[has_temp], other[has_temp]):
+                raise ValueError(
+                    'Traces fit in a batch must share their index and '
+                    'temperatures.')
+        Y = np.array([data[i].energy.values for i in fit], dtype=float)
+        df = pd.DataFrame(index=index)
+        temps = temps.astype(float)
+
+        def degree_days(kind, bp):
+            return _daily_degree_days(kind, bp, temps)
+
+        candidates = models[0]._candidate_terms(
+            sorted(models[0].bp_cdd), sorted(models[0].bp_hdd))
+
+        # For each model type, the best candidate of each trace.
+        K, results, n_candidates = len(fit), {}, {}
+        for model_type, cs in candidates:
+            if model_type != 'intercept' and len(cs) > 0:
+                n_candidates[model_type] = len(cs)
+            indices, X = _candidate_designs(df, cs, degree_days)
+            if len(indices) == 0:
+                continue
+            moments = _candidate_moments(Y, X)
+            params, pvalues, rsquared_adj, ssr, XtX_inv = \
+                _solve_candidate_moments(*moments)
+            if model_type == 'intercept':
+                scores = np.zeros((K, 1))
+            else:
+                scores = _qualified_scores(params, pvalues, rsquared_adj)
+            best = np.argmax(scores, axis=1)
+            results[model_type] = (
+                [cs[c] for c in indices], best, scores[np.arange(K), best],
+                moments, params, ssr, XtX_inv)
+
+        def rsquared(model_type, j):
+            if model_type not in results:
+                return False, 0
+            score = results[model_type][2][j]
+            if not np.isfinite(score):
+                return False, 0
+            return True, score
+
+        for j, i in enumerate(fit):
+            selected = _selected_model(
+                rsquared('full', j), rsquared('hdd_only', j),
+                rsquared('cdd_only', j), rsquared('intercept', j))
+            cs, best, scores, moments, params, ssr, XtX_inv = \
+                results[selected]
+            c = best[j]
+            fitted = CaltrackFit.from_moments(
+                cs[c], [m[j, c] for m in moments],
+                (params[j, c], ssr[j, c], XtX_inv[j, c]),
+                r2=scores[j], n_bp_candidates=dict(n_candidates))
+            outputs[i] = models[i].load_fit(fitted)
+        return models, outputs
+
+    def _candidate_terms(self, bp_cdd, bp_hdd):
+        # Degree day terms of the candidates of each model type, in the
+        # order the balance point search visits them.
+        candidates = [('intercept', [[]])]
+        if self.fit_cdd:
+            candidates.append(
+                ('cdd_only', [[('CDD', bp)] for bp in bp_cdd]))
+        candidates.append(('hdd_only', [[('HDD', bp)] for bp in bp_hdd]))
+        if self.fit_cdd:
+            candidates.append(('full', [
+                [('CDD', cdd_bp), ('HDD', hdd_bp)]
+                for hdd_bp in bp_hdd for cdd_bp in bp_cdd
+                if cdd_bp >= hdd_bp
+            ]))
+        return candidates
+
+    def fit_chunks(self, chunks):
+        ''' Fits the model streaming over consecutive chunks of input data,
+        holding only running sums of :code:`X'X`, :code:`X'y`, :code:`y'y`
+        and the number of observations (and degree day totals) of every
+        candidate model, rather than the data and its degree day columns.
+
+        Selection and results match :any:`fit` on the concatenated chunks
+        up to floating point. Every candidate on the balance point search
+        grid is accumulated, so the non-exhaustive search methods save no
+        work here.
+
+        Parameters
+        ----------
+        chunks : iterable of pandas.DataFrame
+            Consecutive chunks of input data, as for :any:`fit`, in time
+            order.
+
+        Returns
+        -------
+        out : dict
+            Output of `.fit()`. The parameters have no statsmodels results
+            or patsy design info, as for :any:`load_fit`.
+        '''
+        search = BalancePointSearch(self.bp_search, self.bp_resolution)
+        bp_cdd, bp_hdd = search.grid(self.bp_cdd), search.grid(self.bp_hdd)
+        accumulators = [
+            (model_type, terms, CandidateMoments(terms))
+            for model_type, terms in self._candidate_terms(bp_cdd, bp_hdd)
+            if len(terms) > 0
+        ]
+
+        n, n_usage, last = 0, 0, None
+        for chunk in chunks:
+            if isinstance(chunk, tuple):
+                raise model_exceptions.DataSufficiencyException(
+                      "Billing data is not appropriate for this model")
+            chunk = chunk[~chunk.index.duplicated(keep='last')].sort_index()
+            if len(chunk.index) == 0:
+                continue
+            if last is not None and chunk.index[0] <= last:
+                raise ValueError(
+                    'Chunks must be consecutive and in time order.')
+            last = chunk.index[-1]
+
+            usage = chunk.energy.values.astype(float)
+            n += len(usage)
+            n_usage += np.sum(np.isfinite(usage))
+            for _, _, accumulator in accumulators:
+                accumulator.add(chunk.tempF.values, usage)
+
+        if n == 0:
+            raise model_exceptions.DataSufficiencyException(
+                "No energy trace data")
+        self._meets_sufficiency_or_error(n_usage, n)
+
+        grids = {
+            'cdd_only': [bp_cdd],
+            'hdd_only': [bp_hdd],
+            'full': [bp_hdd, bp_cdd],
+        }
+        results = {}
+        for model_type, terms, accumulator in accumulators:
+            params, pvalues, rsquared_adj, ssr, XtX_inv = accumulator.solve()
+            if model_type == 'intercept':
+                best, score = 0, 0
+            else:
+                # Search keys are balance points in grid order, as in fit.
+                keys = [tuple(bp for _, bp in reversed(c)) for c in terms]
+                scores = dict(zip(keys, np.where(
+                    accumulator.sufficient(),
+                    _qualified_scores(params, pvalues, rsquared_adj),
+                    -np.inf)))
+                key = search.search(
+                    model_type, grids[model_type],
+                    lambda candidates: np.array(
+                        [scores[c] for c in candidates]),
+                    allowed=lambda candidate: candidate in scores)
+                if key is None:
+                    continue
+                best, score = keys.index(key), scores[key]
+            results[model_type] = (
+                terms[best], score,
+                [m[best] for m in accumulator.moments],
+                (params[best], ssr[best], XtX_inv[best]))
+
+        def rsquared(model_type):
+            if model_type not in results:
+                return False, 0
+            return True, results[model_type][1]
+
+        terms, score, moments, solution = results[_selected_model(
+            rsquared('full'), rsquared('hdd_only'), rsquared('cdd_only'),
+            rsquared('intercept'))]
+        fitted = CaltrackFit.from_moments(
+            terms, moments, solution, r2=score,
+            n_bp_candidates=search.n_candidates)
+        return self.load_fit(fitted)
+
+    def _fitted(self, params):
+        # The compact fit in params, or, for params without one (e.g.
+        # deserialized model params), the fit of this model.
+        if isinstance(params, CaltrackFit):
+            return params
+        fitted = params.get("fitted", self.fitted)
+        if fitted is None:
+            raise model_exceptions.ModelPredictException(
+                "No fit to predict with; call .fit() first.")
+        return fitted
+
     def predict(self, demand_fixture_data, params=None, summed=True):
         ''' Predicts across index using fitted model params
 
@@ -287,15 +634,17 @@ class CaltrackDailyModel(object):
         demand_fixture_data : pandas.DataFrame
             Formatted input data as returned by
             :code:`CaltrackFormatter.create_demand_fixture()`
-        params : dict, default None
+        params : dict or CaltrackFit, default None
             Parameters found during model fit. If None, `.fit()` must be called
-            before this method can be used.
+            before this method can be used. Only the compact fit is used for
+            prediction, so it may be passed on its own.
 
               - :code:`X_design_matrix`: patsy design matrix used in
                 formatting design matrix.
               - :code:`formula`: patsy formula used in creating design matrix.
               - :code:`coefficients`: ElasticNetCV coefficients.
               - :code:`intercept`: ElasticNetCV intercept.
+              - :code:`fitted`: :any:`CaltrackFit` of the selected model.
 
         Returns
         -------
@@ -307,21 +656,24 @@ class CaltrackDailyModel(object):
         if params is None:
             params = self.params
 
-        dfd = self.ami_to_daily(demand_fixture_data)
+        fitted = self._fitted(params)
 
-        formula = params["formula"]
-
-        _, X = patsy.dmatrices(formula, dfd,
-                               return_type='dataframe')
+        # Throw out any duplicate indices
+        demand_fixture_data = demand_fixture_data[
+            ~demand_fixture_data.index.duplicated(keep='last')].sort_index()
+        if len(demand_fixture_data.index) == 0:
+            raise model_exceptions.DataSufficiencyException(
+                "No energy trace data")
 
+        # Rows without temperature data are not predicted.
+        temps = np.asarray(demand_fixture_data.tempF, dtype=float)
+        has_temp = np.isfinite(temps)
+        index = demand_fixture_data.index[has_temp]
         try:
-            predicted = self.model_res.predict(X)
-            predicted = pd.Series(predicted, index=dfd.index)
-            # Get parameter covariance matrix
-            cov = self.model_res.cov_params()
-            # Get prediction errors for each data point
-            prediction_var = self.model_res.mse_resid + \
-                (X * np.dot(cov, X.T).T).sum(1)
+            predicted, prediction_var = fitted.predict(temps[has_temp])
+            predicted = pd.Series(predicted, index=index).reindex(
+                demand_fixture_data.index)
+            prediction_var = pd.Series(prediction_var, index=index)
         except:
             raise model_exceptions.ModelPredictException(
                 "Prediction failed!")
@@ -1,15 +1,794 @@
+import itertools
+
 import numpy as np
-import statsmodels.formula.api as smf
+
+from eemeter.lazy import lazy_import
+from eemeter.modeling.models.variance import prediction_variance
+
+smf = lazy_import('statsmodels.formula.api')
+stats = lazy_import('scipy.stats')
+
+
+def _fit_formula(formula, df, weighted=False):
+    if weighted:
+        mod = smf.wls(formula=formula, data=df, weights=df['ndays'])
+    else:
+        mod = smf.ols(formula=formula, data=df)
+    return mod, mod.fit()
+
+
+def _pinv(a, rcond=1e-15):
+    # Pseudo-inverse of each of a stack of matrices. np.linalg.pinv only
+    # broadcasts over stacks from numpy 1.14, np.linalg.svd already does.
+    u, s, vt = np.linalg.svd(a, full_matrices=False)
+    cutoff = rcond * s.max(axis=-1)[..., np.newaxis]
+    with np.errstate(divide='ignore'):
+        s_inv = np.where(s > cutoff, 1. / s, 0.)
+    return np.einsum('...ji,...j,...kj->...ik', vt, s_inv, u)
+
+
+def _fit_candidates(y, X, weights=None):
+    ''' Fit a stack of least squares candidates sharing a response in one
+    batch, by solving their normal equations together. Rows with missing
+    values are dropped per candidate, as the statsmodels formula API does.
+
+    Parameters
+    ----------
+    y : numpy.ndarray, shape (n,)
+        Response.
+    X : numpy.ndarray, shape (k, n, p)
+        Design matrix of each of `k` candidates. The first column must be
+        the intercept.
+    weights : numpy.ndarray, shape (n,), default None
+        WLS weights; if None, candidates are fit with OLS.
+
+    Returns
+    -------
+    params : numpy.ndarray, shape (k, p)
+        Coefficients.
+    pvalues : numpy.ndarray, shape (k, p)
+        Two-sided t-test p-values of the coefficients.
+    rsquared_adj : numpy.ndarray, shape (k,)
+        Adjusted R-squared. NaN where a candidate has no residual degrees
+        of freedom.
+    '''
+    k, n, p = X.shape
+    valid = np.isfinite(y)[np.newaxis, :] & np.isfinite(X).all(axis=2)
+    if weights is None:
+        weights = np.ones(n)
+    else:
+        valid &= np.isfinite(weights)[np.newaxis, :]
+
+    # Zero out dropped rows, so they contribute nothing to any sum.
+    w = np.where(valid, weights[np.newaxis, :], 0.)
+    X = np.where(valid[:, :, np.newaxis], X, 0.)
+    y = np.where(valid, y[np.newaxis, :], 0.)
+    nobs = valid.sum(axis=1)
+
+    XtWX = np.einsum('kni,kn,knj->kij', X, w, X)
+    XtWy = np.einsum('kni,kn,kn->ki', X, w, y)
+    XtWX_inv = _pinv(XtWX)
+    params = np.einsum('kij,kj->ki', XtWX_inv, XtWy)
+
+    resid = y - np.einsum('kni,ki->kn', X, params)
+    ssr = (w * resid ** 2).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y_mean = (w * y).sum(axis=1) / w.sum(axis=1)
+        centered_tss = (w * (y - y_mean[:, np.newaxis]) ** 2).sum(axis=1)
+
+        df_resid = (nobs - p).astype(float)
+        df_resid[df_resid <= 0] = np.nan
+        scale = ssr / df_resid
+        bse = np.sqrt(scale[:, np.newaxis] *
+                      np.diagonal(XtWX_inv, axis1=1, axis2=2))
+        tvalues = params / bse
+        pvalues = 2 * stats.t.sf(np.abs(tvalues), df_resid[:, np.newaxis])
+
+        rsquared = 1 - ssr / centered_tss
+        rsquared_adj = 1 - (nobs - 1) / df_resid * (1 - rsquared)
+
+    return params, pvalues, rsquared_adj
+
+
+def _candidate_moments(Y, X):
+    ''' Sufficient statistics of least squares fits of each of `K`
+    responses on each of `k` candidate designs sharing their rows. Rows with
+    missing values are dropped per response and candidate.
+
+    Parameters
+    ----------
+    Y : numpy.ndarray, shape (K, n)
+        Responses.
+    X : numpy.ndarray, shape (k, n, p)
+        Design matrix of each candidate. The first column must be the
+        intercept.
+
+    Returns
+    -------
+    moments : tuple of numpy.ndarray
+        :code:`(nobs, ysum, yty, Xty, XtX)`, of shapes `(K, k)`, `(K, k)`,
+        `(K, k)`, `(K, k, p)` and `(K, k, p, p)`.
+    '''
+    K, n = Y.shape
+    k, _, p = X.shape
+    valid_x = np.isfinite(X).all(axis=2)
+    valid_y = np.isfinite(Y)
+
+    # Zero out dropped rows, so that each sum over rows is a single matrix
+    # product of the (K, n) responses with the (n, ...) candidate terms.
+    X = np.where(valid_x[:, :, np.newaxis], X, 0.)
+    Y = np.where(valid_y, Y, 0.)
+    w = valid_y.astype(float)
+    vx = valid_x.astype(float).T
+
+    nobs = np.dot(w, vx)
+    ysum = np.dot(Y, vx)
+    yty = np.dot(Y ** 2, vx)
+    Xty = np.dot(Y, X.transpose(1, 0, 2).reshape(n, k * p)).reshape(K, k, p)
+    XX = np.einsum('kni,knj->nkij', X, X).reshape(n, k * p * p)
+    XtX = np.dot(w, XX).reshape(K, k, p, p)
+    return nobs, ysum, yty, Xty, XtX
+
+
+def _solve_candidate_moments(nobs, ysum, yty, Xty, XtX):
+    ''' Least squares fits from the sufficient statistics returned by
+    :any:`_candidate_moments`.
+
+    Returns
+    -------
+    params : numpy.ndarray, shape (K, k, p)
+        Coefficients.
+    pvalues : numpy.ndarray, shape (K, k, p)
+        Two-sided t-test p-values of the coefficients.
+    rsquared_adj : numpy.ndarray, shape (K, k)
+        Adjusted R-squared. NaN where a fit has no residual degrees of
+        freedom.
+    ssr : numpy.ndarray, shape (K, k)
+        Sum of squared residuals.
+    XtX_inv : numpy.ndarray, shape (K, k, p, p)
+        (Pseudo-)inverse of :code:`X'X`, which scaled by the residual mean
+        squared error is the parameter covariance matrix.
+    '''
+    p = Xty.shape[-1]
+    XtX_inv = _pinv(XtX)
+    params = np.einsum('...ij,...j->...i', XtX_inv, Xty)
+
+    # At the solution X'X b = X'y, so the residual sum of squares is
+    # y'y - b'X'y.
+    ssr = np.maximum(yty - (params * Xty).sum(axis=-1), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centered_tss = yty - ysum ** 2 / nobs
+
+        df_resid = (nobs - p).astype(float)
+        df_resid[df_resid <= 0] = np.nan
+        scale = ssr / df_resid
+        bse = np.sqrt(scale[..., np.newaxis] *
+                      np.diagonal(XtX_inv, axis1=-2, axis2=-1))
+        tvalues = params / bse
+        pvalues = 2 * stats.t.sf(np.abs(tvalues), df_resid[..., np.newaxis])
+
+        rsquared = 1 - ssr / centered_tss
+        rsquared_adj = 1 - (nobs - 1) / df_resid * (1 - rsquared)
+
+    return params, pvalues, rsquared_adj, ssr, XtX_inv
+
+
+def _degree_days_sufficient(degree_days):
+    return not ((np.nansum(degree_days > 0) < 10) or
+                (np.nansum(degree_days) < 20))
+
+
+def _normalize_bp(bp):
+    bp = round(float(bp), 6)
+    return int(bp) if bp.is_integer() else bp
+
+
+def _bp_column(kind, bp):
+    ''' Data frame column of degree days for a balance point, e.g.
+    `'CDD_65'`, or `'CDD_65_5'` for 65.5 degF (patsy formulas need valid
+    identifiers).
+    '''
+    return '{}_{}'.format(kind, str(_normalize_bp(bp)).replace('.', '_'))
+
+
+def _parse_bp(suffix):
+    return _normalize_bp(suffix.replace('_', '.'))
+
+
+def _balance_point_grid(low, high, resolution=1):
+    ''' Balance points from `low` to `high` (inclusive) spaced by
+    `resolution`. Integral balance points are ints, so the default grids
+    give the same column names as `range(low, high + 1)`.
+    '''
+    n = int(np.floor((high - low) / float(resolution) + 1e-9))
+    return [_normalize_bp(low + i * resolution) for i in range(n + 1)]
+
+
+def _daily_degree_days(kind, bp, temps):
+    ''' Daily CDD or HDD for a balance point, NaN for days without
+    temperature data.
+    '''
+    if kind == 'CDD':
+        return np.maximum(temps - bp, 0)
+    return np.maximum(bp - temps, 0)
+
+
+def _average_degree_days(kind, bp, temps, starts, ends, min_days):
+    ''' Average degree days over windows `temps[starts[i]:ends[i]]`,
+    counting only days with temperature data, or NaN for windows with
+    fewer than `min_days` such days.
+    '''
+    if kind == 'CDD':
+        degree_days = np.maximum(temps - bp, 0)
+    else:
+        degree_days = np.maximum(bp - temps, 0)
+    finite = np.isfinite(degree_days)
+    cumulative = np.zeros((2, len(degree_days) + 1))
+    np.cumsum(np.where(finite, degree_days, 0), out=cumulative[0, 1:])
+    np.cumsum(finite, out=cumulative[1, 1:])
+    sums = cumulative[:, ends] - cumulative[:, starts]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(sums[1] >= min_days, sums[0] / sums[1], np.nan)
+
+
+def _degree_day_balance_points(bp_cdd, bp_hdd, params=None):
+    ''' Balance points to format into a data frame: the model's grid, or
+    given fitted parameters (a dict or :any:`CaltrackFit`) only the fitted
+    balance points, which are all that predicting with them reads.
+    '''
+    if params is None:
+        return list(bp_cdd), list(bp_hdd)
+    if isinstance(params, CaltrackFit):
+        cdd_bp, hdd_bp = params.cdd_bp, params.hdd_bp
+    else:
+        cdd_bp, hdd_bp = params.get('cdd_bp'), params.get('hdd_bp')
+    return ([] if cdd_bp is None else [cdd_bp],
+            [] if hdd_bp is None else [hdd_bp])
+
+
+class DegreeDayDesign(object):
+    ''' Compiled design matrix builder for a fitted Caltrack formula. Maps
+    temperatures straight to the design array, with each row
+    `[1, max(t - cdd_bp, 0), max(hdd_bp - t, 0)]` restricted to the
+    formula's terms, without building degree day data frames or going
+    through patsy.
+
+    Parameters
+    ----------
+    columns : list of str
+        Design matrix column names in order, as in the fitted parameters,
+        e.g. `['Intercept', 'CDD_70', 'HDD_60']`.
+    '''
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.terms = []
+        for column in self.columns:
+            if column == 'Intercept':
+                self.terms.append((column, None))
+            else:
+                kind, suffix = column.split('_', 1)
+                if kind not in ('CDD', 'HDD'):
+                    raise ValueError(
+                        'Unknown design matrix column: {}'.format(column))
+                self.terms.append((kind, _parse_bp(suffix)))
+
+    def __repr__(self):
+        return 'DegreeDayDesign({})'.format(self.columns)
+
+    def build(self, temps):
+        ''' Design matrix of shape `(len(temps), len(columns))`; rows with
+        missing temperatures are NaN except for the intercept.
+        '''
+        temps = np.asarray(temps, dtype=float)
+        X = np.empty((len(temps), len(self.terms)))
+        for j, (kind, bp) in enumerate(self.terms):
+            if kind == 'Intercept':
+                X[:, j] = 1
+            elif kind == 'CDD':
+                np.maximum(temps - bp, 0, out=X[:, j])
+            else:
+                np.maximum(bp - temps, 0, out=X[:, j])
+        return X
+
+
+class CaltrackFit(object):
+    ''' Compact fitted Caltrack model: everything needed to predict,
+    detached from the statsmodels results and the training data, so it
+    pickles to a few hundred bytes.
+
+    Parameters
+    ----------
+    formula : str
+        Formula of the selected model, e.g. `'upd ~ CDD_70 + HDD_60'`.
+    columns : list of str
+        Design matrix column names, in coefficient order.
+    coefficients : array_like, shape (p,)
+        Fitted coefficients.
+    cov : array_like, shape (p, p)
+        Parameter covariance matrix.
+    mse_resid : float
+        Mean squared error of the model residuals.
+    cdd_bp, hdd_bp : float or None
+        Fitted balance points, if the model has those terms.
+    stats : dict, default None
+        Fit statistics, e.g. `r2`, `rmse`, `cvrmse` and `n`.
+    '''
+    __slots__ = ('formula', 'columns', 'coefficients', 'cov', 'mse_resid',
+                 'cdd_bp', 'hdd_bp', 'stats', '_design')
+
+    def __init__(self, formula, columns, coefficients, cov, mse_resid,
+                 cdd_bp=None, hdd_bp=None, stats=None):
+        self.formula = formula
+        self.columns = tuple(columns)
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.cov = np.asarray(cov, dtype=float)
+        self.mse_resid = float(mse_resid)
+        self.cdd_bp = cdd_bp
+        self.hdd_bp = hdd_bp
+        self.stats = dict(stats or {})
+        self._design = None
+
+    @classmethod
+    def from_results(cls, formula, model_res, cdd_bp=None, hdd_bp=None,
+                     **stats):
+        ''' Compact fit from statsmodels regression results. '''
+        return cls(formula, model_res.params.index, model_res.params.values,
+                   model_res.cov_params().values, model_res.mse_resid,
+                   cdd_bp=cdd_bp, hdd_bp=hdd_bp, stats=stats)
+
+    @classmethod
+    def from_moments(cls, terms, moments, solution, **stats):
+        ''' Compact fit of `upd ~ <terms>` from its sufficient statistics.
+
+        Parameters
+        ----------
+        terms : list of (kind, bp) tuples
+            Degree day terms of the model, e.g. :code:`[('HDD', 60)]`.
+        moments : tuple
+            :code:`(nobs, ysum, yty, Xty, XtX)` of the model, as returned
+            (per response and candidate) by :any:`_candidate_moments`.
+        solution : tuple
+            :code:`(params, ssr, XtX_inv)` of the model, as returned by
+            :any:`_solve_candidate_moments`.
+        **stats
+            Other fit statistics, e.g. `r2`. The `rmse`, `cvrmse`, `nmbe`
+            and `n` of the fit are added.
+        '''
+        nobs, ysum, yty, Xty, XtX = moments
+        params, ssr, XtX_inv = solution
+        columns = ['Intercept'] + [_bp_column(kind, bp) for kind, bp in terms]
+        formula = 'upd ~ ' + (' + '.join(columns[1:]) or '1')
+        bps = dict(terms)
+
+        mse_resid = ssr / (nobs - len(columns))
+        rmse = np.sqrt(ssr / nobs)
+        y_mean = ysum / nobs
+        # The intercept column sums the fitted values.
+        resid_mean = (ysum - np.dot(XtX[0], params)) / nobs
+        stats.update({
+            'rmse': rmse,
+            'cvrmse': rmse / y_mean,
+            'nmbe': resid_mean / y_mean,
+            'n': int(nobs),
+        })
+        return cls(formula, columns, params, mse_resid * XtX_inv, mse_resid,
+                   cdd_bp=bps.get('CDD'), hdd_bp=bps.get('HDD'), stats=stats)
+
+    def __repr__(self):
+        return 'CaltrackFit({!r})'.format(self.formula)
+
+    def __getstate__(self):
+        return (self.formula, self.columns, self.coefficients.tolist(),
+                self.cov.tolist(), self.mse_resid, self.cdd_bp, self.hdd_bp,
+                self.stats)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    @property
+    def design(self):
+        ''' :any:`DegreeDayDesign` for the fitted formula. '''
+        if self._design is None:
+            self._design = DegreeDayDesign(self.columns)
+        return self._design
+
+    def predict(self, temps):
+        ''' Predictions and prediction variances for temperatures `temps`,
+        which must all be finite.
+        '''
+        X = self.design.build(temps)
+        predicted = np.dot(X, self.coefficients)
+        variance = prediction_variance(X, self.cov, self.mse_resid)
+        return predicted, variance
+
+
+class CandidateMoments(object):
+    ''' Sufficient statistics of the least squares fits of usage on each
+    of a set of Caltrack candidate models, accumulated chunk by chunk so
+    that the candidates can be fit without holding all of the data (or its
+    degree day columns) in memory.
+
+    Parameters
+    ----------
+    candidates : list of lists of (kind, bp) tuples
+        Degree day terms of each candidate, all with the same number of
+        terms, e.g. :code:`[[('CDD', 70), ('HDD', 60)]]`, or :code:`[[]]`
+        for the intercept-only model.
+
+    Attributes
+    ----------
+    moments : tuple
+        :code:`(nobs, ysum, yty, Xty, XtX)` of each candidate so far, as
+        returned for a single response by :any:`_candidate_moments`, or
+        None before any data is added.
+    '''
+
+    def __init__(self, candidates):
+        self.candidates = [list(c) for c in candidates]
+        self.designs = [
+            DegreeDayDesign(
+                ['Intercept'] + [_bp_column(kind, bp) for kind, bp in c])
+            for c in self.candidates
+        ]
+        self.moments = None
+        self._degree_day_totals = {}
+
+    def __repr__(self):
+        return 'CandidateMoments(n_candidates={})'.format(
+            len(self.candidates))
+
+    def add(self, temps, usage):
+        ''' Adds a chunk of data.
+
+        Parameters
+        ----------
+        temps : array_like
+            Temperature (degF) of each row.
+        usage : array_like
+            Usage of each row, NaN if missing.
+        '''
+        temps = np.asarray(temps, dtype=float)
+        usage = np.asarray(usage, dtype=float)
+
+        for c in self.candidates:
+            for kind, bp in c:
+                if (kind, bp) not in self._degree_day_totals:
+                    self._degree_day_totals[(kind, bp)] = np.zeros(2)
+        with np.errstate(invalid='ignore'):
+            for (kind, bp), totals in self._degree_day_totals.items():
+                degree_days = DegreeDayDesign(
+                    [_bp_column(kind, bp)]).build(temps)[:, 0]
+                totals += [np.nansum(degree_days > 0),
+                           np.nansum(degree_days)]
+
+        X = np.array([design.build(temps) for design in self.designs])
+        moments = [m[0] for m in _candidate_moments(usage[np.newaxis], X)]
+        if self.moments is None:
+            self.moments = tuple(moments)
+        else:
+            self.moments = tuple(a + b for a, b in zip(self.moments, moments))
+
+    def sufficient(self):
+        ''' Whether each candidate has sufficient degree days (see
+        :any:`_degree_days_sufficient`).
+        '''
+        return np.array([
+            all(not (self._degree_day_totals[term][0] < 10 or
+                     self._degree_day_totals[term][1] < 20) for term in c)
+            for c in self.candidates
+        ], dtype=bool)
+
+    def solve(self):
+        ''' Fits all candidates, returning
+        :code:`(params, pvalues, rsquared_adj, ssr, XtX_inv)` as
+        :any:`_solve_candidate_moments` does, for a single response.
+        '''
+        solution = _solve_candidate_moments(
+            *[m[np.newaxis] for m in self.moments])
+        return tuple(s[0] for s in solution)
+
+
+class BalancePointSearch(object):
+    ''' Strategy for searching balance point temperatures in the Caltrack
+    candidate models.
+
+    Parameters
+    ----------
+    method : str, default 'exhaustive'
+        - :code:`'exhaustive'`: fit every candidate formatted into the data
+          frame (the Caltrack grid search).
+        - :code:`'coarse_to_fine'`: fit a coarse grid spanning the
+          formatted balance points, then repeatedly halve the step around
+          the best candidate down to `resolution`.
+        - :code:`'golden_section'`: bounded golden-section search on
+          adjusted R-squared over the same range (nested for HDD+CDD
+          models), assuming it is unimodal.
+    resolution : float, default 1
+        Grid spacing in degF for the non-exhaustive methods. May be below
+        one degree.
+    degree_days : callable, default None
+        :code:`degree_days(kind, bp)`, returning the `'CDD'` or `'HDD'`
+        column for balance points which are not formatted into the data
+        frame. Required by the non-exhaustive methods.
+
+    Attributes
+    ----------
+    n_candidates : dict
+        Number of candidate models evaluated for each model type
+        (`'cdd_only'`, `'hdd_only'`, `'full'`).
+    '''
+
+    methods = ('exhaustive', 'coarse_to_fine', 'golden_section')
+
+    def __init__(self, method='exhaustive', resolution=1, degree_days=None):
+        if method not in self.methods:
+            raise ValueError(
+                'Unknown balance point search method {}'.format(method))
+        self.method = method
+        self.resolution = resolution
+        self.degree_days = degree_days
+        self.n_candidates = {}
+
+    def __repr__(self):
+        return 'BalancePointSearch("{}", resolution={})'.format(
+            self.method, self.resolution)
+
+    def grid(self, bps):
+        ''' Balance points to search given those formatted into the data
+        frame.
+        '''
+        bps = sorted(bps)
+        if self.method == 'exhaustive' or len(bps) == 0:
+            return bps
+        return _balance_point_grid(bps[0], bps[-1], self.resolution)
+
+    def search(self, model_type, grids, score, allowed=None):
+        ''' Find the best candidate.
+
+        Parameters
+        ----------
+        model_type : str
+            Key for :any:`n_candidates`.
+        grids : list of lists
+            Sorted balance points for each dimension of the search.
+        score : callable
+            :code:`score(candidates)`, returning an array of scores (higher
+            is better, -inf if unqualified) for a list of candidates, each a
+            tuple of balance points.
+        allowed : callable, default None
+            :code:`allowed(candidate)`, False for candidates to skip.
+
+        Returns
+        -------
+        best : tuple or None
+            Highest-scoring candidate evaluated (the first in grid order on
+            ties), or None if none qualified.
+        '''
+        scores = {}
+
+        def candidate(index):
+            return tuple(grid[i] for grid, i in zip(grids, index))
+
+        def evaluate(indices):
+            new = []
+            for index in indices:
+                if index not in scores and index not in new and \
+                        (allowed is None or allowed(candidate(index))):
+                    new.append(index)
+            if len(new) > 0:
+                values = score([candidate(index) for index in new])
+                scores.update(zip(new, values))
+                self.n_candidates[model_type] = \
+                    self.n_candidates.get(model_type, 0) + len(new)
+            return [scores.get(index, -np.inf) for index in indices]
+
+        if any(len(grid) == 0 for grid in grids):
+            return None
+
+        if self.method == 'exhaustive':
+            evaluate(list(itertools.product(
+                *[range(len(grid)) for grid in grids])))
+        elif self.method == 'coarse_to_fine':
+            self._coarse_to_fine([len(grid) for grid in grids], evaluate, scores)
+        else:
+            self._golden_section([len(grid) for grid in grids], evaluate,
+                                 allowed, candidate)
+
+        best = _best_index(scores)
+        if best is None:
+            return None
+        return candidate(best)
+
+    def _coarse_to_fine(self, sizes, evaluate, scores):
+        step = 1
+        while max((size - 1) // step for size in sizes) > 4:
+            step *= 2
+        evaluate(list(itertools.product(*[
+            sorted(set(range(0, size, step)) | set([size - 1]))
+            for size in sizes
+        ])))
+        best = _best_index(scores)
+        while best is not None and step > 1:
+            step //= 2
+            evaluate(list(itertools.product(*[
+                sorted(set(min(max(i + offset * step, 0), size - 1)
+                           for offset in (-1, 0, 1)))
+                for i, size in zip(best, sizes)
+            ])))
+            best = _best_index(scores)
+
+    def _golden_section(self, sizes, evaluate, allowed, candidate):
+
+        def inner(prefix):
+            # golden-section over the last dimension given the others
+            size = sizes[len(prefix)]
+            indices = range(size)
+            if allowed is not None and len(prefix) == len(sizes) - 1:
+                indices = [i for i in indices
+                           if allowed(candidate(prefix + (i,)))]
+            if len(indices) == 0:
+                return -np.inf
+            if len(prefix) == len(sizes) - 1:
+                def f(i):
+                    return evaluate([prefix + (i,)])[0]
+            else:
+                def f(i):
+                    return inner(prefix + (i,))
+            return _golden_section_max(f, indices[0], indices[-1])
+
+        inner(())
+
+
+def _best_index(scores):
+    best, best_score = None, -np.inf
+    for index in sorted(scores):
+        if scores[index] > best_score:
+            best, best_score = index, scores[index]
+    return best
+
+
+def _golden_section_max(f, lo, hi):
+    ''' Maximize `f` over the integers `lo..hi`, assuming it is unimodal.
+    Returns the best value found.
+    '''
+    invphi = (np.sqrt(5) - 1) / 2
+    values = {}
+
+    def value(i):
+        if i not in values:
+            values[i] = f(i)
+        return values[i]
+
+    while hi - lo > 3:
+        c = hi - int(round(invphi * (hi - lo)))
+        d = lo + int(round(invphi * (hi - lo)))
+        if c >= d:
+            d = c + 1
+        if value(c) >= value(d):
+            hi = d
+        else:
+            lo = c
+    return max(value(i) for i in range(lo, hi + 1))
+
+
+def _candidate_designs(df, candidates, degree_days=None):
+    ''' Design matrices `[1, <degree day columns>]` of the candidates with
+    sufficient degree days.
+
+    Returns
+    -------
+    fit : numpy.ndarray
+        Indices of the candidates with sufficient degree days.
+    X : numpy.ndarray, shape (len(fit), len(df.index), p)
+        Their design matrices.
+    '''
+    columns = {}
+
+    def column(kind, bp):
+        name = _bp_column(kind, bp)
+        if name not in columns:
+            if name in df.columns:
+                columns[name] = df[name].values.astype(float)
+            else:
+                columns[name] = degree_days(kind, bp)
+        return columns[name]
+
+    sufficient = [
+        all(_degree_days_sufficient(column(kind, bp)) for kind, bp in c)
+        for c in candidates
+    ]
+    fit = np.flatnonzero(sufficient)
+    if len(fit) == 0:
+        return fit, None
+
+    n, p = len(df.index), len(candidates[0]) + 1
+    X = np.ones((len(fit), n, p))
+    for i, c in enumerate(fit):
+        for j, (kind, bp) in enumerate(candidates[c]):
+            X[i, :, j + 1] = column(kind, bp)
+    return fit, X
+
+
+def _qualified_scores(params, pvalues, rsquared_adj):
+    ''' Adjusted R-squared of candidates with non-negative coefficients
+    and degree day p-values below 0.1, -inf for the others.
+    '''
+    with np.errstate(invalid='ignore'):
+        qualified = (params >= 0).all(axis=-1) & \
+            (pvalues[..., 1:] < 0.1).all(axis=-1) & (rsquared_adj > -9e9)
+    return np.where(qualified, rsquared_adj, -np.inf)
+
+
+def _candidate_scores(df, candidates, weighted=False, degree_days=None):
+    ''' Fit `upd ~ <degree day columns>` for each candidate in one batch.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Formatted data with `upd`, `ndays` and degree day columns.
+    candidates : list of lists of (kind, bp) tuples
+        Degree day columns of each candidate, e.g.
+        :code:`[('CDD', 70), ('HDD', 60)]`.
+    weighted : bool, default False
+        Fit WLS weighted by `ndays`.
+    degree_days : callable, default None
+        :code:`degree_days(kind, bp)` for columns not in `df`.
+
+    Returns
+    -------
+    scores : numpy.ndarray
+        Adjusted R-squared of each candidate, or -inf for candidates
+        without sufficient degree days, with negative coefficients or with
+        degree day p-values of 0.1 or more.
+    '''
+    scores = np.full(len(candidates), -np.inf)
+    fit, X = _candidate_designs(df, candidates, degree_days)
+    if len(fit) == 0:
+        return scores
+
+    weights = df['ndays'].values.astype(float) if weighted else None
+    params, pvalues, rsquared_adj = _fit_candidates(
+        df['upd'].values.astype(float), X, weights)
+    scores[fit] = _qualified_scores(params, pvalues, rsquared_adj)
+    return scores
+
+
+def _add_degree_day_columns(df, columns, degree_days):
+    for kind, bp in columns:
+        name = _bp_column(kind, bp)
+        if name not in df.columns:
+            df[name] = degree_days(kind, bp)
+
+
+def _selected_model(full, hdd, cdd, intercept):
+    ''' Caltrack stage two selection: the qualified candidate model with
+    the highest adjusted R-squared, falling back to intercept-only.
+
+    Parameters
+    ----------
+    full, hdd, cdd, intercept : tuple
+        :code:`(qualified, rsquared)` of each candidate model.
+
+    Returns
+    -------
+    selected : str
+        One of `'full'`, `'hdd_only'`, `'cdd_only'` or `'intercept'`.
+    '''
+    models = [('full', full), ('hdd_only', hdd), ('cdd_only', cdd),
+              ('intercept', intercept)]
+    for name, (qualified, rsquared) in models[:3]:
+        if qualified and rsquared > max([
+            int(q) * r for other, (q, r) in models if other != name
+        ]):
+            return name
+    return 'intercept'
 
 
 def _fit_intercept(df, weighted=False):
     int_formula = 'upd ~ 1'
     try:
-        if weighted:
-            int_mod = smf.wls(formula=int_formula, data=df, weights=df['ndays'])
-        else:
-            int_mod = smf.ols(formula=int_formula, data=df)
-        int_res = int_mod.fit()
+        int_mod, int_res = _fit_formula(int_formula, df, weighted=weighted)
     except:  # TODO: catch specific error
         int_rsquared, int_qualified = 0, False
         int_formula, int_mod, int_res = None, None, None
@@ -19,119 +798,84 @@ def _fit_intercept(df, weighted=False):
     return int_formula, int_mod, int_res, int_rsquared, int_qualified
 
 
-def _fit_cdd_only(df, weighted=False):
+def _df_balance_points(df, kind):
+    return [_parse_bp(i[4:]) for i in df.columns if i[:3] == kind]
+
 
-    bps = [i[4:] for i in df.columns if i[:3] == 'CDD']
+def _fit_single(df, kind, model_type, weighted=False, search=None, bps=None):
+    if search is None:
+        search = BalancePointSearch()
+
+    # Balance points of degree day columns in the data frame, unless given
+    # explicitly for the search to compute.
+    if bps is None:
+        bps = _df_balance_points(df, kind)
     best_bp, best_rsquared, best_mod, best_res = None, -9e9, None, None
-    best_formula, cdd_qualified = None, False
+    best_formula, qualified = None, False
 
     try:  # TODO: fix big try block anti-pattern
-        for bp in bps:
-            candidate_cdd_formula = 'upd ~ CDD_' + bp
-            if (np.nansum(df['CDD_' + bp] > 0) < 10) or \
-               (np.nansum(df['CDD_' + bp]) < 20):
-                continue
-            if weighted:
-                candidate_cdd_mod = smf.wls(formula=candidate_cdd_formula, data=df,
-                                            weights=df['ndays'])
-            else:
-                candidate_cdd_mod = smf.ols(formula=candidate_cdd_formula, data=df)
-            candidate_cdd_res = candidate_cdd_mod.fit()
-            candidate_cdd_rsquared = candidate_cdd_res.rsquared_adj
-            if (candidate_cdd_rsquared > best_rsquared and
-                    candidate_cdd_res.params['Intercept'] >= 0 and
-                    candidate_cdd_res.params['CDD_' + bp] >= 0 and
-                    candidate_cdd_res.pvalues['CDD_' + bp] < 0.1):
-                best_bp, best_rsquared = int(bp), candidate_cdd_rsquared
-                best_mod, best_res = candidate_cdd_mod, candidate_cdd_res
-                cdd_qualified = True
-                best_formula = 'upd ~ CDD_' + bp
+        best = search.search(
+            model_type, [search.grid(bps)],
+            lambda candidates: _candidate_scores(
+                df, [[(kind, bp)] for bp, in candidates], weighted,
+                search.degree_days))
+        if best is not None:
+            bp, = best
+            _add_degree_day_columns(df, [(kind, bp)], search.degree_days)
+            best_formula = 'upd ~ ' + _bp_column(kind, bp)
+            best_mod, best_res = _fit_formula(best_formula, df, weighted)
+            best_bp, best_rsquared = bp, best_res.rsquared_adj
+            qualified = True
     except:  # TODO: catch specific error
-        best_rsquared, cdd_qualified = 0, False
+        best_rsquared, qualified = 0, False
         best_formula, best_mod, best_res = None, None, None
         best_bp = None
 
-    return best_formula, best_mod, best_res, best_rsquared, cdd_qualified, best_bp
+    return best_formula, best_mod, best_res, best_rsquared, qualified, best_bp
 
 
-def _fit_hdd_only(df, weighted=False):
+def _fit_cdd_only(df, weighted=False, search=None, bps=None):
+    return _fit_single(df, 'CDD', 'cdd_only', weighted, search, bps)
 
-    bps = [i[4:] for i in df.columns if i[:3] == 'HDD']
-    best_bp, best_rsquared, best_mod, best_res = None, -9e9, None, None
-    best_formula, hdd_qualified = None, False
-
-    try:  # TODO: fix big try block anti-pattern
-        for bp in bps:
-            candidate_hdd_formula = 'upd ~ HDD_' + bp
-            if (np.nansum(df['HDD_' + bp] > 0) < 10) or \
-               (np.nansum(df['HDD_' + bp]) < 20):
-                continue
-            if weighted:
-                candidate_hdd_mod = smf.wls(formula=candidate_hdd_formula, data=df,
-                                            weights=df['ndays'])
-            else:
-                candidate_hdd_mod = smf.ols(formula=candidate_hdd_formula, data=df)
-            candidate_hdd_res = candidate_hdd_mod.fit()
-            candidate_hdd_rsquared = candidate_hdd_res.rsquared_adj
-            if (candidate_hdd_rsquared > best_rsquared and
-                    candidate_hdd_res.params['Intercept'] >= 0 and
-                    candidate_hdd_res.params['HDD_' + bp] >= 0 and
-                    candidate_hdd_res.pvalues['HDD_' + bp] < 0.1):
-                best_bp, best_rsquared = int(bp), candidate_hdd_rsquared
-                best_mod, best_res = candidate_hdd_mod, candidate_hdd_res
-                hdd_qualified = True
-                best_formula = 'upd ~ HDD_' + bp
-    except:  # TODO: catch specific error
-        best_rsquared, hdd_qualified = 0, False
-        best_formula, best_mod, best_res = None, None, None
-        best_bp = None
 
-    return best_formula, best_mod, best_res, best_rsquared, hdd_qualified, best_bp
+def _fit_hdd_only(df, weighted=False, search=None, bps=None):
+    return _fit_single(df, 'HDD', 'hdd_only', weighted, search, bps)
 
 
-def _fit_full(df, weighted=False):
+def _fit_full(df, weighted=False, search=None, hdd_bps=None, cdd_bps=None):
+    if search is None:
+        search = BalancePointSearch()
 
-    hdd_bps = [i[4:] for i in df.columns if i[:3] == 'HDD']
-    cdd_bps = [i[4:] for i in df.columns if i[:3] == 'CDD']
+    if hdd_bps is None:
+        hdd_bps = _df_balance_points(df, 'HDD')
+    if cdd_bps is None:
+        cdd_bps = _df_balance_points(df, 'CDD')
 
     best_hdd_bp, best_cdd_bp, best_rsquared, best_mod, best_res = \
         None, None, -9e9, None, None
     best_formula, full_qualified = None, False
 
     try:  # TODO: fix big try block anti-pattern
-        for hdd_bp in hdd_bps:
-            for cdd_bp in cdd_bps:
-                if cdd_bp < hdd_bp:
-                    continue
-                candidate_full_formula = 'upd ~ CDD_' + cdd_bp + \
-                                         ' + HDD_' + hdd_bp
-                if (np.nansum(df['HDD_' + hdd_bp] > 0) < 10) or \
-                   (np.nansum(df['HDD_' + hdd_bp]) < 20):
-                    continue
-                if (np.nansum(df['CDD_' + cdd_bp] > 0) < 10) or \
-                   (np.nansum(df['CDD_' + cdd_bp]) < 20):
-                    continue
-                if weighted:
-                    candidate_full_mod = smf.wls(formula=candidate_full_formula, data=df,
-                                                 weights=df['ndays'])
-                else:
-                    candidate_full_mod = smf.ols(formula=candidate_full_formula, data=df)
-                candidate_full_res = candidate_full_mod.fit()
-                candidate_full_rsquared = candidate_full_res.rsquared_adj
-                if (candidate_full_rsquared > best_rsquared and
-                        candidate_full_res.params['Intercept'] >= 0 and
-                        candidate_full_res.params['HDD_' + hdd_bp] >= 0 and
-                        candidate_full_res.params['CDD_' + cdd_bp] >= 0 and
-                        candidate_full_res.pvalues['HDD_' + hdd_bp] < 0.1 and
-                        candidate_full_res.pvalues['CDD_' + cdd_bp] < 0.1):
-                    best_hdd_bp, best_cdd_bp, best_rsquared = \
-                        int(hdd_bp), int(cdd_bp), candidate_full_rsquared
-                    best_mod, best_res = candidate_full_mod, candidate_full_res
-                    full_qualified = True
-                    best_formula = 'upd ~ CDD_' + cdd_bp + ' + HDD_' + hdd_bp
+        best = search.search(
+            'full', [search.grid(hdd_bps), search.grid(cdd_bps)],
+            lambda candidates: _candidate_scores(
+                df, [[('CDD', cdd_bp), ('HDD', hdd_bp)]
+                     for hdd_bp, cdd_bp in candidates], weighted,
+                search.degree_days),
+            allowed=lambda candidate: candidate[1] >= candidate[0])
+        if best is not None:
+            hdd_bp, cdd_bp = best
+            _add_degree_day_columns(
+                df, [('CDD', cdd_bp), ('HDD', hdd_bp)], search.degree_days)
+            best_formula = 'upd ~ ' + _bp_column('CDD', cdd_bp) + \
+                ' + ' + _bp_column('HDD', hdd_bp)
+            best_mod, best_res = _fit_formula(best_formula, df, weighted)
+            best_hdd_bp, best_cdd_bp, best_rsquared = \
+                hdd_bp, cdd_bp, best_res.rsquared_adj
+            full_qualified = True
     except:  # TODO: catch specific error
         best_rsquared, full_qualified = 0, False
         best_formula, best_mod, best_res = None, None, None
-        best_hdd_bp, best_hdd_bp = None, None
+        best_hdd_bp, best_cdd_bp = None, None
 
     return best_formula, best_mod, best_res, best_rsquared, full_qualified, best_hdd_bp, best_cdd_bp
@@ -2,9 +2,60 @@ import warnings
 
 import numpy as np
 import pandas as pd
-import patsy
-from scipy.stats import chi2
-from sklearn import linear_model
+
+from eemeter.lazy import lazy_import
+
+joblib = lazy_import('joblib')
+patsy = lazy_import('patsy')
+stats = lazy_import('scipy.stats')
+scipy_sparse = lazy_import('scipy.sparse')
+linear_model = lazy_import('sklearn.linear_model')
+
+
+def _sparse_design_matrices(design_infos, data, chunk_size=4096):
+    ''' Builds patsy design matrices as `scipy.sparse.csr_matrix`, at most
+    `chunk_size` rows at a time, so that only one chunk is ever dense.
+
+    Parameters
+    ----------
+    design_infos : list of patsy.DesignInfo
+        Designs to build, e.g. from :code:`patsy.incr_dbuilders`.
+    data : pandas.DataFrame
+        Data to build the designs from. As in patsy, rows with missing
+        values in any of the designs are dropped.
+    chunk_size : int, default 4096
+        Number of rows of `data` to build at once.
+
+    Returns
+    -------
+    matrices : list of scipy.sparse.csr_matrix
+        Design matrix of each design.
+    index : pandas.Index
+        Rows of `data` in the design matrices.
+    '''
+    blocks, indexes = [], []
+    for start in range(0, max(len(data), 1), chunk_size):
+        chunk = patsy.build_design_matrices(
+            design_infos, data.iloc[start:start + chunk_size],
+            return_type='dataframe')
+        blocks.append([scipy_sparse.csr_matrix(m.values) for m in chunk])
+        indexes.append(chunk[0].index)
+    matrices = [scipy_sparse.vstack(b, format='csr') for b in zip(*blocks)]
+    return matrices, indexes[0].append(indexes[1:])
+
+
+def _split_residuals(X, y, split_index, n_resid, params):
+    # Residuals of the n_resid points following split_index, predicted by an
+    # elastic net fit to the points before it. params holds the fixed alpha
+    # and l1_ratio, and the coefficients to warm start from.
+    model = linear_model.ElasticNet(
+        alpha=params['alpha'], l1_ratio=params['l1_ratio'],
+        fit_intercept=False, max_iter=params['max_iter'], tol=params['tol'],
+        warm_start=True)
+    model.coef_ = params['coef'].copy()
+    model.fit(X[:split_index], y[:split_index])
+    post_split = slice(split_index, split_index + n_resid)
+    return model.predict(X[post_split]) - y[post_split]
 
 
 class ElasticNetCVBaseModel(object):
@@ -19,11 +70,13 @@ class ElasticNetCVBaseModel(object):
     The rest is shared in this base model.
     """
 
-    def __init__(self, cooling_base_temp, heating_base_temp, n_bootstrap):
+    def __init__(self, cooling_base_temp, heating_base_temp, n_bootstrap,
+                 n_jobs=1):
 
         self.cooling_base_temp = cooling_base_temp
         self.heating_base_temp = heating_base_temp
         self.n_bootstrap = n_bootstrap
+        self.n_jobs = n_jobs
 
         self.base_formula = 'energy ~ 1 + CDD + HDD + CDD:HDD'
 
@@ -40,6 +93,7 @@ class ElasticNetCVBaseModel(object):
         self.cvrmse = None
         self.n = None
         self.input_data = None
+        self.bootstrap_residuals = None
 
     def fit(self, input_data):
         ''' Fits a model to the input data.
@@ -76,7 +130,12 @@ class ElasticNetCVBaseModel(object):
         self.input_data = input_data
         model_data = self._model_data_from_input_data(input_data)
         formula = self._patsy_formula(model_data)
-        y, X = patsy.dmatrices(formula, model_data, return_type='dataframe')
+        y_design_info, X_design_info = patsy.incr_dbuilders(
+            formula, lambda: iter([model_data]))
+        (y, X), index = _sparse_design_matrices(
+            [y_design_info, X_design_info], model_data)
+        y = pd.DataFrame(y.toarray(), index=index,
+                         columns=y_design_info.column_names)
 
         self.X = X
         self.y = y
@@ -85,8 +144,7 @@ class ElasticNetCVBaseModel(object):
                                               fit_intercept=False)
         model_obj.fit(X, y.values.ravel())
 
-        estimated = pd.Series(model_obj.predict(X),
-                              index=model_data.energy.index)
+        estimated = pd.Series(model_obj.predict(X), index=index)
 
         self.estimated = estimated
         self.model_obj = model_obj
@@ -122,7 +180,7 @@ class ElasticNetCVBaseModel(object):
 
         n = self.estimated.shape[0]
 
-        c1, c2 = chi2.ppf([0.025, 1 - 0.025], n)
+        c1, c2 = stats.chi2.ppf([0.025, 1 - 0.025], n)
         self.lower = np.sqrt(n / c2) * self.rmse
         self.upper = np.sqrt(n / c1) * self.rmse
         self.variance = self.rmse ** 2
@@ -135,7 +193,7 @@ class ElasticNetCVBaseModel(object):
         self.params = {
             "coefficients": list(model_obj.coef_),
             "intercept": model_obj.intercept_,
-            "X_design_info": X.design_info,
+            "X_design_info": X_design_info,
             "formula": formula,
         }
 
@@ -151,34 +209,41 @@ class ElasticNetCVBaseModel(object):
         return output
 
     def _bootstrap_empirical_errors(self):
-        ''' Calculate empirical bootstrap error function '''
+        ''' Calculate empirical bootstrap error function
+
+        Each split is fit by an `ElasticNet` with the alpha and l1_ratio
+        selected by the cross-validated fit, warm started from its
+        coefficients, rather than by a new cross-validated fit. Splits are
+        fit in parallel over `n_jobs` processes (see `joblib.Parallel`).
+        Residuals are kept in :code:`bootstrap_residuals`; the fitted
+        :code:`model_obj` is left as is.
+        '''
 
         min_points = self.n_bootstrap * 2
 
         # fallback error function
-        if len(self.X) < min_points:
+        if self.X.shape[0] < min_points:
             return lambda n: self.rmse * (n**0.8)
 
         # split data n_splits times collecting residuals.
         # splits on every index from (n_bootstrap from end)
         # to (n_bootstrap - n_splits from end)
         n_splits = int(self.n_bootstrap / 2)
-        resid_stack = []
-        for i in range(n_splits):
-
-            split_index = (-self.n_bootstrap) + i
-            pre_split = slice(None, split_index)
-            post_split = slice(split_index, None)
-            X_pre = self.X[pre_split]
-            X_post = self.X[post_split]
-            y_pre = self.y.values.ravel()[pre_split]
-            y_post = self.y.values.ravel()[post_split]
-
-            bootstrap_model = self.model_obj.fit(X_pre, y_pre)
-            test = bootstrap_model.predict(X_post)
-            resid = test[:n_splits] - y_post[:n_splits]
-            resid_stack.append(resid)
+        n = self.X.shape[0]
+        y = self.y.values.ravel()
+        params = {
+            'alpha': self.model_obj.alpha_,
+            'l1_ratio': self.model_obj.l1_ratio_,
+            'max_iter': self.model_obj.max_iter,
+            'tol': self.model_obj.tol,
+            'coef': self.model_obj.coef_,
+        }
+        resid_stack = joblib.Parallel(n_jobs=self.n_jobs)(
+            joblib.delayed(_split_residuals)(
+                self.X, y, n - self.n_bootstrap + i, n_splits, params)
+            for i in range(n_splits))
         resid_stack = np.array(resid_stack)
+        self.bootstrap_residuals = resid_stack
 
         # from residuals determine alpha and beta
         xs = list(range(1, 50))
@@ -239,18 +304,15 @@ class ElasticNetCVBaseModel(object):
         model_data = self._model_data_from_demand_fixture_data(
             demand_fixture_data)
 
-        (X,) = patsy.build_design_matrices([design_info],
-                                           model_data,
-                                           return_type='dataframe')
-
-        model_obj = linear_model.ElasticNetCV(l1_ratio=self.l1_ratio,
-                                              fit_intercept=False)
+        (X,), index = _sparse_design_matrices([design_info], model_data)
 
-        model_obj.coef_ = np.array(params["coefficients"])
-        model_obj.intercept_ = params["intercept"]
+        # Apply the fitted coefficients directly rather than through a new
+        # (unfitted) ElasticNetCV.
+        coefficients = np.asarray(params["coefficients"], dtype=float)
 
         try:
-            predicted = pd.Series(model_obj.predict(X), index=X.index)
+            predicted = pd.Series(
+                X.dot(coefficients) + params["intercept"], index=index)
         except:
             return np.nan, np.nan
 
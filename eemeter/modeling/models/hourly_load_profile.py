@@ -1,9 +1,55 @@
+import numpy as np
 import pandas as pd
 import datetime
 import eemeter.modeling.exceptions as model_exceptions
 from eemeter.modeling.models.caltrack_daily import CaltrackDailyModel
 
 
+def _profile_cells(index):
+    # Flat position of each timestamp in the (month, weekday, hour) table.
+    weekday = np.asarray(index.dayofweek < 5, dtype=int)
+    return ((np.asarray(index.month) - 1) * 2 + weekday) * 24 + \
+        np.asarray(index.hour)
+
+
+def _load_profile(input_data):
+    ''' Mean and standard deviation of hourly usage by month, weekend or
+    weekday, and hour of day.
+
+    Parameters
+    ----------
+    input_data : pandas.DataFrame
+        Hourly data with an `energy` column.
+
+    Returns
+    -------
+    mean, std : numpy.ndarray, shape (12, 2, 24)
+        Usage statistics, indexed by :code:`[month - 1, weekday, hour]`
+        where `weekday` is 1 Monday through Friday and 0 otherwise. NaN for
+        cells without usage (std: with fewer than two hours of usage).
+    present : numpy.ndarray of bool, shape (12, 2, 24)
+        Whether there are any hours, with or without usage, in each cell.
+    '''
+    cells = _profile_cells(input_data.index)
+    energy = np.asarray(input_data.energy, dtype=float)
+    valid = np.isfinite(energy)
+    n_cells = 12 * 2 * 24
+
+    present = np.bincount(cells, minlength=n_cells) > 0
+    counts = np.bincount(cells[valid], minlength=n_cells)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.bincount(cells[valid], energy[valid],
+                           minlength=n_cells) / counts
+        squared_deviations = np.bincount(
+            cells[valid], (energy[valid] - mean[cells[valid]]) ** 2,
+            minlength=n_cells)
+        std = np.sqrt(squared_deviations / (counts - 1))
+    std[counts < 2] = np.nan
+
+    shape = (12, 2, 24)
+    return mean.reshape(shape), std.reshape(shape), present.reshape(shape)
+
+
 class HourlyLoadProfileModel(object):
     def __init__(
             self, fit_cdd=True, grid_search=False, min_fraction_coverage=0.9,
@@ -24,6 +70,8 @@ class HourlyLoadProfileModel(object):
         self.nmbe = None
         self.n = None
         self.input_data = None
+        self._profile_input_data = None
+        self._profile = None
         self.min_fraction_coverage = min_fraction_coverage
         self.min_contiguous_months = min_contiguous_months
         self.modeling_period_interpretation = modeling_period_interpretation
@@ -36,6 +84,19 @@ class HourlyLoadProfileModel(object):
     def __repr__(self):
         return 'HourlyLoadProfileModel'
 
+    def load_profile(self):
+        ''' Mean and standard deviation of :code:`input_data` usage by
+        month, weekend or weekday, and hour of day, as arrays of shape
+        `(12, 2, 24)` indexed by :code:`[month - 1, weekday, hour]`, and
+        whether each cell has any hours. Computed on first use and again
+        whenever :code:`input_data` is replaced.
+        '''
+        if self._profile is None or \
+                self._profile_input_data is not self.input_data:
+            self._profile = _load_profile(self.input_data)
+            self._profile_input_data = self.input_data
+        return self._profile
+
     def fit(self, input_data):
         if isinstance(input_data, tuple):
             raise model_exceptions.DataSufficiencyException(
@@ -46,11 +107,11 @@ class HourlyLoadProfileModel(object):
         self.caltrack_model.fit(input_data_daily)
 
         self.params = {
-            "coefficients": self.caltrack_model.model_res.params.to_dict(),
+            "coefficients": self.caltrack_model.params["coefficients"],
             "formula": self.caltrack_model.formula,
             "cdd_bp": self.caltrack_model.fit_bp_cdd,
             "hdd_bp": self.caltrack_model.fit_bp_hdd,
-            "X_design_info": self.caltrack_model.X.design_info,
+            "X_design_info": self.caltrack_model.params["X_design_info"],
         }
 
         output = {
@@ -99,19 +160,14 @@ class HourlyLoadProfileModel(object):
             'variance': demand_fixture_data.tempF * 0.},
             index=demand_fixture_data.index)
 
-        ii = self.input_data.groupby([self.input_data.index.month,
-                                      self.input_data.index.dayofweek < 5,
-                                      self.input_data.index.hour
-                                      ]).energy.mean()
-        jj = self.input_data.groupby([self.input_data.index.month,
-                                      self.input_data.index.dayofweek < 5,
-                                      self.input_data.index.hour]).energy.std()
-        output_data.predicted = ii.loc[list(zip(output_data.index.month,
-                                                output_data.index.dayofweek < 5,
-                                                output_data.index.hour))].values
-        output_data.variance = jj.loc[list(zip(output_data.index.month,
-                                               output_data.index.dayofweek < 5,
-                                               output_data.index.hour))].values
+        mean, std, present = self.load_profile()
+        cells = _profile_cells(output_data.index)
+        if not present.ravel()[cells].all():
+            raise ValueError(
+                'No input data for the month, weekday and hour of some of'
+                ' the hours to predict.')
+        output_data.predicted = mean.ravel()[cells]
+        output_data.variance = std.ravel()[cells]
         output_data_daily = output_data.predicted.resample('D').sum()
         output_factors = df_daily / output_data_daily
         nextday = df_daily.index[-1] + datetime.timedelta(days=1)
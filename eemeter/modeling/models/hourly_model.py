@@ -1,8 +1,178 @@
 import pandas as pd
 import numpy as np
-import statsmodels.formula.api as smf
-import patsy
 import eemeter.modeling.exceptions as model_exceptions
+from eemeter.lazy import lazy_import
+from eemeter.modeling.models.variance import prediction_variance
+
+scipy_sparse = lazy_import('scipy.sparse')
+
+
+class HourDayOfWeekDesign(object):
+    ''' Design matrix builder for
+    :code:`energy ~ hdd + cdd + hour_of_day + day_of_week +
+    hour_of_day:day_of_week` from integer hour of day and day of week
+    codes, without string categoricals or patsy.
+
+    Columns are those patsy gives the formula, in the same order, with
+    treatment coding against the first level: `Intercept`,
+    `hour_of_day[T.h]`, `day_of_week[T.d]`,
+    `hour_of_day[T.h]:day_of_week[T.d]` (hour varying fastest), `hdd` and
+    `cdd`. As in patsy, levels are ordered as strings (`'10'` before
+    `'2'`).
+
+    Parameters
+    ----------
+    hour_levels : list of int
+        Hours of day (0-23) in the design.
+    day_levels : list of int
+        Days of week (0-6, Monday is 0) in the design.
+    '''
+
+    def __init__(self, hour_levels, day_levels):
+        self.hour_levels = sorted(set(hour_levels), key=str)
+        self.day_levels = sorted(set(day_levels), key=str)
+        if len(self.hour_levels) == 0 or len(self.day_levels) == 0:
+            raise ValueError('No data to build a design matrix from.')
+
+        hours, days = self.hour_levels[1:], self.day_levels[1:]
+        self.columns = ['Intercept'] + \
+            ['hour_of_day[T.{}]'.format(h) for h in hours] + \
+            ['day_of_week[T.{}]'.format(d) for d in days] + \
+            ['hour_of_day[T.{}]:day_of_week[T.{}]'.format(h, d)
+             for d in days for h in hours] + \
+            ['hdd', 'cdd']
+
+        # Column of each hour, day and (hour, day) cell, -1 for reference
+        # levels and -2 for levels not in the design.
+        self._hour_column = np.full(24, -2)
+        self._hour_column[self.hour_levels[0]] = -1
+        self._hour_column[hours] = 1 + np.arange(len(hours))
+        self._day_column = np.full(7, -2)
+        self._day_column[self.day_levels[0]] = -1
+        self._day_column[days] = 1 + len(hours) + np.arange(len(days))
+        self._cell_column = np.full((24, 7), -1)
+        self._cell_column[np.ix_(hours, days)] = \
+            1 + len(hours) + len(days) + np.arange(
+                len(hours) * len(days)).reshape(len(days), len(hours)).T
+
+    def __repr__(self):
+        return 'HourDayOfWeekDesign({}, {})'.format(
+            self.hour_levels, self.day_levels)
+
+    @classmethod
+    def from_codes(cls, hour, day):
+        ''' Design with the levels found in the data. '''
+        return cls(np.unique(hour).tolist(), np.unique(day).tolist())
+
+    def build(self, hour, day, hdd, cdd, sparse=False):
+        ''' Design matrix of shape `(len(hour), len(columns))`.
+
+        Parameters
+        ----------
+        hour, day : array_like of int
+            Hour of day and day of week codes of each row.
+        hdd, cdd : array_like
+            Heating and cooling degree hours of each row.
+        sparse : bool, default False
+            If True, return a `scipy.sparse.csr_matrix`, which stores the
+            at most six nonzero values of each row instead of all of the
+            (for weekdays, 122) columns.
+        '''
+        hour, day = np.asarray(hour), np.asarray(day)
+        hour_column = self._hour_column[hour]
+        day_column = self._day_column[day]
+        if (hour_column == -2).any() or (day_column == -2).any():
+            raise ValueError('Hour of day or day of week not in design.')
+
+        n, p = len(hour), len(self.columns)
+        rows = np.arange(n)
+        row_indices, column_indices, values = [rows], [np.zeros(n, int)], \
+            [np.ones(n)]
+        for column in (hour_column, day_column, self._cell_column[hour, day]):
+            has_column = column >= 0
+            row_indices.append(rows[has_column])
+            column_indices.append(column[has_column])
+            values.append(np.ones(has_column.sum()))
+        for i, degree_hours in ((p - 2, hdd), (p - 1, cdd)):
+            degree_hours = np.asarray(degree_hours, dtype=float)
+            nonzero = degree_hours != 0
+            row_indices.append(rows[nonzero])
+            column_indices.append(np.full(nonzero.sum(), i))
+            values.append(degree_hours[nonzero])
+        row_indices = np.concatenate(row_indices)
+        column_indices = np.concatenate(column_indices)
+        values = np.concatenate(values)
+
+        if sparse:
+            return scipy_sparse.csr_matrix(
+                (values, (row_indices, column_indices)), shape=(n, p))
+        X = np.zeros((n, p))
+        X[row_indices, column_indices] = values
+        return X
+
+
+class SparseLeastSquaresFit(object):
+    ''' Ordinary least squares fit of a sparse design matrix, solved from
+    the (small, dense) normal equations :code:`X'X b = X'y` so that the
+    design matrix is never densified.
+
+    Exposes the parts of the statsmodels OLS results interface the hourly
+    models use. As in statsmodels, the parameter covariance is the
+    pseudo-inverse of :code:`X'X` scaled by the residual mean squared
+    error, so rank-deficient designs give minimum-norm parameters.
+
+    Parameters
+    ----------
+    X : scipy.sparse.spmatrix, shape (n, p)
+        Design matrix, including an intercept column.
+    y : numpy.ndarray, shape (n,)
+        Response.
+    columns : list of str
+        Names of the columns of `X`.
+    index : pandas.Index, optional
+        Index of the rows of `X`, for `resid`.
+    '''
+
+    def __init__(self, X, y, columns, index=None):
+        X = scipy_sparse.csr_matrix(X)
+        y = np.asarray(y, dtype=float)
+        XtX = X.T.dot(X).toarray()
+        Xty = X.T.dot(y)
+
+        self.normalized_cov_params = np.linalg.pinv(XtX)
+        self.params = pd.Series(
+            np.dot(self.normalized_cov_params, Xty), index=columns)
+        self.resid = pd.Series(y - X.dot(self.params.values), index=index)
+
+        self.nobs = float(X.shape[0])
+        self.rank = np.linalg.matrix_rank(XtX)
+        self.df_resid = self.nobs - self.rank
+        self.ssr = np.dot(self.resid.values, self.resid.values)
+        centered_tss = np.sum((y - y.mean()) ** 2)
+        # Saturated fits leave no residual degrees of freedom to estimate
+        # the error variance from.
+        self.mse_resid = self.ssr / self.df_resid \
+            if self.df_resid > 0 else np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.rsquared = 1 - self.ssr / centered_tss
+            self.rsquared_adj = 1 - (self.nobs - 1) / self.df_resid * \
+                (1 - self.rsquared)
+
+    def __repr__(self):
+        return 'SparseLeastSquaresFit(nobs={}, rank={})'.format(
+            int(self.nobs), self.rank)
+
+    def cov_params(self):
+        ''' Parameter covariance matrix. '''
+        return pd.DataFrame(self.normalized_cov_params * self.mse_resid,
+                            index=self.params.index,
+                            columns=self.params.index)
+
+
+def _time_codes(index):
+    ''' Hour of day (0-23) and day of week (0-6, Monday is 0) of each
+    timestamp. '''
+    return np.asarray(index.hour), np.asarray(index.dayofweek)
 
 
 class HourlyDayOfWeekModel(object):
@@ -25,6 +195,10 @@ class HourlyDayOfWeekModel(object):
                        'hour_of_day + day_of_week + hour_of_day:day_of_week'
         self.weekdays = ['0', '1', '2', '3', '4']
         self.weekends = ['5', '6']
+        self.weekday_codes = [0, 1, 2, 3, 4]
+        self.weekend_codes = [5, 6]
+        self.design_weekday = None
+        self.design_weekend = None
         self.cdd_base_temp = cdd_base_temp
         self.hdd_base_temp = hdd_base_temp
 
@@ -48,16 +222,8 @@ class HourlyDayOfWeekModel(object):
         A new datafarame with two more columns:
         hour_of_day and day_of_week
         """
-        hour_of_day = []
-        day_of_week = []
-        for index, row in df.iterrows():
-            hour_of_day.append(str(index.hour))
-            day_of_week.append(str(index.dayofweek))
-
-        new_df = df.assign(hour_of_day=hour_of_day,
-                           day_of_week=day_of_week)
-
-        return new_df
+        return df.assign(hour_of_day=df.index.hour.astype(str),
+                         day_of_week=df.index.dayofweek.astype(str))
 
     def add_hdd(self, df):
         if 'tempF' not in df:
@@ -107,30 +273,30 @@ class HourlyDayOfWeekModel(object):
         Returns
         -------
         """
-        train_df = self.add_time_day(df)
-        self.meets_sufficiency_or_error(train_df)
-
-        weekday_df = train_df.loc[train_df['day_of_week'].isin(self.weekdays)]
-        weekday_df = self.add_cdd(weekday_df)
-        weekday_df = self.add_hdd(weekday_df)
-
-        weekend_df = train_df.loc[train_df['day_of_week'].isin(self.weekends)]
-        weekend_df = self.add_hdd(weekend_df)
-        weekend_df = self.add_cdd(weekend_df)
-
-        try:
-            self.model_weekday = smf.ols(formula=self.formula, data=weekday_df)
-            self.model_res_weekday = self.model_weekday.fit()
-        except ValueError:
-            self.model_weekday = None
-            self.model_res_weekday = None
-
-        try:
-            self.model_weekend = smf.ols(formula=self.formula, data=weekend_df)
-            self.model_res_weekend = self.model_weekend.fit()
-        except ValueError:
-            self.model_weekend = None
-            self.model_res_weekend = None
+        self.meets_sufficiency_or_error(df)
+        hour, day = _time_codes(df.index)
+        hdd = self.add_hdd(df).hdd.values.astype(float)
+        cdd = self.add_cdd(df).cdd.values.astype(float)
+        energy = df.energy.values.astype(float)
+        valid = np.isfinite(energy) & np.isfinite(hdd) & np.isfinite(cdd)
+
+        def fit_days(days):
+            in_days = np.in1d(day, days)
+            try:
+                design = HourDayOfWeekDesign.from_codes(
+                    hour[in_days], day[in_days])
+            except ValueError:
+                return df[in_days], None, None, None
+            rows = in_days & valid
+            X = design.build(hour[rows], day[rows], hdd[rows], cdd[rows],
+                             sparse=True)
+            return df[in_days], design, X, SparseLeastSquaresFit(
+                X, energy[rows], design.columns, index=df.index[rows])
+
+        weekday_df, self.design_weekday, self.model_weekday, \
+            self.model_res_weekday = fit_days(self.weekday_codes)
+        weekend_df, self.design_weekend, self.model_weekend, \
+            self.model_res_weekend = fit_days(self.weekend_codes)
 
         params = {
             "coefficients": self.model_res_weekday.params.to_dict(),
@@ -167,35 +333,37 @@ class HourlyDayOfWeekModel(object):
             'nmbe': nmbe,
             'weekday_rmse': weekday_rmse,
             'weekend_rmse': weekend_rmse,
-            'n':  len(train_df)
+            'n':  len(df)
         }
         return output
 
     def compute_variance(self, df):
         weekday_df = df.loc[df['day_of_week'].isin(self.weekdays)]
         weekend_df = df.loc[df['day_of_week'].isin(self.weekends)]
-
-        _, weekday_X = patsy.dmatrices(self.formula,
-                                       weekday_df,
-                                       return_type='dataframe')
-
-        cov = self.model_res_weekday.cov_params()
-
-        weekday_var = self.model_res_weekday.mse_resid + (weekday_X * np.dot(cov, weekday_X.T).T).sum(1)
-
-        _, weekend_X = patsy.dmatrices(self.formula,
-                                       weekend_df,
-                                       return_type='dataframe')
-
-        cov = self.model_res_weekend.cov_params()
-        weekend_var = self.model_res_weekend.mse_resid + (weekend_X *
-                                                          np.dot(cov, weekend_X.T).T).sum(1)
-        weekend_var = pd.Series(weekend_var, index=weekend_df.index)
-        weekday_var = pd.Series(weekday_var, index=weekday_df.index)
-
-        variance_df = pd.concat([weekday_var, weekend_var])
-        variance_df.sort_index()
-        return variance_df
+        return pd.concat([
+            self._predict_days(weekday_df, self.design_weekday,
+                               self.model_res_weekday)[1],
+            self._predict_days(weekend_df, self.design_weekend,
+                               self.model_res_weekend)[1],
+        ])
+
+    def _predict_days(self, df, design, model_res):
+        # Prediction and variance of the rows of df with temperatures,
+        # NaN for the others.
+        hour, day = _time_codes(df.index)
+        hdd = self.add_hdd(df).hdd.values.astype(float)
+        cdd = self.add_cdd(df).cdd.values.astype(float)
+        rows = np.isfinite(hdd) & np.isfinite(cdd)
+        predicted = np.full(len(df.index), np.nan)
+        variance = np.full(len(df.index), np.nan)
+        if rows.any():
+            X = design.build(hour[rows], day[rows], hdd[rows], cdd[rows],
+                             sparse=True)
+            predicted[rows] = X.dot(model_res.params.values)
+            variance[rows] = prediction_variance(
+                X, model_res.cov_params().values, model_res.mse_resid)
+        return (pd.Series(predicted, index=df.index),
+                pd.Series(variance, index=df.index))
 
     def predict(self, df, summed=True):
         """
@@ -206,30 +374,19 @@ class HourlyDayOfWeekModel(object):
             as tuples
             Else, tuple of two series : prediction and varianes.
         """
-        test_df = self.add_time_day(df)
-        test_df = self.add_hdd(test_df)
-        test_df = self.add_cdd(test_df)
-
-        # We energy is what we predict, we don't require this column
-        # except in compute_variance function which deconstructs dataframe
-        # using patsy and use it to compute variancee. If this column
-        # is not there then we just construct dummy here so that
-        # compute_variance succeed.
-        if 'energy' not in test_df:
-            test_df = test_df.assign(energy=[0.0 for xx in test_df['tempF']])
-
-        weekday_df = test_df.loc[test_df['day_of_week'].isin(self.weekdays)]
-        weekday_pred = self.model_res_weekday.predict(weekday_df)
-
-        weekend_df = test_df.loc[test_df['day_of_week'].isin(self.weekends)]
-        weekend_pred = self.model_res_weekend.predict(weekend_df)
+        day = df.index.dayofweek
+        weekday_pred, weekday_var = self._predict_days(
+            df[np.in1d(day, self.weekday_codes)], self.design_weekday,
+            self.model_res_weekday)
+        weekend_pred, weekend_var = self._predict_days(
+            df[np.in1d(day, self.weekend_codes)], self.design_weekend,
+            self.model_res_weekend)
 
         # A series DS
         prediction = pd.concat([weekday_pred, weekend_pred])
-        prediction.sort_index()
 
         # A Series DS
-        variance = self.compute_variance(test_df)
+        variance = pd.concat([weekday_var, weekend_var])
         if summed:
             prediction = np.sum(prediction)
             variance = np.sum(variance)
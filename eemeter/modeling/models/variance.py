@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from eemeter.lazy import lazy_import
+
+scipy_sparse = lazy_import('scipy.sparse')
+
+
+def prediction_variance(X, cov, mse_resid, chunk_size=65536):
+    ''' Variance of each fitted-model prediction,
+    `mse_resid + x_i' cov x_i` for each row `x_i` of the design matrix.
+
+    Computed row by row as `einsum('ij,ij->i', X @ cov, X)` in chunks of
+    rows, so long hourly fixtures need only `chunk_size * p` temporary
+    values. Sparse design matrices stay sparse.
+
+    Parameters
+    ----------
+    X : pandas.DataFrame, numpy.ndarray or scipy.sparse.spmatrix, shape (n, p)
+        Design matrix of the points to predict.
+    cov : pandas.DataFrame or numpy.ndarray, shape (p, p)
+        Parameter covariance matrix, in the column order of `X`.
+    mse_resid : float
+        Mean squared error of the model residuals.
+    chunk_size : int, default 65536
+        Number of rows to process at once.
+
+    Returns
+    -------
+    variance : pandas.Series or numpy.ndarray, shape (n,)
+        Prediction variances; a Series on the index of `X` if `X` is a
+        DataFrame.
+    '''
+    if scipy_sparse.issparse(X):
+        values = scipy_sparse.csr_matrix(X, dtype=float)
+    else:
+        values = np.asarray(X, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+
+    variance = np.empty(values.shape[0])
+    for start in range(0, values.shape[0], chunk_size):
+        chunk = values[start:start + chunk_size]
+        if scipy_sparse.issparse(chunk):
+            variance[start:start + chunk_size] = np.asarray(
+                chunk.multiply(chunk.dot(cov)).sum(axis=1)).ravel()
+        else:
+            variance[start:start + chunk_size] = np.einsum(
+                'ij,ij->i', np.dot(chunk, cov), chunk)
+    variance += mse_resid
+
+    if isinstance(X, pd.DataFrame):
+        return pd.Series(variance, index=X.index)
+    return variance
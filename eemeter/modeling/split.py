@@ -4,6 +4,7 @@ import traceback
 import numpy as np
 
 import eemeter.modeling.exceptions as model_exceptions
+from eemeter.modeling.store import model_store_key
 from eemeter.structures import EnergyTrace
 
 logger = logging.getLogger(__name__)
@@ -23,13 +24,22 @@ class SplitModeledEnergyTrace(object):
         Items of this dictionary map `modeling_period_label` s to models
     modeling_period_set : eemeter.structures.ModelingPeriodSet
         The set of modeling periods over which models should be applicable.
+    model_store : eemeter.modeling.store.SqlModelStore, default None
+        Store of fitted baseline models. Baseline period models which can be
+        restored from a compact fit (those with a :code:`load_fit` method)
+        are loaded from the store instead of refit if a fit of the same data
+        with the same weather station, formatter, model settings and eemeter
+        version is stored, and are stored after fitting otherwise. Reporting
+        period data keeps growing, so those fits are never stored.
     '''
 
-    def __init__(self, trace, formatter, model_mapping, modeling_period_set):
+    def __init__(self, trace, formatter, model_mapping, modeling_period_set,
+                 model_store=None):
         self.trace = trace
         self.formatter = formatter
         self.model_mapping = model_mapping
         self.modeling_period_set = modeling_period_set
+        self.model_store = model_store
         self.fit_outputs = {}
 
     def __repr__(self):
@@ -116,7 +126,9 @@ class SplitModeledEnergyTrace(object):
                 })
 
                 try:
-                    model_fit = model.fit(input_data)
+                    model_fit = self._fit_model(
+                        model, modeling_period_label, modeling_period,
+                        filtered_data, weather_source, input_data)
                 except:
                     tb = traceback.format_exc()
                     logger.warn(
@@ -142,6 +154,47 @@ class SplitModeledEnergyTrace(object):
 
         return self.fit_outputs
 
+    def _fit_model(self, model, modeling_period_label, modeling_period,
+                   filtered_data, weather_source, input_data):
+        if self.model_store is None or not hasattr(model, 'load_fit') or \
+                modeling_period.interpretation != 'BASELINE':
+            return model.fit(input_data)
+
+        # A failing store (locked or corrupt database, bad blob) must not
+        # fail the fit: fall back to fitting, and keep fits that succeed.
+        try:
+            key = model_store_key(
+                filtered_data, self.trace.interpretation, self.trace.unit,
+                getattr(weather_source, 'station', None), input_data,
+                self.formatter, model, modeling_period_label)
+            fitted = self.model_store.retrieve(key)
+            if fitted is not None:
+                model_fit = model.load_fit(fitted)
+                logger.debug(
+                    'Loaded stored {} fit for trace {} in {} period.'
+                    .format(model, self.trace.trace_id, modeling_period_label)
+                )
+                return model_fit
+        except Exception:
+            logger.warn(
+                'Could not load stored {} fit for trace {} in {} period;'
+                ' fitting instead.'
+                .format(model, self.trace.trace_id, modeling_period_label),
+                exc_info=True
+            )
+            return model.fit(input_data)
+
+        model_fit = model.fit(input_data)
+        try:
+            self.model_store.save(key, model.fitted)
+        except Exception:
+            logger.warn(
+                'Could not store {} fit for trace {} in {} period.'
+                .format(model, self.trace.trace_id, modeling_period_label),
+                exc_info=True
+            )
+        return model_fit
+
     def predict(self, modeling_period_label, demand_fixture_data, **kwargs):
         ''' Predict for any one of the modeling_periods associated with this
         trace. Light wrapper around :code:`model.predict(` method.
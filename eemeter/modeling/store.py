@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+from six import string_types
+
+from eemeter import get_version
+from eemeter.lazy import lazy_import
+from eemeter.modeling.models.caltrack_helpers import CaltrackFit
+
+sqlalchemy = lazy_import('sqlalchemy')
+
+
+def _to_blob(values):
+    return np.asarray(values, dtype='<f8').tobytes()
+
+
+def _from_blob(blob):
+    return np.frombuffer(blob, dtype='<f8').copy()
+
+
+def _json_default(value):
+    # numpy scalars in fit statistics
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError('{!r} is not JSON serializable'.format(value))
+
+
+def _temperatures(input_data):
+    # Temperatures of model input data: the tempF column of daily or hourly
+    # input, or the temperature data of billing input.
+    if isinstance(input_data, tuple):
+        return input_data[1]
+    return input_data.tempF
+
+
+def _simple_attributes(obj):
+    # Configuration of a formatter or (unfitted) model: its attributes that
+    # are plain values or lists of them.
+    simple = (type(None), bool, int, float) + string_types
+
+    def is_simple(value):
+        if isinstance(value, (list, tuple)):
+            return all(is_simple(v) for v in value)
+        return isinstance(value, simple)
+
+    return sorted(
+        (k, v) for k, v in vars(obj).items() if is_simple(v))
+
+
+def model_store_key(trace_data, interpretation, unit, weather_station,
+                    input_data, formatter, model, modeling_period_label):
+    ''' Content hash identifying a fit, to look it up in a model store.
+
+    Parameters
+    ----------
+    trace_data : pandas.DataFrame
+        Trace data of the modeling period, with `value` and `estimated`
+        columns.
+    interpretation : str
+        Trace interpretation.
+    unit : str
+        Trace unit.
+    weather_station : str
+        Weather station the input data is formatted with.
+    input_data : pandas.DataFrame or tuple
+        Formatted model input data, as returned by
+        :code:`formatter.create_input()`. Its temperatures are part of the
+        key, so fits are not reused after the weather data changes.
+    formatter : object
+        Formatter creating input data.
+    model : object
+        Model to fit, before fitting.
+    modeling_period_label : str
+        Label of the modeling period.
+
+    Returns
+    -------
+    key : str
+        SHA-256 hex digest of the trace data, the input temperatures and
+        all the other arguments, and the eemeter version.
+    '''
+    h = hashlib.sha256()
+    h.update(np.asarray(trace_data.index.asi8, dtype='<i8').tobytes())
+    h.update(np.asarray(trace_data.value, dtype='<f8').tobytes())
+    h.update(np.asarray(trace_data.estimated, dtype=bool).tobytes())
+    # The temperature index follows from the trace data hashed above.
+    temperatures = np.asarray(_temperatures(input_data), dtype='<f8')
+    h.update(np.asarray(temperatures.shape, dtype='<i8').tobytes())
+    h.update(temperatures.tobytes())
+    h.update(json.dumps([
+        interpretation,
+        unit,
+        weather_station,
+        '{}.{}'.format(type(formatter).__module__, type(formatter).__name__),
+        _simple_attributes(formatter),
+        '{}.{}'.format(type(model).__module__, type(model).__name__),
+        _simple_attributes(model),
+        modeling_period_label,
+        get_version(),
+    ], default=str).encode('utf-8'))
+    return h.hexdigest()
+
+
+class SqlModelStore(object):
+    ''' Store of compact model fits
+    (:any:`eemeter.modeling.models.CaltrackFit`) keyed by
+    :any:`model_store_key`, so fits of unchanged data can be reloaded
+    rather than refit. Defaults to a SQLite file; any SQLAlchemy URL works.
+
+    Coefficients and covariance are stored as float arrays and the rest of
+    the fit as JSON, so nothing is unpickled on retrieval.
+    '''
+
+    def __init__(self, url=None):
+        self._prepare_db(url)
+
+    def __repr__(self):
+        return 'SqlModelStore("{}")'.format(self.url)
+
+    def _get_url(self):
+        url = os.environ.get("EEMETER_MODEL_CACHE_URL")
+        if url is None:
+            directory = "{}/.eemeter/model_cache".format(
+                os.path.expanduser('~'))
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            url = "sqlite:///{}/model_cache.db".format(directory)
+        return url
+
+    def _prepare_db(self, url=None):
+        if url is None:
+            url = self._get_url()
+
+        self.url = url
+
+        eng = sqlalchemy.create_engine(url)
+        metadata = sqlalchemy.MetaData(eng)
+
+        tbl_items = sqlalchemy.Table(
+            "caltrack_fits",
+            metadata,
+            sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("key", sqlalchemy.String, unique=True),
+            sqlalchemy.Column("fit", sqlalchemy.String),
+            sqlalchemy.Column("coefficients", sqlalchemy.LargeBinary),
+            sqlalchemy.Column("cov", sqlalchemy.LargeBinary),
+            sqlalchemy.Column("dt", sqlalchemy.DateTime)
+        )
+
+        tbl_items.create(checkfirst=True)
+
+        self.items = tbl_items
+
+    def key_exists(self, key):
+        s = sqlalchemy.select([self.items.c.key]).where(self.items.c.key == key)
+        result = s.execute()
+        return result.fetchone() is not None
+
+    def save(self, key, fitted):
+        fit = json.dumps({
+            'formula': fitted.formula,
+            'columns': list(fitted.columns),
+            'mse_resid': fitted.mse_resid,
+            'cdd_bp': fitted.cdd_bp,
+            'hdd_bp': fitted.hdd_bp,
+            'stats': fitted.stats,
+        }, default=_json_default)
+        values = dict(
+            key=key, fit=fit, coefficients=_to_blob(fitted.coefficients),
+            cov=_to_blob(fitted.cov), dt=sqlalchemy.func.now())
+        if self.key_exists(key):
+            s = self.items.update().where(
+                self.items.c.key == key).values(**values)
+        else:
+            s = self.items.insert().values(**values)
+        s.execute()
+
+    def retrieve(self, key):
+        s = sqlalchemy.select([
+            self.items.c.fit,
+            self.items.c.coefficients,
+            self.items.c.cov,
+        ]).where(self.items.c.key == key)
+        result = s.execute()
+        data = result.fetchone()
+        if data is None:
+            return None
+
+        fit, coefficients, cov = data
+        fit = json.loads(fit)
+        p = len(fit['columns'])
+        return CaltrackFit(
+            fit['formula'], fit['columns'], _from_blob(coefficients),
+            _from_blob(cov).reshape(p, p), fit['mse_resid'],
+            cdd_bp=fit['cdd_bp'], hdd_bp=fit['hdd_bp'], stats=fit['stats'])
+
+    def clear(self, key=None):
+        if key is None:
+            s = self.items.delete()
+        else:
+            s = self.items.delete().where(self.items.c.key == key)
+        s.execute()
@@ -2,6 +2,7 @@ from eemeter.processors.interventions import get_modeling_period_set
 from eemeter.processors.location import (
     get_weather_source,
     get_weather_normal_source,
+    resolve_locations,
 )
 
 
@@ -9,4 +10,5 @@ __all__ = [
     'get_modeling_period_set',
     'get_weather_source',
     'get_weather_normal_source',
+    'resolve_locations',
 ]
@@ -1,15 +1,28 @@
 import logging
 
+import numpy as np
+import pandas as pd
+
 from eemeter.weather.location import (
+    lat_lngs_to_tmy3_stations,
+    lat_lngs_to_usaf_stations,
+    lat_lngs_to_zipcodes,
     zipcode_to_usaf_station,
     zipcode_to_tmy3_station,
     zipcode_to_cz2010_station,
+    zipcodes_to_climate_zones,
+    zipcodes_to_cz2010_stations,
+    zipcodes_to_tmy3_stations,
+    zipcodes_to_usaf_stations,
+)
+from eemeter.co2.location import (
+    zipcode_to_avert_region,
+    zipcodes_to_avert_regions,
 )
-from eemeter.co2.location import zipcode_to_avert_region
 from eemeter.weather.noaa import ISDWeatherSource
 from eemeter.weather.tmy3 import TMY3WeatherSource
 from eemeter.weather.cz2010 import CZ2010WeatherSource
-from eemeter.co2.avert import AVERTSource
+from eemeter.co2.avert import get_avert_source
 
 logger = logging.getLogger(__name__)
 
@@ -151,7 +164,7 @@ def get_co2_source(site, use_year=2016):
     )
 
     try:
-        avert_source = AVERTSource(use_year, region)
+        avert_source = get_avert_source(use_year, region)
     except ValueError:
         logger.error(
             "Could not create AVERTSource for region {}."
@@ -159,6 +172,79 @@ def get_co2_source(site, use_year=2016):
         )
         return None
 
-    logger.debug("Created AVERTSource using region {}".format(region))
+    logger.debug("Using AVERTSource for region {}".format(region))
 
     return avert_source
+
+
+def resolve_locations(zipcodes=None, lat_lngs=None, use_cz2010=False):
+    ''' Resolves weather stations, climate zones and AVERT regions for many
+    sites at once. Vectorized counterpart of :any:`get_weather_source`,
+    :any:`get_weather_normal_source` and :any:`get_co2_source` for planning
+    portfolio runs.
+
+    Parameters
+    ----------
+    zipcodes : array_like of str, default None
+        USPS ZIP codes of sites. Exactly one of `zipcodes` and `lat_lngs`
+        must be given.
+    lat_lngs : array_like of float, shape (n, 2), default None
+        Latitude and longitude coordinates of sites. Sites are matched to the
+        nearest ZIP code centroid for climate zone and AVERT region, and to
+        the nearest stations directly (except for CZ2010, which is only
+        mapped by ZIP code).
+    use_cz2010 : boolean, default False
+        Indicates whether or not to use CZ2010 mapping.
+
+    Returns
+    -------
+    locations : pandas.DataFrame
+        One row per site with columns `zipcode`, `weather_station`,
+        `weather_normal_station`, `climate_zone`, `avert_region` (None where
+        resolution failed) and `failures`, a comma-separated string naming
+        the columns which could not be resolved (empty if none failed).
+    '''
+
+    if (zipcodes is None) == (lat_lngs is None):
+        raise ValueError('Exactly one of zipcodes or lat_lngs is required.')
+
+    if zipcodes is not None:
+        zipcodes = np.asarray(zipcodes, dtype=object)
+        if use_cz2010:
+            weather_stations = zipcodes_to_cz2010_stations(zipcodes)
+            weather_normal_stations = weather_stations
+        else:
+            weather_stations = zipcodes_to_usaf_stations(zipcodes)
+            weather_normal_stations = zipcodes_to_tmy3_stations(zipcodes)
+    else:
+        lat_lngs = np.asarray(lat_lngs, dtype=float).reshape(-1, 2)
+        lats, lngs = lat_lngs[:, 0], lat_lngs[:, 1]
+        zipcodes = lat_lngs_to_zipcodes(lats, lngs)
+        if use_cz2010:
+            weather_stations = zipcodes_to_cz2010_stations(zipcodes)
+            weather_normal_stations = weather_stations
+        else:
+            weather_stations = lat_lngs_to_usaf_stations(lats, lngs)
+            weather_normal_stations = lat_lngs_to_tmy3_stations(lats, lngs)
+
+    locations = pd.DataFrame({
+        'zipcode': zipcodes,
+        'weather_station': weather_stations,
+        'weather_normal_station': weather_normal_stations,
+        'climate_zone': zipcodes_to_climate_zones(zipcodes),
+        'avert_region': zipcodes_to_avert_regions(zipcodes),
+    }, columns=[
+        'zipcode',
+        'weather_station',
+        'weather_normal_station',
+        'climate_zone',
+        'avert_region',
+    ])
+
+    failures = np.full(len(locations), '', dtype=object)
+    for column in locations.columns:
+        failed = np.equal(locations[column].values, None)
+        failures = failures + np.where(failed, column + ',', '')
+    locations['failures'] = [f.rstrip(',') for f in failures]
+
+    return locations
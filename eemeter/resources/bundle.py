@@ -0,0 +1,293 @@
+import json
+import logging
+import os
+
+import numpy as np
+from six import string_types, text_type
+
+from eemeter import get_version
+from eemeter.lazy import lazy_import
+
+pkg_resources = lazy_import('pkg_resources')
+
+logger = logging.getLogger(__name__)
+
+
+# JSON resource filename -> kind of index it contains.
+#   'str': mapping of string keys to string values
+#   'lat_lng': mapping of string keys to [lat, lng] pairs
+#   'list': mapping of string keys to lists of strings
+#   'set': list of strings (supported values)
+BUNDLED_RESOURCES = {
+    'GSOD-ISD_station_index.json': 'list',
+    'climate_zone_tmy3_stations.json': 'list',
+    'climate_zone_usaf_stations.json': 'list',
+    'climate_zone_zipcodes.json': 'list',
+    'supported_climate_zones.json': 'set',
+    'supported_cz2010_stations.json': 'set',
+    'supported_tmy3_stations.json': 'set',
+    'supported_usaf_stations.json': 'set',
+    'supported_zipcodes.json': 'set',
+    'tmy3_station_climate_zone.json': 'str',
+    'tmy3_station_lat_lngs.json': 'lat_lng',
+    'tmy3_station_zipcodes.json': 'list',
+    'usaf_station_climate_zone.json': 'str',
+    'usaf_station_lat_lngs.json': 'lat_lng',
+    'usaf_station_zipcodes.json': 'list',
+    'zipcode_avert_region.json': 'str',
+    'zipcode_centroid_lat_lngs.json': 'lat_lng',
+    'zipcode_climate_zone.json': 'str',
+    'zipcode_cz2010_station.json': 'str',
+    'zipcode_tmy3_station.json': 'str',
+    'zipcode_usaf_station.json': 'str',
+}
+
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def get_bundle_directory():
+    ''' Directory holding the precompiled resource bundle. Set with the
+    environment variable `EEMETER_RESOURCE_BUNDLE_DIRECTORY`; defaults to
+    `eemeter/resources/bundle` inside the installed package.
+    '''
+    directory = os.environ.get("EEMETER_RESOURCE_BUNDLE_DIRECTORY")
+    if directory is None:
+        directory = os.path.join(os.path.dirname(__file__), 'bundle')
+    return directory
+
+
+def _array_path(directory, filename, part):
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, '{}.{}.npy'.format(stem, part))
+
+
+def _encode(strings):
+    return np.array([s.encode('utf-8') for s in strings], dtype=bytes)
+
+
+def _encode_key(key):
+    # Lookup key as stored in a bundle, or None if it can't be a key. On
+    # Python 2, keys may be str (already bytes) or unicode.
+    if not isinstance(key, string_types):
+        return None
+    if isinstance(key, text_type):
+        return key.encode('utf-8')
+    return key
+
+
+class BundledMapping(object):
+    ''' Read-only, dict-like view of a bundled index backed by sorted NumPy
+    arrays. Supports the subset of the dict API used for resource lookups
+    (`get`, `[]`, `in`, `len`, `keys`, `values`, `items`).
+
+    Parameters
+    ----------
+    kind : str
+        One of `'str'`, `'lat_lng'` or `'list'`.
+    keys : numpy.ndarray of bytes
+        Sorted keys.
+    values : numpy.ndarray
+        Values aligned with `keys` (`'str'`, `'lat_lng'`), or flattened list
+        items (`'list'`).
+    offsets : numpy.ndarray of int, optional
+        For `'list'` indexes, item offsets into `values`, of length
+        `len(keys) + 1`.
+    '''
+
+    def __init__(self, kind, keys, values, offsets=None):
+        self.kind = kind
+        self.keys_array = keys
+        self.values_array = values
+        self.offsets = offsets
+
+    def __repr__(self):
+        return 'BundledMapping({}, n={})'.format(self.kind, len(self))
+
+    def __len__(self):
+        return len(self.keys_array)
+
+    def _find(self, key):
+        encoded = _encode_key(key)
+        if encoded is None or len(self.keys_array) == 0:
+            return None
+        i = int(np.searchsorted(self.keys_array, encoded))
+        if i < len(self.keys_array) and self.keys_array[i] == encoded:
+            return i
+        return None
+
+    def _value(self, i):
+        if self.kind == 'str':
+            return self.values_array[i].decode('utf-8')
+        elif self.kind == 'lat_lng':
+            lat, lng = self.values_array[i]
+            return [float(lat), float(lng)]
+        else:
+            start, end = self.offsets[i], self.offsets[i + 1]
+            return [v.decode('utf-8') for v in self.values_array[start:end]]
+
+    def __getitem__(self, key):
+        i = self._find(key)
+        if i is None:
+            raise KeyError(key)
+        return self._value(i)
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, key, default=None):
+        i = self._find(key)
+        if i is None:
+            return default
+        return self._value(i)
+
+    def keys(self):
+        return [k.decode('utf-8') for k in self.keys_array]
+
+    def values(self):
+        return [self._value(i) for i in range(len(self))]
+
+    def items(self):
+        return list(zip(self.keys(), self.values()))
+
+
+class BundledSet(object):
+    ''' Read-only, set-like view of a bundled list of supported values backed
+    by a sorted NumPy array.
+
+    Parameters
+    ----------
+    keys : numpy.ndarray of bytes
+        Sorted values.
+    '''
+
+    def __init__(self, keys):
+        self.keys_array = keys
+
+    def __repr__(self):
+        return 'BundledSet(n={})'.format(len(self))
+
+    def __len__(self):
+        return len(self.keys_array)
+
+    def __contains__(self, key):
+        encoded = _encode_key(key)
+        if encoded is None or len(self.keys_array) == 0:
+            return False
+        i = int(np.searchsorted(self.keys_array, encoded))
+        return i < len(self.keys_array) and self.keys_array[i] == encoded
+
+    def __iter__(self):
+        return (k.decode('utf-8') for k in self.keys_array)
+
+
+def build_resource_bundle(directory=None):
+    ''' Compile the JSON location and station indexes in `eemeter.resources`
+    into a bundle of sorted NumPy arrays which can be memory-mapped by
+    :any:`load_bundled_resource` instead of parsed on every process start.
+
+    Parameters
+    ----------
+    directory : str, default None
+        Output directory; defaults to :any:`get_bundle_directory`.
+
+    Returns
+    -------
+    directory : str
+        Directory the bundle was written to.
+    '''
+    if directory is None:
+        directory = get_bundle_directory()
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    for filename, kind in sorted(BUNDLED_RESOURCES.items()):
+        with pkg_resources.resource_stream('eemeter.resources',
+                                           filename) as f:
+            resource = json.loads(f.read().decode('utf-8'))
+
+        if kind == 'set':
+            np.save(_array_path(directory, filename, 'keys'),
+                    _encode(sorted(resource)))
+            continue
+
+        keys = sorted(resource.keys())
+        np.save(_array_path(directory, filename, 'keys'), _encode(keys))
+
+        if kind == 'str':
+            values = _encode([resource[k] for k in keys])
+        elif kind == 'lat_lng':
+            values = np.array([resource[k] for k in keys], dtype=float)
+        else:
+            lengths = [len(resource[k]) for k in keys]
+            offsets = np.concatenate([[0], np.cumsum(lengths)])
+            np.save(_array_path(directory, filename, 'offsets'),
+                    offsets.astype(np.int64))
+            values = _encode([v for k in keys for v in resource[k]])
+        np.save(_array_path(directory, filename, 'values'), values)
+
+    manifest = {
+        'eemeter_version': get_version(),
+        'resources': BUNDLED_RESOURCES,
+    }
+    with open(os.path.join(directory, MANIFEST_FILENAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    logger.info('Built resource bundle in {}'.format(directory))
+    return directory
+
+
+def _bundle_is_current(directory):
+    manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('eemeter_version') != get_version():
+        logger.warning(
+            'Ignoring resource bundle in {} built for eemeter {}.'
+            .format(directory, manifest.get('eemeter_version'))
+        )
+        return False
+    return True
+
+
+def load_bundled_resource(filename, directory=None):
+    ''' Load a bundled index, memory-mapping its arrays.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the JSON resource the bundle was compiled from, e.g.
+        `'zipcode_usaf_station.json'`.
+    directory : str, default None
+        Bundle directory; defaults to :any:`get_bundle_directory`.
+
+    Returns
+    -------
+    resource : eemeter.resources.bundle.BundledMapping or eemeter.resources.bundle.BundledSet or None
+        Index with the same lookup API as the parsed JSON resource, or None
+        if the resource is not bundled or no current bundle has been built.
+    '''
+    kind = BUNDLED_RESOURCES.get(filename, None)
+    if kind is None:
+        return None
+
+    if directory is None:
+        directory = get_bundle_directory()
+    if not _bundle_is_current(directory):
+        return None
+
+    keys = np.load(_array_path(directory, filename, 'keys'), mmap_mode='r')
+    if kind == 'set':
+        return BundledSet(keys)
+
+    values = np.load(_array_path(directory, filename, 'values'),
+                     mmap_mode='r')
+    offsets = None
+    if kind == 'list':
+        offsets = np.load(_array_path(directory, filename, 'offsets'),
+                          mmap_mode='r')
+    return BundledMapping(kind, keys, values, offsets)
@@ -1,15 +1,9 @@
 import os
 import json
-from sqlalchemy import (
-    create_engine,
-    Table,
-    MetaData,
-    Column,
-    Integer,
-    String,
-    DateTime,
-)
-from sqlalchemy.sql import select, func
+
+from eemeter.lazy import lazy_import
+
+sqlalchemy = lazy_import('sqlalchemy')
 
 
 class SqlJSONStore(object):
@@ -35,16 +29,16 @@ class SqlJSONStore(object):
 
         self.url = url
 
-        eng = create_engine(url)
-        metadata = MetaData(eng)
+        eng = sqlalchemy.create_engine(url)
+        metadata = sqlalchemy.MetaData(eng)
 
-        tbl_items = Table(
+        tbl_items = sqlalchemy.Table(
             "items",
             metadata,
-            Column("id", Integer, primary_key=True),
-            Column("data", String),
-            Column("key", String, unique=True),
-            Column("dt", DateTime)
+            sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("data", sqlalchemy.String),
+            sqlalchemy.Column("key", sqlalchemy.String, unique=True),
+            sqlalchemy.Column("dt", sqlalchemy.DateTime)
         )
 
         tbl_items.create(checkfirst=True)
@@ -52,7 +46,7 @@ class SqlJSONStore(object):
         self.items = tbl_items
 
     def key_exists(self, key):
-        s = select([self.items.c.key]).where(self.items.c.key == key)
+        s = sqlalchemy.select([self.items.c.key]).where(self.items.c.key == key)
         result = s.execute()
         return result.fetchone() is not None
 
@@ -60,13 +54,13 @@ class SqlJSONStore(object):
         data = json.dumps(data)
         if self.key_exists(key):
             s = self.items.update().where(self.items.c.key == key).values(
-                key=key, data=data, dt=func.now())
+                key=key, data=data, dt=sqlalchemy.func.now())
         else:
-            s = self.items.insert().values(key=key, data=data, dt=func.now())
+            s = self.items.insert().values(key=key, data=data, dt=sqlalchemy.func.now())
         s.execute()
 
     def retrieve_json(self, key):
-        s = select([self.items.c.data]).where(self.items.c.key == key)
+        s = sqlalchemy.select([self.items.c.data]).where(self.items.c.key == key)
         result = s.execute()
         data = result.fetchone()
         if data is None:
@@ -75,7 +69,7 @@ class SqlJSONStore(object):
             return json.loads(data[0])
 
     def retrieve_datetime(self, key):
-        s = select([self.items.c.dt]).where(self.items.c.key == key)
+        s = sqlalchemy.select([self.items.c.dt]).where(self.items.c.key == key)
         result = s.execute()
         data = result.fetchone()
         if data is None:
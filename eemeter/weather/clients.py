@@ -3,13 +3,17 @@ import gzip
 from io import BytesIO
 import json
 import logging
-from pkg_resources import resource_stream
 import warnings
 from datetime import datetime, timedelta
 
 import pytz
 import pandas as pd
-import requests
+
+from eemeter.lazy import lazy_import
+from eemeter.resources.bundle import load_bundled_resource
+
+pkg_resources = lazy_import('pkg_resources')
+requests = lazy_import('requests')
 
 logger = logging.getLogger(__name__)
 
@@ -44,8 +48,11 @@ class NOAAClient(object):
 
     def _load_station_index(self):
         if self.station_index is None:
-            with resource_stream('eemeter.resources',
-                                 'GSOD-ISD_station_index.json') as f:
+            self.station_index = load_bundled_resource(
+                'GSOD-ISD_station_index.json')
+        if self.station_index is None:
+            with pkg_resources.resource_stream(
+                    'eemeter.resources', 'GSOD-ISD_station_index.json') as f:
                 self.station_index = json.loads(f.read().decode("utf-8"))
         return self.station_index
 
@@ -162,8 +169,11 @@ class TMY3Client(object):
 
     def _load_station_index(self):
         if self.station_index is None:
-            with resource_stream('eemeter.resources',
-                                 'supported_tmy3_stations.json') as f:
+            self.station_index = load_bundled_resource(
+                'supported_tmy3_stations.json')
+        if self.station_index is None:
+            with pkg_resources.resource_stream(
+                    'eemeter.resources', 'supported_tmy3_stations.json') as f:
                 self.station_index = set(json.loads(f.read().decode("utf-8")))
         return self.station_index
 
@@ -231,8 +241,11 @@ class CZ2010Client(object):
 
     def _load_station_index(self):
         if self.station_index is None:
-            with resource_stream('eemeter.resources',
-                                 'supported_cz2010_stations.json') as f:
+            self.station_index = load_bundled_resource(
+                'supported_cz2010_stations.json')
+        if self.station_index is None:
+            with pkg_resources.resource_stream(
+                    'eemeter.resources', 'supported_cz2010_stations.json') as f:
                 self.station_index = set(json.loads(f.read().decode("utf-8")))
         return self.station_index
 
@@ -1,21 +1,35 @@
 import json
 import numpy as np
-from pkg_resources import resource_stream
+
+from eemeter.lazy import lazy_import
+from eemeter.resources.bundle import BundledMapping, load_bundled_resource
+
+pkg_resources = lazy_import('pkg_resources')
+spatial = lazy_import('scipy.spatial')
 
 
 resources = {}
+lookup_tables = {}
+spatial_indexes = {}
 
 
 def _get_json_resource(filename):
-    with resource_stream('eemeter.resources', filename) as f:
+    with pkg_resources.resource_stream('eemeter.resources', filename) as f:
         resource = json.loads(f.read().decode('utf-8'))
     return resource
 
 
+def _get_resource(filename):
+    resource = load_bundled_resource(filename)
+    if resource is None:
+        resource = _get_json_resource(filename)
+    return resource
+
+
 def _load_resource(name, filename):
     global resources
     if resources.get(name, None) is None:
-        resources[name] = _get_json_resource(filename)
+        resources[name] = _get_resource(filename)
     return resources[name]
 
 
@@ -114,6 +128,103 @@ def _load_supported_climate_zones_index():
                           'supported_climate_zones.json')
 
 
+def _load_lookup_table(name, index_loader):
+    # Sorted key array and aligned value array, for vectorized lookups with
+    # np.searchsorted.
+    if lookup_tables.get(name, None) is None:
+        index = index_loader()
+        if isinstance(index, BundledMapping) and index.kind == 'str':
+            # already sorted; decode in bulk
+            keys = np.char.decode(index.keys_array, 'utf-8')
+            values = np.char.decode(index.values_array, 'utf-8')
+            values = values.astype(object)
+        else:
+            keys = np.array(sorted(index.keys()))
+            values = np.empty(len(keys), dtype=object)
+            values[:] = [index[key] for key in keys]
+        lookup_tables[name] = (keys, values)
+    return lookup_tables[name]
+
+
+def _lookup_many(lookup_table, queries):
+    keys, values = lookup_table
+    queries = np.asarray(queries, dtype=object)
+    results = np.full(queries.shape, None, dtype=object)
+    valid = np.not_equal(queries, None)
+    if not valid.any() or len(keys) == 0:
+        return results
+    valid_queries = queries[valid].astype(str)
+    positions = np.searchsorted(keys, valid_queries)
+    positions[positions == len(keys)] = 0
+    found = keys[positions] == valid_queries
+    valid_results = np.full(valid_queries.shape, None, dtype=object)
+    valid_results[found] = values[positions[found]]
+    results[valid] = valid_results
+    return results
+
+
+def _lat_lng_to_unit_xyz(lat, lng):
+    # Points on the unit sphere. Euclidean (chord) distance between two such
+    # points increases monotonically with great circle distance, so nearest
+    # neighbors in 3-D space are also nearest by haversine distance.
+    lat, lng = np.radians(lat), np.radians(lng)
+    cos_lat = np.cos(lat)
+    return np.column_stack([
+        cos_lat * np.cos(lng),
+        cos_lat * np.sin(lng),
+        np.sin(lat),
+    ])
+
+
+def _load_spatial_index(name, lat_lng_index_loader):
+    if spatial_indexes.get(name, None) is None:
+        lat_lng_index = lat_lng_index_loader()
+        if isinstance(lat_lng_index, BundledMapping):
+            keys = np.char.decode(lat_lng_index.keys_array, 'utf-8')
+            keys = keys.astype(object)
+            lat_lngs = np.asarray(lat_lng_index.values_array, dtype=float)
+        else:
+            keys = np.array(list(lat_lng_index.keys()), dtype=object)
+            lat_lngs = np.array([lat_lng_index[key] for key in keys],
+                                dtype=float)
+        tree = spatial.cKDTree(_lat_lng_to_unit_xyz(lat_lngs[:, 0], lat_lngs[:, 1]))
+        spatial_indexes[name] = (keys, tree)
+    return spatial_indexes[name]
+
+
+def _load_usaf_station_spatial_index():
+    return _load_spatial_index('usaf_station_spatial_index',
+                               _load_usaf_station_to_lat_lng_index)
+
+
+def _load_tmy3_station_spatial_index():
+    return _load_spatial_index('tmy3_station_spatial_index',
+                               _load_tmy3_station_to_lat_lng_index)
+
+
+def _load_zipcode_spatial_index():
+    return _load_spatial_index('zipcode_spatial_index',
+                               _load_zipcode_to_lat_lng_index)
+
+
+def _query_spatial_index(spatial_index, lat, lng):
+    keys, tree = spatial_index
+    _, i = tree.query(_lat_lng_to_unit_xyz(lat, lng)[0])
+    return keys[i]
+
+
+def _query_spatial_index_many(spatial_index, lats, lngs):
+    keys, tree = spatial_index
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    results = np.full(lats.shape, None, dtype=object)
+    valid = np.isfinite(lats) & np.isfinite(lngs)
+    if valid.any():
+        _, i = tree.query(_lat_lng_to_unit_xyz(lats[valid], lngs[valid]))
+        results[valid] = keys[i]
+    return results
+
+
 def haversine(lat1, lng1, lat2, lng2):
     """ Calculate the great circle distance between two points
     on the earth (specified in decimal degrees)
@@ -165,11 +276,7 @@ def lat_lng_to_usaf_station(lat, lng):
     """
     if lat is None or lng is None:
         return None
-    usaf_station_to_lat_lng_index = _load_usaf_station_to_lat_lng_index()
-    index_list = list(usaf_station_to_lat_lng_index.items())
-    dists = [haversine(lat, lng, stat_lat, stat_lng)
-             for _, (stat_lat, stat_lng) in index_list]
-    return index_list[np.argmin(dists)][0]
+    return _query_spatial_index(_load_usaf_station_spatial_index(), lat, lng)
 
 
 def lat_lng_to_tmy3_station(lat, lng):
@@ -191,11 +298,7 @@ def lat_lng_to_tmy3_station(lat, lng):
     """
     if lat is None or lng is None:
         return None
-    tmy3_station_to_lat_lng_index = _load_tmy3_station_to_lat_lng_index()
-    index_list = list(tmy3_station_to_lat_lng_index.items())
-    dists = [haversine(lat, lng, stat_lat, stat_lng)
-             for _, (stat_lat, stat_lng) in index_list]
-    return index_list[np.argmin(dists)][0]
+    return _query_spatial_index(_load_tmy3_station_spatial_index(), lat, lng)
 
 
 def lat_lng_to_zipcode(lat, lng):
@@ -218,11 +321,7 @@ def lat_lng_to_zipcode(lat, lng):
 
     if lat is None or lng is None:
         return None
-    zipcode_to_lat_lng_index = _load_zipcode_to_lat_lng_index()
-    index_list = list(zipcode_to_lat_lng_index.items())
-    dists = [haversine(lat, lng, zip_lat, zip_lng)
-             for _, (zip_lat, zip_lng) in index_list]
-    return index_list[np.argmin(dists)][0]
+    return _query_spatial_index(_load_zipcode_spatial_index(), lat, lng)
 
 
 def lat_lng_to_climate_zone(lat, lng):
@@ -247,6 +346,89 @@ def lat_lng_to_climate_zone(lat, lng):
     return zipcode_to_climate_zone_index.get(zipcode, None)
 
 
+def lat_lngs_to_usaf_stations(lats, lngs):
+    """Return the closest USAF station IDs for arrays of latitude and
+    longitude coordinates.
+
+    Parameters
+    ----------
+    lats : array_like of float
+        Latitude coordinates.
+    lngs : array_like of float
+        Longitude coordinates.
+
+    Returns
+    -------
+    stations : numpy.ndarray of str or None
+        Strings representing USAF weather station IDs, or None where the
+        coordinates were missing.
+    """
+    return _query_spatial_index_many(
+        _load_usaf_station_spatial_index(), lats, lngs)
+
+
+def lat_lngs_to_tmy3_stations(lats, lngs):
+    """Return the closest TMY3 station IDs for arrays of latitude and
+    longitude coordinates.
+
+    Parameters
+    ----------
+    lats : array_like of float
+        Latitude coordinates.
+    lngs : array_like of float
+        Longitude coordinates.
+
+    Returns
+    -------
+    stations : numpy.ndarray of str or None
+        Strings representing TMY3 weather station IDs, or None where the
+        coordinates were missing.
+    """
+    return _query_spatial_index_many(
+        _load_tmy3_station_spatial_index(), lats, lngs)
+
+
+def lat_lngs_to_zipcodes(lats, lngs):
+    """Return the closest ZIP codes for arrays of latitude and longitude
+    coordinates.
+
+    Parameters
+    ----------
+    lats : array_like of float
+        Latitude coordinates.
+    lngs : array_like of float
+        Longitude coordinates.
+
+    Returns
+    -------
+    zipcodes : numpy.ndarray of str or None
+        Strings representing USPS ZIP codes, or None where the coordinates
+        were missing.
+    """
+    return _query_spatial_index_many(
+        _load_zipcode_spatial_index(), lats, lngs)
+
+
+def lat_lngs_to_climate_zones(lats, lngs):
+    """Return the climate zones of the closest ZIP codes for arrays of
+    latitude and longitude coordinates.
+
+    Parameters
+    ----------
+    lats : array_like of float
+        Latitude coordinates.
+    lngs : array_like of float
+        Longitude coordinates.
+
+    Returns
+    -------
+    climate_zones : numpy.ndarray of str or None
+        Strings representing climate zones, or None where no climate zone
+        was found.
+    """
+    return zipcodes_to_climate_zones(lat_lngs_to_zipcodes(lats, lngs))
+
+
 def usaf_station_to_lat_lng(station):
     """Return the latitude and longitude coordinates of the given USAF station.
 
@@ -445,6 +627,87 @@ def zipcode_to_climate_zone(zipcode):
     return _load_zipcode_to_climate_zone_index().get(zipcode, None)
 
 
+def zipcodes_to_usaf_stations(zipcodes):
+    """Return the nearest USAF stations for an array of ZIP codes. Vectorized
+    version of :any:`zipcode_to_usaf_station`.
+
+    Parameters
+    ----------
+    zipcodes : array_like of str
+        Strings representing USPS ZIP codes.
+
+    Returns
+    -------
+    stations : numpy.ndarray of str or None
+        Strings representing USAF weather station IDs, or None where no
+        station was found.
+    """
+    return _lookup_many(_load_lookup_table(
+        'zipcode_to_usaf_station_table', _load_zipcode_to_usaf_station_index
+    ), zipcodes)
+
+
+def zipcodes_to_tmy3_stations(zipcodes):
+    """Return the nearest TMY3 stations for an array of ZIP codes. Vectorized
+    version of :any:`zipcode_to_tmy3_station`.
+
+    Parameters
+    ----------
+    zipcodes : array_like of str
+        Strings representing USPS ZIP codes.
+
+    Returns
+    -------
+    stations : numpy.ndarray of str or None
+        Strings representing TMY3 weather station IDs, or None where no
+        station was found.
+    """
+    return _lookup_many(_load_lookup_table(
+        'zipcode_to_tmy3_station_table', _load_zipcode_to_tmy3_station_index
+    ), zipcodes)
+
+
+def zipcodes_to_cz2010_stations(zipcodes):
+    """Return the nearest CZ2010 stations for an array of ZIP codes.
+    Vectorized version of :any:`zipcode_to_cz2010_station`.
+
+    Parameters
+    ----------
+    zipcodes : array_like of str
+        Strings representing USPS ZIP codes.
+
+    Returns
+    -------
+    stations : numpy.ndarray of str or None
+        Strings representing CZ2010 weather station IDs, or None where no
+        station was found.
+    """
+    return _lookup_many(_load_lookup_table(
+        'zipcode_to_cz2010_station_table',
+        _load_zipcode_to_cz2010_station_index
+    ), zipcodes)
+
+
+def zipcodes_to_climate_zones(zipcodes):
+    """Return the climate zones for an array of ZIP codes. Vectorized version
+    of :any:`zipcode_to_climate_zone`.
+
+    Parameters
+    ----------
+    zipcodes : array_like of str
+        Strings representing USPS ZIP codes.
+
+    Returns
+    -------
+    climate_zones : numpy.ndarray of str or None
+        Strings representing climate zones, or None where no climate zone
+        was found.
+    """
+    return _lookup_many(_load_lookup_table(
+        'zipcode_to_climate_zone_table', _load_zipcode_to_climate_zone_index
+    ), zipcodes)
+
+
 def climate_zone_to_zipcodes(climate_zone):
     """Return ZIP codes with centroids in the given climate zone.
 
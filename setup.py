@@ -25,6 +25,7 @@ setup(
         'click',
         'dateparser',
         'holidays',
+        'joblib',
         'lxml',
         'numpy >= 1.10.2',
         'scipy',
@@ -37,7 +38,7 @@ setup(
         'SQLAlchemy',
         'xlrd',
     ],
-    package_data={'': ['*.json', '*.gz', '*.csv']},
+    package_data={'': ['*.json', '*.gz', '*.csv', '*.npy']},
     setup_requires=['pytest-runner'],
     tests_require=['pytest'],
     entry_points={
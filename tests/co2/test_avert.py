@@ -1,6 +1,11 @@
+import numpy as np
 import pytest
 
-from eemeter.co2.avert import AVERTSource
+from eemeter.co2.avert import (
+    AVERTSource,
+    clear_avert_source_cache,
+    get_avert_source,
+)
 from eemeter.testing import MockAVERTClient
 
 
@@ -20,3 +25,60 @@ def test_load_by_hour(mock_avert_source):
     load_by_hour = mock_avert_source.get_load_by_hour()
     assert load_by_hour.shape[0] == 366 * 24
     assert load_by_hour.dropna().shape[0] == 366 * 24
+
+
+def test_get_co2_data(monkeypatch, tmpdir):
+    monkeypatch.setattr(AVERTSource, 'client', MockAVERTClient())
+    url = 'sqlite:///{}/co2_cache.db'.format(tmpdir)
+    cs = AVERTSource(2016, 'UMW', cache_url=url)
+
+    co2_by_load, load_by_hour = cs.get_co2_data()
+    assert co2_by_load.shape == (60,)
+    assert load_by_hour.shape == (366,)
+    assert load_by_hour.dropna().shape == (366,)
+
+
+def test_get_avert_source_is_shared(monkeypatch, tmpdir):
+    monkeypatch.setattr(AVERTSource, 'client', MockAVERTClient())
+    url = 'sqlite:///{}/co2_cache.db'.format(tmpdir)
+    clear_avert_source_cache()
+
+    cs = get_avert_source(2016, 'UMW', cache_url=url)
+    assert get_avert_source(2016, 'UMW', cache_url=url) is cs
+    assert get_avert_source(2016, 'RM', cache_url=url) is not cs
+
+    f = cs.get_co2_interpolator()
+    assert cs.get_co2_interpolator() is f
+    assert cs.get_co2_data() is cs.get_co2_data()
+
+    clear_avert_source_cache()
+    assert get_avert_source(2016, 'UMW', cache_url=url) is not cs
+
+
+def test_get_co2_avoided(monkeypatch, tmpdir):
+    monkeypatch.setattr(AVERTSource, 'client', MockAVERTClient())
+    url = 'sqlite:///{}/co2_cache.db'.format(tmpdir)
+    cs = AVERTSource(2016, 'UMW', cache_url=url)
+
+    load_by_hour = cs.get_normal_year_load_by_hour()
+    assert load_by_hour.shape == (365,)
+
+    curves = np.vstack([
+        np.zeros(365),
+        np.linspace(0, 1000, 365),
+        np.full(365, 1e6),  # pushes load out of range
+    ])
+    co2_avoided = cs.get_co2_avoided(curves)
+    assert co2_avoided.shape == (3, 365)
+
+    f = cs.get_co2_interpolator()
+    for curve, avoided in zip(curves[:2], co2_avoided[:2]):
+        expected = f(load_by_hour.values) - f(load_by_hour.values - curve)
+        np.testing.assert_allclose(avoided, expected)
+        np.testing.assert_allclose(cs.get_co2_avoided(curve), expected)
+    assert np.isnan(co2_avoided[2]).all()
+
+    with pytest.raises(ValueError):
+        cs.get_co2_avoided(curves[2])
+    with pytest.raises(ValueError):
+        cs.get_co2_avoided(np.zeros(10))
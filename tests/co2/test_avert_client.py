@@ -6,3 +6,46 @@ def test_rdf_data():
     co2_by_load, load_by_hour = client.read_rdf_file(2016, 'UMW')
     assert load_by_hour.dropna().shape == (366*24,)
     assert co2_by_load.dropna().shape[0] > 1
+
+
+class FakeRDFSheet(object):
+    ''' Minimal stand-in for an xlrd sheet laid out like an AVERT RDF file:
+    load bins in row 1 from column 15, hourly year/month/day/hour/load in
+    columns 1-5 from row 3, and CO2 by load bin in rows 10004-11998.
+    '''
+
+    def __init__(self, nbins=3, nhours=48):
+        self.ncols = 15 + nbins
+        self.rows = [[''] * self.ncols for _ in range(12000)]
+        self.rows[0][0] = 'Region'
+        for j in range(nbins):
+            self.rows[1][15 + j] = 1000. * (j + 1)
+        for k in range(nhours):
+            self.rows[3 + k][1:6] = [2016., 1., 1. + k // 24,
+                                     float(k % 24), 100. + k]
+        for i in range(10004, 12000):
+            for j in range(nbins):
+                if i % 7 != 0:
+                    self.rows[i][15 + j] = float(j + 1)
+        self.nrows = len(self.rows)
+
+    def row_values(self, rowx, start_colx=0, end_colx=None):
+        return self.rows[rowx][start_colx:end_colx]
+
+    def col_values(self, colx, start_rowx=0, end_rowx=None):
+        return [row[colx] for row in self.rows[start_rowx:end_rowx]]
+
+
+def test_parse_rdf_sheet():
+    sheet = FakeRDFSheet()
+    co2_by_load, load_by_hour = AVERTClient()._parse_rdf_sheet(sheet)
+
+    # rows 10004-11998, skipping the empty cells in every seventh row
+    n_filled = sum(1 for i in range(10004, 11999) if i % 7 != 0)
+    assert list(co2_by_load.index) == [1000., 2000., 3000.]
+    assert list(co2_by_load.values) == [n_filled, 2 * n_filled, 3 * n_filled]
+
+    assert load_by_hour.shape == (48,)
+    assert str(load_by_hour.index[0]) == '2016-01-01 00:00:00'
+    assert str(load_by_hour.index[-1]) == '2016-01-02 23:00:00'
+    assert load_by_hour.iloc[-1] == 147.
@@ -0,0 +1,82 @@
+import tempfile
+
+import numpy as np
+import pandas as pd
+from numpy.testing import assert_allclose
+
+from eemeter.co2.cache import SqlCO2Store
+
+
+def _store():
+    tmpdir = tempfile.mkdtemp()
+    url = "sqlite:///{}/co2_cache.db".format(tmpdir)
+    return SqlCO2Store(url)
+
+
+def _data():
+    co2_by_load = pd.Series([3., 1., 2.], index=[3000., 1000., 2000.])
+    index = pd.date_range('2016-01-01', periods=366 * 24, freq='H')
+    load_by_hour = pd.Series(np.arange(366 * 24, dtype=float), index=index)
+    return co2_by_load, load_by_hour
+
+
+def test_basic_usage():
+    s = _store()
+    co2_by_load, load_by_hour = _data()
+
+    assert s.key_exists(2016, 'UMW') is False
+    assert s.retrieve(2016, 'UMW') == (None, None)
+
+    s.save(2016, 'UMW', co2_by_load, load_by_hour)
+    assert s.key_exists(2016, 'UMW') is True
+
+    retrieved_co2_by_load, retrieved_load_by_hour = s.retrieve(2016, 'UMW')
+    assert list(retrieved_co2_by_load.index) == [1000., 2000., 3000.]
+    assert list(retrieved_co2_by_load.values) == [1., 2., 3.]
+    pd.testing.assert_series_equal(
+        retrieved_load_by_hour, load_by_hour, check_freq=False)
+
+    assert_allclose(s.retrieve_co2_by_load(2016, 'UMW').values, [1, 2, 3])
+    assert s.retrieve_load_by_hour(2016, 'UMW').shape == (366 * 24,)
+
+    # update
+    s.save(2016, 'UMW', co2_by_load * 2, load_by_hour)
+    assert list(s.retrieve_co2_by_load(2016, 'UMW').values) == [2., 4., 6.]
+
+    s.save(2016, 'NE', co2_by_load, load_by_hour)
+    s.clear(2016, 'UMW')
+    assert s.key_exists(2016, 'UMW') is False
+    assert s.key_exists(2016, 'NE') is True
+
+    s.clear()
+    assert s.key_exists(2016, 'NE') is False
+
+    assert str(s) == 'SqlCO2Store("{}")'.format(s.url)
+
+
+def test_load_by_hour_with_gap():
+    s = _store()
+    co2_by_load, load_by_hour = _data()
+    load_by_hour = load_by_hour.drop(load_by_hour.index[5:10])
+
+    s.save(2016, 'UMW', co2_by_load, load_by_hour)
+    retrieved = s.retrieve_load_by_hour(2016, 'UMW')
+
+    assert retrieved.shape == (366 * 24,)
+    assert retrieved.iloc[5:10].isnull().all()
+    pd.testing.assert_series_equal(
+        retrieved.dropna(), load_by_hour, check_freq=False)
+
+
+def test_load_by_hour_with_duplicates():
+    s = _store()
+    co2_by_load, _ = _data()
+    index = pd.DatetimeIndex(['2016-01-01 00:00', '2016-01-01 01:00',
+                              '2016-01-01 01:00', '2016-01-01 02:00'])
+    load_by_hour = pd.Series([1., 2., 3., 4.], index=index)
+
+    s.save(2016, 'UMW', co2_by_load, load_by_hour)
+    retrieved = s.retrieve_load_by_hour(2016, 'UMW')
+
+    assert list(retrieved.index) == list(index.unique())
+    assert list(retrieved.values) == [1., 3., 4.]
@@ -0,0 +1,210 @@
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+import eemeter.ee.derivatives
+from eemeter.ee.incremental import IncrementalReportingPeriod
+from eemeter.ee.meter import EnergyEfficiencyMeter
+from eemeter.io.serializers import deserialize_meter_input
+from eemeter.modeling.formatters import ModelDataFormatter
+from eemeter.modeling.models import CaltrackDailyModel
+from eemeter.modeling.split import SplitModeledEnergyTrace
+from eemeter.structures import EnergyTrace
+from eemeter.testing.mocks import MockWeatherClient
+from eemeter.weather import ISDWeatherSource, TMY3WeatherSource
+
+
+@pytest.fixture
+def mock_isd_weather_source():
+    tmp_url = "sqlite:///{}/weather_cache.db".format(tempfile.mkdtemp())
+    ws = ISDWeatherSource("722880", tmp_url)
+    ws.client = MockWeatherClient()
+    return ws
+
+
+@pytest.fixture
+def mock_tmy3_weather_source():
+    tmp_url = "sqlite:///{}/weather_cache.db".format(tempfile.mkdtemp())
+    ws = TMY3WeatherSource("724838", tmp_url, preload=False)
+    ws.client = MockWeatherClient()
+    ws._load_data()
+    return ws
+
+
+@pytest.fixture
+def meter_input_daily():
+    record_starts = pd.date_range(
+        '2012-01-01', periods=365 * 3, freq='D', tz=pytz.UTC)
+    values = 1 + np.random.RandomState(2).rand(365 * 3)
+    values[800] = np.nan
+    records = [
+        {
+            "start": dt.isoformat(),
+            "value": value,
+            "estimated": False
+        } for dt, value in zip(record_starts, values)
+    ]
+    return {
+        "type": "SINGLE_TRACE_SIMPLE_PROJECT",
+        "trace": {
+            "type": "ARBITRARY_START",
+            "interpretation": "NATURAL_GAS_CONSUMPTION_SUPPLIED",
+            "unit": "THERM",
+            "trace_id": "TRACE_1",
+            "interval": "daily",
+            "records": records
+        },
+        "project": {
+            "type": "PROJECT_WITH_SINGLE_MODELING_PERIOD_GROUP",
+            "zipcode": "91104",
+            "project_id": "PROJECT_1",
+            "modeling_period_group": {
+                "baseline_period": {
+                    "start": None,
+                    "end": "2014-01-01T00:00:00+00:00"
+                },
+                "reporting_period": {
+                    "start": "2014-02-01T00:00:00+00:00",
+                    "end": None
+                }
+            }
+        }
+    }
+
+
+@pytest.fixture
+def baseline_model(mock_isd_weather_source):
+    data = {
+        "value": 1 + np.random.RandomState(0).rand(730),
+        "estimated": np.tile(False, (730,)),
+    }
+    index = pd.date_range('2000-01-01', periods=730, freq='D', tz=pytz.UTC)
+    df = pd.DataFrame(data, index=index, columns=["value", "estimated"])
+    trace = EnergyTrace("ELECTRICITY_CONSUMPTION_SUPPLIED", df, unit="KWH")
+    formatter = ModelDataFormatter('D')
+    model = CaltrackDailyModel()
+    model.fit(formatter.create_input(trace, mock_isd_weather_source))
+    return model
+
+
+@pytest.fixture
+def observed():
+    index = pd.date_range('2002-01-01', periods=61, freq='D', tz=pytz.UTC)
+    observed = pd.Series(np.random.RandomState(1).rand(61), index=index)
+    observed.iloc[3] = np.nan
+    return observed
+
+
+def test_append_matches_single_evaluation(
+        baseline_model, observed, mock_isd_weather_source):
+    formatter = ModelDataFormatter('D')
+
+    incremental = IncrementalReportingPeriod(
+        baseline_model, formatter, mock_isd_weather_source)
+    incremental.append(observed[:30])
+    incremental.append(observed[30:])
+    assert len(incremental.observed) == 61
+    assert incremental.mask.sum() == 1
+
+    demand_fixture_data = formatter.create_demand_fixture(
+        observed.index, mock_isd_weather_source)
+    predicted, variance = baseline_model.predict(
+        demand_fixture_data, summed=True)
+    assert np.isclose(incremental.predicted_total, predicted)
+    assert np.isclose(incremental.variance_total, variance)
+
+    single = IncrementalReportingPeriod(
+        baseline_model, formatter, mock_isd_weather_source)
+    single.append(observed)
+
+    derivatives = incremental.derivatives()
+    assert len(derivatives) == 12
+    for d, s in zip(derivatives, single.derivatives()):
+        assert d['series'] == s['series']
+        assert d['orderable'] == s['orderable']
+        np.testing.assert_allclose(
+            np.array(d['value'], dtype=float),
+            np.array(s['value'], dtype=float))
+
+
+def test_append_out_of_order(
+        baseline_model, observed, mock_isd_weather_source):
+    incremental = IncrementalReportingPeriod(
+        baseline_model, ModelDataFormatter('D'), mock_isd_weather_source)
+    incremental.append(observed[30:])
+    with pytest.raises(ValueError):
+        incremental.append(observed[:30])
+
+
+def test_matches_meter_evaluate(
+        meter_input_daily, mock_isd_weather_source, mock_tmy3_weather_source,
+        monkeypatch):
+    # CO2 derivatives aren't compared; avoid downloading AVERT data.
+    monkeypatch.setattr(
+        eemeter.ee.derivatives, 'get_co2_source', lambda site: None)
+
+    results = EnergyEfficiencyMeter().evaluate(
+        meter_input_daily, weather_source=mock_isd_weather_source,
+        weather_normal_source=mock_tmy3_weather_source)
+    assert results['status'] == 'SUCCESS'
+    assert results['model_class'] == 'CaltrackDailyModel'
+    assert results['formatter_class'] == 'ModelDataFormatter'
+    evaluated = {d['series']: d for d in results['derivatives']}
+
+    deserialized_input = deserialize_meter_input(meter_input_daily)
+    trace = deserialized_input['trace']
+    modeling_period_set = \
+        deserialized_input['project']['modeling_period_set']
+    formatter = ModelDataFormatter(**results['formatter_kwargs'])
+    model_mapping = {
+        label: CaltrackDailyModel(
+            modeling_period_interpretation=label,
+            **results['model_kwargs'])
+        for label, _ in modeling_period_set.iter_modeling_periods()
+    }
+    modeled_trace = SplitModeledEnergyTrace(
+        trace, formatter, model_mapping, modeling_period_set)
+    modeled_trace.fit(mock_isd_weather_source)
+
+    (baseline_label, _), (_, reporting_period) = \
+        next(modeling_period_set.iter_modeling_period_groups())
+    incremental = IncrementalReportingPeriod.from_modeled_trace(
+        modeled_trace, baseline_label, mock_isd_weather_source)
+    reporting_period_data = formatter.daily_trace_data(trace)[
+        reporting_period.start_date:reporting_period.end_date]
+    incremental.append(reporting_period_data[:100])
+    incremental.append(reporting_period_data[100:])
+
+    derivatives = incremental.derivatives()
+    assert len(derivatives) == 12
+    for d in derivatives:
+        e = evaluated[d['series']]
+        assert d['orderable'] == e['orderable']
+        for key in ['value', 'variance']:
+            np.testing.assert_allclose(
+                np.array(d[key], dtype=float),
+                np.array(e[key], dtype=float))
+
+
+def test_derivative_freq(
+        baseline_model, observed, mock_isd_weather_source):
+    formatter = ModelDataFormatter('D')
+    with pytest.raises(ValueError):
+        IncrementalReportingPeriod(
+            baseline_model, formatter, mock_isd_weather_source,
+            derivative_freq='15T')
+
+    incremental = IncrementalReportingPeriod(
+        baseline_model, formatter, mock_isd_weather_source)
+    with pytest.raises(ValueError):
+        incremental.append(observed.resample('H').ffill())
+
+    # skipped days are masked
+    incremental.append(observed[:10])
+    incremental.append(observed[12:])
+    assert len(incremental.observed) == 61
+    assert incremental.mask[observed.index[10:12]].all()
+    assert incremental.mask.sum() == 3
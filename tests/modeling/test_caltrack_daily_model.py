@@ -0,0 +1,149 @@
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from eemeter.modeling.exceptions import (
+    DataSufficiencyException,
+    ModelPredictException,
+)
+from eemeter.modeling.formatters import ModelDataFormatter
+from eemeter.modeling.models import CaltrackDailyModel
+from eemeter.structures import EnergyTrace
+from eemeter.testing.mocks import MockWeatherClient
+from eemeter.weather import ISDWeatherSource
+
+
+@pytest.fixture
+def mock_isd_weather_source():
+    tmp_url = "sqlite:///{}/weather_cache.db".format(tempfile.mkdtemp())
+    ws = ISDWeatherSource("722880", tmp_url)
+    ws.client = MockWeatherClient()
+    return ws
+
+
+@pytest.fixture
+def input_data(mock_isd_weather_source):
+    index = pd.date_range('2000-01-01', periods=730, freq='D', tz=pytz.UTC)
+    df = pd.DataFrame({"value": 1.0, "estimated": False}, index=index,
+                      columns=["value", "estimated"])
+    trace = EnergyTrace("ELECTRICITY_CONSUMPTION_SUPPLIED", df, unit="KWH")
+    base = ModelDataFormatter('D').create_input(
+        trace, mock_isd_weather_source)
+
+    np.random.seed(0)
+    temps = base.tempF.values
+    input_data = []
+    for cdd, hdd in [(1, 0.5), (0, 2), (0, 0), (0.3, 0.1)]:
+        data = base.copy()
+        data['energy'] = 10 + cdd * np.maximum(temps - 68, 0) + \
+            hdd * np.maximum(57 - temps, 0) + np.random.normal(0, 2, 730)
+        data.iloc[np.random.randint(0, 730, 20), 0] = np.nan
+        input_data.append(data)
+    return input_data
+
+
+@pytest.mark.parametrize('kwargs', [
+    {}, {'grid_search': True}, {'grid_search': True, 'fit_cdd': False},
+])
+def test_fit_batch_matches_fit(input_data, kwargs):
+    models, outputs = CaltrackDailyModel.fit_batch(
+        input_data + [input_data[0].iloc[:100]], **kwargs)
+    assert len(models) == 5
+    assert isinstance(outputs[-1], DataSufficiencyException)
+
+    for data, model, output in zip(input_data, models, outputs):
+        expected = CaltrackDailyModel(**kwargs).fit(data)
+        params = output['model_params']
+        assert params['formula'] == expected['model_params']['formula']
+        for k, v in expected['model_params']['coefficients'].items():
+            assert np.isclose(params['coefficients'][k], v, rtol=1e-8)
+        for k in ('r2', 'rmse', 'cvrmse', 'n'):
+            assert np.isclose(output[k], expected[k], rtol=1e-7)
+        assert output['n_bp_candidates'] == expected['n_bp_candidates']
+        np.testing.assert_allclose(
+            params['fitted'].cov, expected['model_params']['fitted'].cov,
+            rtol=1e-6)
+
+        demand_fixture_data = data.iloc[:30][['tempF']]
+        predicted, variance = model.predict(demand_fixture_data)
+        assert np.isclose(predicted, model.predict(
+            demand_fixture_data, expected['model_params'])[0])
+
+
+def test_fit_batch_requires_shared_temperatures(input_data):
+    input_data[1] = input_data[1].copy()
+    input_data[1]['tempF'] += 1
+    with pytest.raises(ValueError):
+        CaltrackDailyModel.fit_batch(input_data)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {}, {'grid_search': True},
+    {'grid_search': True, 'bp_search': 'coarse_to_fine',
+     'bp_resolution': 0.5},
+])
+def test_fit_chunks_matches_fit(input_data, kwargs):
+    for data in input_data:
+        expected = CaltrackDailyModel(**kwargs).fit(data)
+        output = CaltrackDailyModel(**kwargs).fit_chunks(
+            data.iloc[i:i + 100] for i in range(0, len(data), 100))
+
+        params = output['model_params']
+        assert params['formula'] == expected['model_params']['formula']
+        for k, v in expected['model_params']['coefficients'].items():
+            assert np.isclose(params['coefficients'][k], v, rtol=1e-8)
+        for k in ('r2', 'rmse', 'cvrmse', 'n'):
+            assert np.isclose(output[k], expected[k], rtol=1e-7)
+        assert output['n_bp_candidates'] == expected['n_bp_candidates']
+
+
+def test_fit_chunks_out_of_order(input_data):
+    data = input_data[0]
+    with pytest.raises(ValueError):
+        CaltrackDailyModel().fit_chunks([data.iloc[365:], data.iloc[:365]])
+    with pytest.raises(DataSufficiencyException):
+        CaltrackDailyModel().fit_chunks([data.iloc[:100]])
+
+
+def test_ami_to_daily_degree_day_columns(input_data):
+    model = CaltrackDailyModel(grid_search=True, keep_training_data=True)
+    output = model.fit(input_data[0])
+    # only the best candidates of each model type are formatted, to refit
+    assert len([c for c in model.df.columns if c[:3] in ('CDD', 'HDD')]) <= 4
+
+    df = model.ami_to_daily(input_data[0])
+    assert len([c for c in df.columns if c[:3] in ('CDD', 'HDD')]) == 22
+
+    params = output['model_params']
+    fitted_columns = sorted(
+        c for c in model.ami_to_daily(input_data[0], params).columns
+        if c[:3] in ('CDD', 'HDD'))
+    assert fitted_columns == sorted(
+        c for c in params['coefficients'] if c != 'Intercept')
+    assert sorted(model.ami_to_daily(
+        input_data[0], degree_days=False).columns) == \
+        ['ndays', 'upd', 'usage']
+
+
+def test_fit_keeps_only_compact_fit(input_data):
+    model = CaltrackDailyModel()
+    model.fit(input_data[0])
+    for attr in ('input_data', 'df', 'X', 'y', 'estimated', 'model_obj',
+                 'model_res'):
+        assert getattr(model, attr) is None
+    assert model.fitted is not None
+
+
+def test_predict_with_params_without_fitted(input_data):
+    model = CaltrackDailyModel()
+    output = model.fit(input_data[0])
+    params = {k: v for k, v in output['model_params'].items()
+              if k != 'fitted'}
+    assert model.predict(input_data[0], params=params) == \
+        model.predict(input_data[0])
+
+    with pytest.raises(ModelPredictException):
+        CaltrackDailyModel().predict(input_data[0], params=params)
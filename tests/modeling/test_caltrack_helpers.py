@@ -0,0 +1,216 @@
+import pickle
+
+import numpy as np
+from numpy.testing import assert_allclose
+import pandas as pd
+import pytest
+import patsy
+import statsmodels.formula.api as smf
+
+from eemeter.modeling.models.caltrack_helpers import (
+    BalancePointSearch,
+    CaltrackFit,
+    CandidateMoments,
+    DegreeDayDesign,
+    _average_degree_days,
+    _balance_point_grid,
+    _bp_column,
+    _candidate_moments,
+    _fit_candidates,
+    _fit_full,
+    _fit_hdd_only,
+    _pinv,
+    _solve_candidate_moments,
+)
+
+
+@pytest.fixture
+def degree_day_df():
+    np.random.seed(0)
+    n = 100
+    temp = 60 + 20 * np.sin(np.arange(n) * 2 * np.pi / 100)
+    df = pd.DataFrame({
+        'CDD_65': np.maximum(temp - 65, 0),
+        'CDD_70': np.maximum(temp - 70, 0),
+        'HDD_55': np.maximum(55 - temp, 0),
+        'HDD_60': np.maximum(60 - temp, 0),
+        'ndays': np.random.randint(15, 32, n).astype(float),
+    })
+    df['upd'] = 5 + 2 * df.CDD_70 + df.HDD_55 + np.random.normal(0, 1, n)
+    df.loc[[3, 50], 'upd'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+def test_fit_candidates_matches_statsmodels(degree_day_df, weighted):
+    df = degree_day_df
+    candidates = [['CDD_65', 'HDD_55'], ['CDD_70', 'HDD_60']]
+    X = np.ones((2, len(df), 3))
+    for i, columns in enumerate(candidates):
+        X[i, :, 1:] = df[columns].values
+    weights = df.ndays.values if weighted else None
+
+    params, pvalues, rsquared_adj = _fit_candidates(df.upd.values, X, weights)
+
+    for i, columns in enumerate(candidates):
+        formula = 'upd ~ ' + ' + '.join(columns)
+        if weighted:
+            res = smf.wls(formula, df, weights=df.ndays).fit()
+        else:
+            res = smf.ols(formula, df).fit()
+        assert_allclose(params[i], res.params.values, rtol=1e-8)
+        assert_allclose(pvalues[i], res.pvalues.values, rtol=1e-6)
+        assert_allclose(rsquared_adj[i], res.rsquared_adj, rtol=1e-10)
+
+
+def test_pinv_matches_numpy():
+    A = np.random.RandomState(0).rand(4, 3, 5, 3)
+    XtX = np.einsum('...ji,...jk->...ik', A, A)
+    XtX[0, 0] = np.outer([1., 2., 3.], [1., 2., 3.])  # singular
+    XtX[0, 1] = 0.
+    XtX_inv = _pinv(XtX)
+    for i in range(4):
+        for j in range(3):
+            assert_allclose(XtX_inv[i, j], np.linalg.pinv(XtX[i, j]),
+                            atol=1e-12)
+
+
+def test_solve_candidate_moments_matches_fit_candidates(degree_day_df):
+    df = degree_day_df
+    X = np.ones((2, len(df), 3))
+    X[0, :, 1:] = df[['CDD_65', 'HDD_55']].values
+    X[1, :, 1:] = df[['CDD_70', 'HDD_60']].values
+    Y = np.array([df.upd.values, df.upd.values[::-1]])
+
+    params, pvalues, rsquared_adj, ssr, XtX_inv = \
+        _solve_candidate_moments(*_candidate_moments(Y, X))
+
+    for j, y in enumerate(Y):
+        expected = _fit_candidates(y, X)
+        assert_allclose(params[j], expected[0], rtol=1e-8)
+        assert_allclose(pvalues[j], expected[1], rtol=1e-6)
+        assert_allclose(rsquared_adj[j], expected[2], rtol=1e-8)
+
+
+def test_fit_full_selects_best(degree_day_df):
+    formula, mod, res, rsquared, qualified, hdd_bp, cdd_bp = \
+        _fit_full(degree_day_df)
+    assert qualified
+    assert formula == 'upd ~ CDD_70 + HDD_55'
+    assert (hdd_bp, cdd_bp) == (55, 70)
+    assert rsquared == res.rsquared_adj
+
+
+def test_balance_point_grid():
+    assert _balance_point_grid(65, 75) == list(range(65, 76))
+    assert _balance_point_grid(60, 61, 0.25) == [60, 60.25, 60.5, 60.75, 61]
+    assert _bp_column('CDD', 65) == 'CDD_65'
+    assert _bp_column('HDD', 60.25) == 'HDD_60_25'
+
+
+def test_average_degree_days():
+    temps = np.array([50., np.nan, 70., 40.])
+    starts, ends = np.array([0, 2, 4]), np.array([2, 4, 4])
+    assert_allclose(
+        _average_degree_days('HDD', 60, temps, starts, ends, 1),
+        [10., 10., np.nan])
+    assert_allclose(
+        _average_degree_days('CDD', 60, temps, starts, ends, 2),
+        [np.nan, 5., np.nan])
+
+
+@pytest.mark.parametrize('method', BalancePointSearch.methods)
+def test_balance_point_search(method):
+    np.random.seed(1)
+    temps = np.random.uniform(30, 90, 400)
+    upd = 5 + 2 * np.maximum(57.5 - temps, 0) + np.random.normal(0, 1, 400)
+    df = pd.DataFrame({
+        'upd': upd,
+        'ndays': 1,
+        'HDD_50': np.maximum(50 - temps, 0),
+        'HDD_65': np.maximum(65 - temps, 0),
+    })
+    days = np.arange(400)
+
+    def degree_days(kind, bp):
+        return _average_degree_days(kind, bp, temps, days, days + 1, 1)
+
+    search = BalancePointSearch(method, resolution=0.5,
+                                degree_days=degree_days)
+    formula, mod, res, rsquared, qualified, bp = \
+        _fit_hdd_only(df, search=search)
+    assert qualified
+    if method == 'exhaustive':
+        # only the balance points formatted into the data frame
+        assert bp == 65
+        assert search.n_candidates == {'hdd_only': 2}
+    else:
+        assert bp == 57.5
+        assert formula == 'upd ~ HDD_57_5'
+        assert 0 < search.n_candidates['hdd_only'] < 31
+
+
+def test_balance_point_search_bad_method():
+    with pytest.raises(ValueError):
+        BalancePointSearch('bisection')
+
+
+def test_degree_day_design_matches_patsy(degree_day_df):
+    temp = 60 + 20 * np.sin(np.arange(100) * 2 * np.pi / 100)
+    X = patsy.dmatrix('CDD_70 + HDD_55', degree_day_df,
+                      return_type='dataframe')
+
+    design = DegreeDayDesign(X.columns)
+    assert_allclose(design.build(temp), X.values, rtol=0, atol=0)
+
+    X = DegreeDayDesign(['Intercept', 'HDD_60_5']).build([50., np.nan])
+    assert_allclose(X, [[1, 10.5], [1, np.nan]])
+
+    with pytest.raises(ValueError):
+        DegreeDayDesign(['Intercept', 'tempF'])
+
+
+def test_caltrack_fit_pickles_compactly(degree_day_df):
+    res = smf.ols('upd ~ CDD_70 + HDD_55', data=degree_day_df).fit()
+    fit = CaltrackFit.from_results('upd ~ CDD_70 + HDD_55', res, 70, 55,
+                                   r2=res.rsquared_adj, n=res.nobs)
+
+    data = pickle.dumps(fit, protocol=2)
+    assert len(data) < 1000
+
+    fit = pickle.loads(data)
+    assert fit.stats['r2'] == res.rsquared_adj
+    assert (fit.cdd_bp, fit.hdd_bp) == (70, 55)
+
+    temp = 60 + 20 * np.sin(np.arange(100) * 2 * np.pi / 100)
+    predicted, variance = fit.predict(temp)
+    X = patsy.dmatrix('CDD_70 + HDD_55', degree_day_df,
+                      return_type='dataframe')
+    assert_allclose(predicted, res.predict(X), rtol=1e-12)
+    assert_allclose(variance, res.mse_resid + np.einsum(
+        'ij,jk,ik->i', X.values, res.cov_params().values, X.values),
+        rtol=1e-12)
+
+
+def test_candidate_moments_accumulates_chunks():
+    np.random.seed(0)
+    temps = 60 + 20 * np.sin(np.arange(200) * 2 * np.pi / 100)
+    usage = 5 + 2 * np.maximum(temps - 70, 0) + np.random.normal(0, 1, 200)
+    usage[[3, 50]] = np.nan
+    candidates = [[('CDD', 65), ('HDD', 55)], [('CDD', 70), ('HDD', 60)]]
+
+    whole = CandidateMoments(candidates)
+    whole.add(temps, usage)
+    chunked = CandidateMoments(candidates)
+    for i in range(0, 200, 30):
+        chunked.add(temps[i:i + 30], usage[i:i + 30])
+
+    for a, b in zip(chunked.moments, whole.moments):
+        assert_allclose(a, b, rtol=1e-10)
+    for a, b in zip(chunked.solve(), whole.solve()):
+        assert_allclose(a, b, rtol=1e-8)
+    assert chunked.sufficient().tolist() == [True, True]
+
+    X = np.array([design.build(temps) for design in whole.designs])
+    params, pvalues, rsquared_adj = _fit_candidates(usage, X)
+    assert_allclose(chunked.solve()[0], params, rtol=1e-8)
@@ -1,3 +1,4 @@
+import pickle
 import tempfile
 from datetime import datetime, timedelta
 
@@ -15,6 +16,7 @@ from eemeter.modeling.formatters import (
 )
 from eemeter.modeling.exceptions import (
     DataSufficiencyException,
+    ModelPredictException,
 )
 from eemeter.structures import EnergyTrace
 from eemeter.modeling.models import CaltrackMonthlyModel
@@ -165,8 +167,56 @@ def test_sufficiency_criteria():
         'Energy trace data is all or nearly all zero'
     )
 
-def test_fit_cdd(input_df):
+def test_daily_to_monthly_avg():
+    m = CaltrackMonthlyModel(fit_cdd=True)
+    index = pd.date_range('2000-01-01', periods=41, freq='D', tz=pytz.UTC)
+    df = pd.DataFrame({
+        'energy': np.tile(2., (41,)),
+        'tempF': np.tile(50., (41,)),
+    }, index=index)
+    df.energy[3] = np.nan
+    df.energy[4] = -1.
+    df.tempF[5] = np.nan
+
+    monthly = m.daily_to_monthly_avg(df)
+    assert list(monthly.index) == [index[0], index[31]]
+    assert list(monthly.ndays) == [28, 10]
+    assert_allclose(monthly.usage, [56., 20.])
+    assert_allclose(monthly.upd, [2., np.nan])
+    assert_allclose(monthly.HDD_60, [10., np.nan])
+    assert_allclose(monthly.CDD_70, [0., np.nan])
+
+    # demand fixtures only need temperature
+    fixture = m.daily_to_monthly_avg(df[['tempF']])
+    assert list(fixture.ndays) == [30, 10]
+    assert list(fixture.usage) == [0, 0]
+
+
+def test_billing_to_monthly_avg():
     m = CaltrackMonthlyModel(fit_cdd=True)
+    energy = pd.Series([31., 56., 1.], index=[
+        datetime(2011, 1, 1, tzinfo=pytz.UTC),
+        datetime(2011, 2, 1, tzinfo=pytz.UTC),
+        datetime(2011, 3, 1, tzinfo=pytz.UTC),
+    ])
+    hours = pd.date_range('2011-01-01', '2011-03-01 23:00', freq='H',
+                          tz=pytz.UTC)
+    temps = pd.DataFrame({0: np.tile(50., (len(hours),))},
+                         index=[np.zeros(len(hours), dtype=int), hours])
+    temps[0][(hours >= datetime(2011, 1, 10, tzinfo=pytz.UTC)) &
+             (hours < datetime(2011, 1, 28, tzinfo=pytz.UTC))] = np.nan
+
+    monthly = m.billing_to_monthly_avg((energy, temps))
+    # periods include both billing dates
+    assert_allclose(monthly.ndays, [14., 29., np.nan])
+    assert_allclose(monthly.usage, [31., 56., np.nan])
+    assert_allclose(monthly.upd, [1., 2., np.nan])
+    assert_allclose(monthly.HDD_60, [np.nan, 10., np.nan])
+    assert_allclose(monthly.CDD_70, [np.nan, 0., np.nan])
+
+
+def test_fit_cdd(input_df):
+    m = CaltrackMonthlyModel(fit_cdd=True, keep_training_data=True)
     assert str(m).startswith("Caltrack")
     assert m.n is None
     assert m.params is None
@@ -211,7 +261,7 @@ def test_fit_cdd(input_df):
 
 
 def test_fit_cdd_false(input_df):
-    m = CaltrackMonthlyModel(fit_cdd=False)
+    m = CaltrackMonthlyModel(fit_cdd=False, keep_training_data=True)
     assert str(m).startswith("Caltrack")
     assert m.n is None
     assert m.params is None
@@ -288,3 +338,50 @@ def test_basic_billing(input_billing_df, mock_isd_weather_source):
     outputs, variance = m.predict(formatted_predict_data, summed=True)
     assert outputs > 0
     assert variance > 0
+
+
+def test_predict_summed_matches_rows():
+    index = pd.date_range('2012-01-01', periods=730, freq='D', tz=pytz.UTC)
+    temp = 60 + 20 * np.sin(np.arange(730) * 2 * np.pi / 365)
+    energy = 10 + np.maximum(temp - 70, 0) + np.maximum(60 - temp, 0)
+    input_data = pd.DataFrame({'energy': energy, 'tempF': temp}, index=index)
+
+    m = CaltrackMonthlyModel(fit_cdd=True, keep_training_data=True)
+    m.fit(input_data)
+
+    demand_fixture = input_data[['tempF']].copy()
+    demand_fixture.iloc[[5, 100]] = np.nan
+    predicted, variance = m.predict(demand_fixture, summed=True)
+
+    # summed row by row over the days with temperature data
+    X = m.fitted.design.build(demand_fixture.tempF.dropna())
+    expected, expected_var = 0.0, 0.0
+    for x in X:
+        expected += x.dot(m.model_res.params.values)
+        expected_var += m.model_res.mse_resid + \
+            x.dot(m.model_res.cov_params().values).dot(x)
+    assert predicted == expected
+    assert_allclose(variance, expected_var, rtol=1e-12)
+
+
+def test_predict_from_compact_fit(input_df):
+    m = CaltrackMonthlyModel(fit_cdd=True)
+    m.fit(input_df)
+
+    fitted = pickle.loads(pickle.dumps(m.params['fitted']))
+    predicted, variance = CaltrackMonthlyModel().predict(
+        input_df, params=fitted)
+
+    assert (predicted, variance) == m.predict(input_df)
+
+
+def test_predict_with_params_without_fitted(input_df):
+    m = CaltrackMonthlyModel(fit_cdd=True)
+    m.fit(input_df)
+    assert m.y is None and m.model_res is None
+
+    params = {k: v for k, v in m.params.items() if k != 'fitted'}
+    assert m.predict(input_df, params=params) == m.predict(input_df)
+
+    with pytest.raises(ModelPredictException):
+        CaltrackMonthlyModel().predict(input_df, params=params)
@@ -122,3 +122,24 @@ def test_basic_hourly(input_df, mock_isd_weather_source):
     outputs, variance = m.predict(formatted_predict_data, summed=True)
     assert outputs > 0
     assert variance > 0
+
+
+def test_load_profile(input_df):
+    m = HourlyLoadProfileModel()
+    m.input_data = input_df
+    mean, std, present = m.load_profile()
+    assert mean.shape == (12, 2, 24)
+    assert present.all()
+
+    index = input_df.index
+    groups = [index.month, index.dayofweek < 5, index.hour]
+    expected_mean = input_df.groupby(groups).energy.mean()
+    expected_std = input_df.groupby(groups).energy.std()
+    assert_allclose(mean[0, 1, 3], expected_mean.loc[(1, True, 3)])
+    assert_allclose(std[6, 0, 23], expected_std.loc[(7, False, 23)])
+    assert m.load_profile()[0] is mean
+
+    m.input_data = input_df.iloc[:24 * 31]
+    mean, _, present = m.load_profile()
+    assert present[0].all() and not present[1:].any()
+    assert np.isnan(mean[1:]).all()
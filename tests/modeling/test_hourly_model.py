@@ -3,11 +3,17 @@ from eemeter.testing.mocks import MockWeatherClient
 from eemeter.modeling.formatters import ModelDataFormatter
 
 from eemeter.modeling.models import HourlyDayOfWeekModel
+from eemeter.modeling.models.hourly_model import (
+    HourDayOfWeekDesign,
+    SparseLeastSquaresFit,
+)
 import numpy as np
 import pytest
 import pandas as pd
 import pytz
 import tempfile
+import patsy
+import statsmodels.api as sm
 import eemeter.modeling.exceptions as model_exceptions
 
 @pytest.fixture
@@ -90,3 +96,54 @@ def test_min_contiguous_months(input_df):
     with pytest.raises(model_exceptions.DataSufficiencyException) as sufficiency_exception:
         model.fit(input_df)
 
+
+
+def test_hour_day_of_week_design_matches_patsy():
+    index = pd.date_range('2017-09-14', periods=96, freq='H', tz=pytz.UTC)
+    hdd = np.random.RandomState(0).rand(96)
+    cdd = np.random.RandomState(1).rand(96)
+    design = HourDayOfWeekDesign.from_codes(index.hour, index.dayofweek)
+    X = design.build(index.hour, index.dayofweek, hdd, cdd)
+
+    df = pd.DataFrame({
+        'energy': 0, 'hdd': hdd, 'cdd': cdd,
+        'hour_of_day': index.hour.astype(str),
+        'day_of_week': index.dayofweek.astype(str),
+    })
+    _, expected = patsy.dmatrices(
+        HourlyDayOfWeekModel().formula, df, return_type='dataframe')
+    assert design.columns == list(expected.columns)
+    np.testing.assert_array_equal(X, expected.values)
+    np.testing.assert_array_equal(
+        design.build(index.hour, index.dayofweek, hdd, cdd,
+                     sparse=True).toarray(), X)
+
+    with pytest.raises(ValueError):
+        design.build([0], [1], [0.], [0.])
+
+
+def test_sparse_least_squares_fit_matches_ols():
+    index = pd.date_range('2017-09-11', periods=24 * 14, freq='H', tz=pytz.UTC)
+    rs = np.random.RandomState(0)
+    hdd, cdd, energy = rs.rand(len(index)), rs.rand(len(index)), \
+        rs.rand(len(index))
+    design = HourDayOfWeekDesign.from_codes(index.hour, index.dayofweek)
+    X = design.build(index.hour, index.dayofweek, hdd, cdd, sparse=True)
+
+    fit = SparseLeastSquaresFit(X, energy, design.columns)
+    expected = sm.OLS(energy, X.toarray()).fit()
+    np.testing.assert_allclose(fit.params.values, expected.params)
+    np.testing.assert_allclose(fit.ssr, expected.ssr)
+    np.testing.assert_allclose(fit.rsquared_adj, expected.rsquared_adj)
+    np.testing.assert_allclose(fit.cov_params().values,
+                               expected.cov_params(), atol=1e-12)
+
+
+def test_predict_part_of_period(input_df):
+    model = HourlyDayOfWeekModel(min_contiguous_months=0)
+    model.fit(input_df)
+    prediction, variance = model.predict(input_df.iloc[48:60], summed=False)
+    full_prediction, _ = model.predict(input_df, summed=False)
+    assert len(prediction) == 12
+    np.testing.assert_allclose(
+        prediction.values, full_prediction[prediction.index].values)
@@ -0,0 +1,205 @@
+import json
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from eemeter.modeling.formatters import ModelDataFormatter
+from eemeter.modeling.models import CaltrackDailyModel, CaltrackFit
+from eemeter.modeling.split import SplitModeledEnergyTrace
+from eemeter.modeling.store import SqlModelStore, model_store_key
+from eemeter.structures import (
+    EnergyTrace,
+    ModelingPeriod,
+    ModelingPeriodSet,
+)
+from eemeter.testing.mocks import MockWeatherClient
+from eemeter.weather import ISDWeatherSource
+
+
+@pytest.fixture
+def trace():
+    data = {
+        "value": 1 + np.random.RandomState(0).rand(730),
+        "estimated": np.tile(False, (730,)),
+    }
+    columns = ["value", "estimated"]
+    index = pd.date_range('2000-01-01', periods=730, freq='D', tz=pytz.UTC)
+    df = pd.DataFrame(data, index=index, columns=columns)
+    return EnergyTrace("ELECTRICITY_CONSUMPTION_SUPPLIED", df, unit="KWH")
+
+
+@pytest.fixture
+def mock_isd_weather_source():
+    tmp_url = "sqlite:///{}/weather_cache.db".format(tempfile.mkdtemp())
+    ws = ISDWeatherSource("722880", tmp_url)
+    ws.client = MockWeatherClient()
+    return ws
+
+
+@pytest.fixture
+def modeling_period_set():
+    modeling_periods = {
+        "modeling_period_1": ModelingPeriod(
+            "BASELINE",
+            end_date=datetime(2001, 1, 1, tzinfo=pytz.UTC),
+        ),
+        "modeling_period_2": ModelingPeriod(
+            "REPORTING",
+            start_date=datetime(2001, 1, 1, tzinfo=pytz.UTC),
+        ),
+    }
+    grouping = [
+        ("modeling_period_1", "modeling_period_2"),
+    ]
+    return ModelingPeriodSet(modeling_periods, grouping)
+
+
+def test_basic_usage():
+    url = "sqlite:///{}/model_cache.db".format(tempfile.mkdtemp())
+    s = SqlModelStore(url)
+    assert str(s) == 'SqlModelStore("{}")'.format(url)
+
+    assert s.key_exists("a") is False
+    assert s.retrieve("a") is None
+
+    fitted = CaltrackFit('upd ~ HDD_60', ['Intercept', 'HDD_60'], [1., 2.],
+                         np.eye(2), 0.5, hdd_bp=60,
+                         stats={'r2': np.float64(0.9), 'n': np.int64(730),
+                                'n_bp_candidates': {'hdd_only': 11}})
+    s.save("a", fitted)
+    assert s.key_exists("a") is True
+
+    stored = s.retrieve("a")
+    assert stored.formula == 'upd ~ HDD_60'
+    assert stored.columns == ('Intercept', 'HDD_60')
+    assert stored.hdd_bp == 60 and stored.cdd_bp is None
+    assert stored.mse_resid == 0.5
+    assert stored.stats == {'r2': 0.9, 'n': 730,
+                            'n_bp_candidates': {'hdd_only': 11}}
+    np.testing.assert_array_equal(stored.coefficients, [1., 2.])
+    np.testing.assert_array_equal(stored.cov, np.eye(2))
+
+    # stored as JSON and arrays, not pickled
+    row = s.items.select().execute().fetchone()
+    assert json.loads(row.fit)['formula'] == 'upd ~ HDD_60'
+
+    s.clear()
+    assert s.key_exists("a") is False
+
+
+def test_model_store_key(trace, mock_isd_weather_source):
+    formatter = ModelDataFormatter('D')
+    input_data = formatter.create_input(trace, mock_isd_weather_source)
+
+    def key(data=trace.data, station='722880', input_data=input_data,
+            model=None):
+        if model is None:
+            model = CaltrackDailyModel()
+        return model_store_key(
+            data, trace.interpretation, trace.unit, station, input_data,
+            formatter, model, 'modeling_period_1')
+
+    assert key() == key()
+
+    changed = trace.data.copy()
+    changed.iloc[10, 0] = 2
+    assert key(data=changed) != key()
+    assert key(station='725300') != key()
+
+    corrected = input_data.copy()
+    corrected.iloc[10, corrected.columns.get_loc('tempF')] += 1
+    assert key(input_data=corrected) != key()
+    assert key(model=CaltrackDailyModel(fit_cdd=False)) != key()
+
+
+def test_split_modeled_energy_trace_reuses_stored_fits(
+        trace, modeling_period_set, mock_isd_weather_source):
+    url = "sqlite:///{}/model_cache.db".format(tempfile.mkdtemp())
+    store = SqlModelStore(url)
+    formatter = ModelDataFormatter('D')
+
+    def modeled_trace():
+        model_mapping = {
+            'modeling_period_1': CaltrackDailyModel(),
+            'modeling_period_2': CaltrackDailyModel(),
+        }
+        return SplitModeledEnergyTrace(
+            trace, formatter, model_mapping, modeling_period_set,
+            model_store=store)
+
+    smet = modeled_trace()
+    outputs = smet.fit(mock_isd_weather_source)
+    assert outputs['modeling_period_1']['status'] == 'SUCCESS'
+
+    def fail(input_data):
+        raise AssertionError('refit')
+
+    smet_stored = modeled_trace()
+    smet_stored.model_mapping['modeling_period_1'].fit = fail
+    outputs_stored = smet_stored.fit(mock_isd_weather_source)
+    assert outputs_stored['modeling_period_1']['status'] == 'SUCCESS'
+    assert outputs_stored['modeling_period_2']['status'] == 'SUCCESS'
+    assert outputs_stored['modeling_period_1']['model_fit']['r2'] == \
+        outputs['modeling_period_1']['model_fit']['r2']
+
+    index = pd.date_range('2002-01-01', periods=30, freq='D', tz=pytz.UTC)
+    demand_fixture_data = formatter.create_demand_fixture(
+        index, mock_isd_weather_source)
+    assert smet_stored.predict('modeling_period_1', demand_fixture_data) == \
+        smet.predict('modeling_period_1', demand_fixture_data)
+
+
+def test_split_modeled_energy_trace_stores_baseline_fits_only(
+        trace, modeling_period_set, mock_isd_weather_source):
+    url = "sqlite:///{}/model_cache.db".format(tempfile.mkdtemp())
+    store = SqlModelStore(url)
+
+    def fit(trace):
+        model_mapping = {
+            'modeling_period_1': CaltrackDailyModel(),
+            'modeling_period_2': CaltrackDailyModel(),
+        }
+        smet = SplitModeledEnergyTrace(
+            trace, ModelDataFormatter('D'), model_mapping,
+            modeling_period_set, model_store=store)
+        outputs = smet.fit(mock_isd_weather_source)
+        assert outputs['modeling_period_2']['status'] == 'SUCCESS'
+
+    fit(trace)
+
+    # more reporting period data
+    index = pd.date_range('2002-01-01', periods=30, freq='D', tz=pytz.UTC)
+    more_data = pd.DataFrame(
+        {"value": np.ones(30), "estimated": np.tile(False, (30,))},
+        index=index, columns=["value", "estimated"])
+    fit(EnergyTrace(trace.interpretation,
+                    pd.concat([trace.data, more_data]), unit=trace.unit))
+
+    assert len(store.items.select().execute().fetchall()) == 1
+
+
+class _FailingModelStore(object):
+
+    def retrieve(self, key):
+        raise ValueError('corrupt fit')
+
+    def save(self, key, fitted):
+        raise ValueError('database is locked')
+
+
+def test_split_modeled_energy_trace_failing_store(
+        trace, modeling_period_set, mock_isd_weather_source):
+    model_mapping = {
+        'modeling_period_1': CaltrackDailyModel(),
+        'modeling_period_2': CaltrackDailyModel(),
+    }
+    smet = SplitModeledEnergyTrace(
+        trace, ModelDataFormatter('D'), model_mapping, modeling_period_set,
+        model_store=_FailingModelStore())
+    outputs = smet.fit(mock_isd_weather_source)
+    assert outputs['modeling_period_1']['status'] == 'SUCCESS'
+    assert outputs['modeling_period_1']['model_fit']['r2'] is not None
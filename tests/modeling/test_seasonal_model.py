@@ -91,3 +91,12 @@ def test_basic(input_df):
 
     assert_allclose(predict, 361.2063769041264)
     assert variance > 0
+
+
+def test_bootstrap_keeps_fitted_model(input_df):
+    m = SeasonalElasticNetCVModel(65, 65)
+    m.fit(input_df)
+
+    assert m.bootstrap_residuals.shape == (50, 50)
+    assert_allclose(m.model_obj.predict(m.X), m.estimated.values)
+    assert_allclose(m.params['coefficients'], m.model_obj.coef_)
@@ -0,0 +1,23 @@
+import numpy as np
+from numpy.testing import assert_allclose
+import pandas as pd
+
+from eemeter.modeling.models.variance import prediction_variance
+
+
+def test_prediction_variance():
+    np.random.seed(0)
+    X = pd.DataFrame(np.random.rand(1000, 4),
+                     index=pd.date_range('2000-01-01', periods=1000, freq='H'))
+    A = np.random.rand(4, 4)
+    cov = pd.DataFrame(A.dot(A.T))
+
+    expected = 2.5 + (X * np.dot(cov, X.T).T).sum(1)
+
+    variance = prediction_variance(X, cov, 2.5, chunk_size=300)
+    assert variance.index.equals(X.index)
+    assert_allclose(variance.values, expected.values, rtol=1e-12)
+
+    variance = prediction_variance(X.values, cov.values, 2.5)
+    assert isinstance(variance, np.ndarray)
+    assert_allclose(variance, expected.values, rtol=1e-12)
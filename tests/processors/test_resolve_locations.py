@@ -0,0 +1,40 @@
+import pytest
+
+from eemeter.processors.location import resolve_locations
+
+
+def test_zipcodes():
+    locations = resolve_locations(['91104', '00000'])
+
+    assert list(locations.zipcode) == ['91104', '00000']
+    assert list(locations.weather_station) == ['722880', None]
+    assert list(locations.weather_normal_station) == ['722880', None]
+    assert list(locations.climate_zone) == ['CA_09', None]
+    assert list(locations.avert_region) == ['CA', None]
+    assert locations.failures[0] == ''
+    assert locations.failures[1] == (
+        'weather_station,weather_normal_station,climate_zone,avert_region'
+    )
+
+
+def test_zipcodes_cz2010():
+    locations = resolve_locations(['92311'], use_cz2010=True)
+
+    assert list(locations.weather_station) == ['723815']
+    assert list(locations.weather_normal_station) == ['723815']
+
+
+def test_lat_lngs():
+    locations = resolve_locations(lat_lngs=[[40, -100], [None, None]])
+
+    assert list(locations.weather_station) == ['725625', None]
+    assert locations.failures[0] == ''
+    assert locations.failures[1].startswith('zipcode,')
+
+
+def test_requires_one_of_zipcodes_or_lat_lngs():
+    with pytest.raises(ValueError):
+        resolve_locations()
+
+    with pytest.raises(ValueError):
+        resolve_locations(['91104'], [[40, -100]])
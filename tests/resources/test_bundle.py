@@ -0,0 +1,101 @@
+import json
+from pkg_resources import resource_stream
+
+import pytest
+
+from eemeter.resources.bundle import (
+    BundledMapping,
+    BundledSet,
+    build_resource_bundle,
+    load_bundled_resource,
+)
+
+
+@pytest.fixture(scope='module')
+def bundle_directory(tmpdir_factory):
+    directory = str(tmpdir_factory.mktemp('bundle'))
+    return build_resource_bundle(directory)
+
+
+def _load_json(filename):
+    with resource_stream('eemeter.resources', filename) as f:
+        return json.loads(f.read().decode('utf-8'))
+
+
+def test_str_mapping(bundle_directory):
+    bundled = load_bundled_resource(
+        'zipcode_usaf_station.json', bundle_directory)
+    resource = _load_json('zipcode_usaf_station.json')
+
+    assert isinstance(bundled, BundledMapping)
+    assert len(bundled) == len(resource)
+    assert bundled.get('82440') == '726700'
+    assert bundled['94403'] == '994041'
+    assert bundled.get('00000') is None
+    assert '00000' not in bundled
+    assert dict(bundled.items()) == resource
+
+
+def test_lat_lng_mapping(bundle_directory):
+    bundled = load_bundled_resource(
+        'usaf_station_lat_lngs.json', bundle_directory)
+    resource = _load_json('usaf_station_lat_lngs.json')
+
+    assert bundled.get('720655') == resource['720655']
+    assert dict(bundled.items()) == resource
+
+
+def test_list_mapping(bundle_directory):
+    bundled = load_bundled_resource(
+        'GSOD-ISD_station_index.json', bundle_directory)
+    resource = _load_json('GSOD-ISD_station_index.json')
+
+    assert bundled['228050'] == ['228050-99999']
+    assert dict(bundled.items()) == resource
+
+
+def test_set(bundle_directory):
+    bundled = load_bundled_resource(
+        'supported_zipcodes.json', bundle_directory)
+
+    assert isinstance(bundled, BundledSet)
+    assert '81050' in bundled
+    assert '00000' not in bundled
+    assert sorted(bundled) == sorted(_load_json('supported_zipcodes.json'))
+
+
+def test_unicode_keys(bundle_directory):
+    # zipcodes from json.loads or the deserializers are unicode on Python 2
+    mapping = load_bundled_resource(
+        'zipcode_usaf_station.json', bundle_directory)
+    assert mapping.get(u'82440') == '726700'
+    assert mapping[u'94403'] == '994041'
+    assert u'82440' in mapping
+    assert mapping.get(82440) is None
+
+    supported = load_bundled_resource(
+        'supported_zipcodes.json', bundle_directory)
+    assert u'81050' in supported
+    assert u'00000' not in supported
+    assert 81050 not in supported
+
+
+def test_missing_bundle(tmpdir):
+    assert load_bundled_resource(
+        'zipcode_usaf_station.json', str(tmpdir)) is None
+
+
+def test_not_bundled(bundle_directory):
+    assert load_bundled_resource(
+        'tmy3_station_metadata.json', bundle_directory) is None
+
+
+def test_stale_bundle(bundle_directory, tmpdir):
+    directory = build_resource_bundle(str(tmpdir))
+    manifest_path = tmpdir.join('manifest.json')
+    manifest = json.loads(manifest_path.read())
+    manifest['eemeter_version'] = '0.0.0'
+    manifest_path.write(json.dumps(manifest))
+
+    assert load_bundled_resource(
+        'zipcode_usaf_station.json', directory) is None
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+# Modules which must not be imported until the code paths that need them run.
+HEAVY_MODULES = [
+    'holidays',
+    'lxml',
+    'patsy',
+    'requests',
+    'scipy.interpolate',
+    'scipy.spatial',
+    'scipy.stats',
+    'sklearn',
+    'sqlalchemy',
+    'statsmodels',
+    'xlrd',
+]
+
+# Seconds. Override with EEMETER_IMPORT_TIME_BUDGET on slow machines.
+IMPORT_TIME_BUDGET = float(os.environ.get('EEMETER_IMPORT_TIME_BUDGET', 2.0))
+
+
+def _run_in_subprocess(code):
+    output = subprocess.check_output([sys.executable, '-c', code])
+    return output.decode('utf-8').strip()
+
+
+def test_no_heavy_imports():
+    code = (
+        'import sys\n'
+        'import eemeter.ee.meter\n'
+        'import eemeter.cli\n'
+        'print(",".join(m for m in {!r} if m in sys.modules))\n'
+        .format(HEAVY_MODULES)
+    )
+    assert _run_in_subprocess(code) == ''
+
+
+def test_import_time_budget():
+    code = (
+        'import time\n'
+        't0 = time.time()\n'
+        'import eemeter.ee.meter\n'
+        'print(time.time() - t0)\n'
+    )
+    import_time = min(float(_run_in_subprocess(code)) for _ in range(3))
+    assert import_time < IMPORT_TIME_BUDGET
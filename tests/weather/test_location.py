@@ -1,11 +1,16 @@
+import numpy as np
 from numpy.testing import assert_allclose
 
 from eemeter.weather.location import (
+    _load_usaf_station_to_lat_lng_index,
     haversine,
     lat_lng_to_usaf_station,
     lat_lng_to_tmy3_station,
     lat_lng_to_zipcode,
     lat_lng_to_climate_zone,
+    lat_lngs_to_usaf_stations,
+    lat_lngs_to_zipcodes,
+    lat_lngs_to_climate_zones,
     usaf_station_to_lat_lng,
     usaf_station_to_zipcodes,
     usaf_station_to_climate_zone,
@@ -17,6 +22,10 @@ from eemeter.weather.location import (
     zipcode_to_tmy3_station,
     zipcode_to_cz2010_station,
     zipcode_to_climate_zone,
+    zipcodes_to_usaf_stations,
+    zipcodes_to_tmy3_stations,
+    zipcodes_to_cz2010_stations,
+    zipcodes_to_climate_zones,
     climate_zone_to_zipcodes,
     climate_zone_to_usaf_stations,
     climate_zone_to_tmy3_stations,
@@ -36,6 +45,15 @@ def test_lat_lng_to_usaf_station():
     assert lat_lng_to_usaf_station(40, -100) == '725625'
 
 
+def test_lat_lng_to_usaf_station_matches_haversine():
+    index_list = list(_load_usaf_station_to_lat_lng_index().items())
+    for lat, lng in [(40, -100), (21.3, -157.9), (61.2, -149.9), (25, -80)]:
+        dists = [haversine(lat, lng, stat_lat, stat_lng)
+                 for _, (stat_lat, stat_lng) in index_list]
+        expected = index_list[np.argmin(dists)][0]
+        assert lat_lng_to_usaf_station(lat, lng) == expected
+
+
 def test_lat_lng_to_tmy3_station():
     assert lat_lng_to_tmy3_station(45, -90) == '726463'
 
@@ -48,6 +66,20 @@ def test_lat_lng_to_climate_zone():
     assert lat_lng_to_climate_zone(43, -95) == '6|A|Cold'
 
 
+def test_lat_lngs_to_usaf_stations():
+    stations = lat_lngs_to_usaf_stations([40, None], [-100, -90])
+    assert list(stations) == ['725625', None]
+
+
+def test_lat_lngs_to_zipcodes():
+    zipcodes = lat_lngs_to_zipcodes([42, float('nan')], [-120, -90])
+    assert list(zipcodes) == ['96112', None]
+
+
+def test_lat_lngs_to_climate_zones():
+    assert list(lat_lngs_to_climate_zones([43], [-95])) == ['6|A|Cold']
+
+
 def test_usaf_station_to_lat_lng():
     assert_allclose(usaf_station_to_lat_lng('720655'), [28.867, -82.571])
 
@@ -95,6 +127,25 @@ def test_zipcode_to_climate_zone():
     assert zipcode_to_climate_zone('81050') == '4|B|Mixed-Dry'
 
 
+def test_zipcodes_to_usaf_stations():
+    stations = zipcodes_to_usaf_stations(['82440', '00000', None, '94403'])
+    assert list(stations) == ['726700', None, None, '994041']
+
+
+def test_zipcodes_to_tmy3_stations():
+    stations = zipcodes_to_tmy3_stations(['19975', '94403'])
+    assert list(stations) == ['745966', '724940']
+
+
+def test_zipcodes_to_cz2010_stations():
+    stations = zipcodes_to_cz2010_stations(['92311', '82440'])
+    assert list(stations) == ['723815', None]
+
+
+def test_zipcodes_to_climate_zones():
+    assert list(zipcodes_to_climate_zones(['81050'])) == ['4|B|Mixed-Dry']
+
+
 def test_climate_zone_to_zipcodes():
     assert '95968' in climate_zone_to_zipcodes('CA_11')
 